@@ -0,0 +1,122 @@
+"""
+Air-quality classification for WeatherAPI pollutant readings.
+"""
+import math
+from bisect import bisect_right
+from decimal import Decimal
+from functools import lru_cache
+from typing import Any, Optional
+
+import numpy as np
+
+AIR_QUALITY_LEVELS = ["Good", "Fair", "Moderate", "Poor", "Very Poor"]
+AIR_QUALITY_KEYS = ["so2", "no2", "pm10", "pm2_5", "o3", "co"]
+
+# Lower bound of Fair, Moderate, Poor and Very Poor for each pollutant, in
+# AIR_QUALITY_KEYS order. Good starts at 0 and Very Poor has no upper bound,
+# so a value's level is the number of bounds it is >= to.
+AIR_QUALITY_THRESHOLDS = np.array([
+    [20, 80, 250, 350],             # SO2
+    [40, 70, 150, 200],             # NO2
+    [20, 50, 100, 200],             # PM10
+    [10, 25, 50, 75],               # PM2.5
+    [60, 100, 140, 180],            # O3
+    [4400, 9400, 12400, 15400],     # CO
+], dtype=float)
+_THRESHOLD_ROWS = [row.tolist() for row in AIR_QUALITY_THRESHOLDS]
+_AIR_QUALITY_LABELS = np.array(AIR_QUALITY_LEVELS + ["Data out of range", "Invalid Data"], dtype=object)
+_OUT_OF_RANGE = len(AIR_QUALITY_LEVELS)
+_INVALID = _OUT_OF_RANGE + 1
+
+
+def air_quality(so2, no2, pm10, pm2_5, o3, co):
+    """
+    Determines air quality based on pollutant levels.
+    Returns 'Good', 'Fair', 'Moderate', 'Poor', or 'Very Poor'.
+    """
+    # Handle None or negative values
+    values = [so2, no2, pm10, pm2_5, o3, co]
+    if any(v is None or v < 0 for v in values):
+        return "Invalid Data"
+
+    # The worst level across all pollutants wins
+    worst_index = 0
+    for value, bounds in zip(values, _THRESHOLD_ROWS):
+        if not value < float('inf'):
+            # NaN or infinity matches no range
+            return "Data out of range"
+        worst_index = max(worst_index, bisect_right(bounds, value))
+    return AIR_QUALITY_LEVELS[worst_index]
+
+
+def _lowest_double_above(real: Decimal) -> float:
+    value = float(real)
+    return value if Decimal(value) > real else math.nextafter(value, math.inf)
+
+
+@lru_cache(maxsize=None)
+def _rounded_bounds(decimals: int) -> tuple[np.ndarray, float]:
+    """
+    Thresholds for values that have not been rounded yet: round(v, decimals) >= T
+    exactly when v >= the returned bound for T, and round(v, decimals) < 0 exactly
+    when v < the returned negative bound. The thresholds are integers, so T - half
+    is never representable as a double and round()'s tie-breaking never applies.
+    """
+    half = Decimal(1).scaleb(-decimals) / 2
+    bounds = np.array([
+        [_lowest_double_above(Decimal(int(bound)) - half) for bound in row] for row in AIR_QUALITY_THRESHOLDS
+    ], dtype=float)
+    return bounds, _lowest_double_above(-half)
+
+
+def classify_air_quality(values: np.ndarray, missing: Optional[np.ndarray] = None, decimals: Optional[int] = None) -> list[str]:
+    """
+    Vectorized `air_quality` for many readings at once.
+    Args:
+        values: Array of shape (n, 6) with pollutant values in AIR_QUALITY_KEYS order.
+        missing: Optional boolean array of the same shape marking values that were None.
+        decimals: Classify as if every value had first been passed through round(value, decimals)
+            (as get_air_quality does), without rounding them. Must be at least 1.
+    Returns:
+        list[str]: One label per row, identical to `air_quality` on that row.
+    """
+    values = np.asarray(values, dtype=float).reshape(-1, len(AIR_QUALITY_KEYS))
+    if decimals is None:
+        thresholds, negative = AIR_QUALITY_THRESHOLDS, 0.0
+    else:
+        thresholds, negative = _rounded_bounds(decimals)
+    levels = np.zeros(len(values), dtype=np.intp)
+    for column, bounds in enumerate(thresholds):
+        np.maximum(levels, np.searchsorted(bounds, values[:, column], side="right"), out=levels)
+
+    invalid = (values < negative).any(axis=1)
+    if missing is not None:
+        invalid |= np.asarray(missing, dtype=bool).reshape(values.shape).any(axis=1)
+    levels[~np.isfinite(values).all(axis=1)] = _OUT_OF_RANGE
+    levels[invalid] = _INVALID
+    return _AIR_QUALITY_LABELS[levels].tolist()
+
+
+def get_air_quality(request: dict[str, Any]) -> dict[str, Any]:
+    """
+    Fetches air quality data from the AirQualityAPI.
+    """
+    data = request['air_quality']
+    so2 = round(data['so2'], 3)
+    no2 = round(data['no2'], 3)
+    pm10 = round(data['pm10'], 3)
+    pm2_5 = round(data['pm2_5'], 3)
+    o3 = round(data['o3'], 3)
+    co = round(data['co'], 3)
+    # print(f"Air Quality Values - SO2: {so2}, NO2: {no2}, PM10: {pm10}, PM2.5: {pm2_5}, O3: {o3}, CO: {co}")
+    return air_quality(so2, no2, pm10, pm2_5, o3, co)
+
+
+def get_air_quality_batch(entries: list[dict[str, Any]]) -> list[str]:
+    """
+    `get_air_quality` for a list of hourly/daily entries, classified in one vectorized pass.
+    Missing (None) pollutant values give "Invalid Data" instead of raising.
+    """
+    rows = [[entry['air_quality'][key] for key in AIR_QUALITY_KEYS] for entry in entries]
+    missing = [[value is None for value in row] for row in rows]
+    return classify_air_quality(np.array(rows, dtype=float), np.array(missing, dtype=bool), decimals=3)
@@ -0,0 +1,152 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+
+def normalize_city(city: str) -> str:
+    """
+    Normalizes a city name for use as a cache key ("  New  York " -> "new york").
+    """
+    return " ".join(str(city).lower().split())
+
+
+class WeatherCache:
+    """
+    TTL cache for WeatherAPI payloads, keyed by normalized city.
+
+    current.json and forecast.json payloads are cached separately with their own
+    TTLs (WeatherAPI refreshes current conditions every 10-15 minutes and the
+    forecast less often). Lookups are answered from a larger cached request when
+    possible:
+        - a cached N-day forecast satisfies any forecast request for <= N days
+          (daily, or hourly for any day_for_hourly < N);
+        - the `current` block of a cached forecast satisfies a current request
+          while it is younger than the current TTL.
+    Expired payloads are kept until evicted, and returned by `stale=True`
+    lookups while WeatherAPI is unavailable.
+    """
+
+    def __init__(
+        self,
+        current_ttl: Optional[float] = None,
+        forecast_ttl: Optional[float] = None,
+        max_cities: int = 256,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.current_ttl = current_ttl if current_ttl is not None else float(os.getenv("WEATHER_CACHE_CURRENT_TTL", 600))
+        self.forecast_ttl = forecast_ttl if forecast_ttl is not None else float(os.getenv("WEATHER_CACHE_FORECAST_TTL", 1800))
+        self.max_cities = max_cities
+        self._clock = clock
+        self._lock = threading.Lock()
+        # city -> (fetched_at, payload)
+        self._current: "OrderedDict[str, tuple[float, Dict[str, Any]]]" = OrderedDict()
+        # city -> (fetched_at, days, payload)
+        self._forecast: "OrderedDict[str, tuple[float, int, Dict[str, Any]]]" = OrderedDict()
+        self._stats = {"hits": 0, "superset_hits": 0, "misses": 0, "stale_hits": 0}
+
+    def _store(self, table: OrderedDict, key: str, value: tuple) -> None:
+        table[key] = value
+        table.move_to_end(key)
+        while len(table) > self.max_cities:
+            table.popitem(last=False)
+
+    def _fresh(self, fetched_at: float, ttl: float) -> bool:
+        return self._clock() - fetched_at < ttl
+
+    def _count(self, outcome: str, stale: bool = False) -> None:
+        # A stale lookup retries one whose miss was already counted; only an expired payload
+        # it serves is counted (stale_hits), so hit_rate is not skewed by outages.
+        if not stale or outcome == "stale_hits":
+            self._stats[outcome] += 1
+
+    def get_current(self, city: str, stale: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        Args:
+            stale (bool): Also return an expired payload (the newest one held). Such a lookup
+                follows a counted miss, so it only counts as a stale hit.
+        Returns:
+            Optional[Dict[str, Any]]: A current.json-shaped payload, or None on a miss.
+        """
+        key = normalize_city(city)
+        with self._lock:
+            entry = self._current.get(key)
+            if entry is not None and self._fresh(entry[0], self.current_ttl):
+                self._count("hits", stale)
+                return entry[1]
+            forecast = self._forecast.get(key)
+            if forecast is not None and "current" not in forecast[2]:
+                forecast = None
+            if forecast is not None and self._fresh(forecast[0], self.current_ttl):
+                self._count("superset_hits", stale)
+                payload = forecast[2]
+                return {"location": payload.get("location"), "current": payload["current"]}
+            if stale and (entry is not None or forecast is not None):
+                self._count("stale_hits")
+                if forecast is None or (entry is not None and entry[0] >= forecast[0]):
+                    return entry[1]
+                return {"location": forecast[2].get("location"), "current": forecast[2]["current"]}
+            self._count("misses", stale)
+            return None
+
+    def get_forecast(self, city: str, days: int, stale: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        Args:
+            stale (bool): Also return an expired forecast; counted like get_current's.
+        Returns:
+            Optional[Dict[str, Any]]: A forecast.json-shaped payload with exactly
+            `days` forecast days, or None on a miss.
+        """
+        key = normalize_city(city)
+        with self._lock:
+            entry = self._forecast.get(key)
+            if entry is None or entry[1] < days:
+                self._count("misses", stale)
+                return None
+            if not self._fresh(entry[0], self.forecast_ttl):
+                if not stale:
+                    self._count("misses")
+                    return None
+                self._count("stale_hits")
+            elif entry[1] == days:
+                self._count("hits", stale)
+            else:
+                self._count("superset_hits", stale)
+            fetched_days, payload = entry[1], entry[2]
+        if fetched_days == days:
+            return payload
+        forecast = payload["forecast"]
+        return {**payload, "forecast": {**forecast, "forecastday": forecast["forecastday"][:days]}}
+
+    def put_current(self, city: str, payload: Dict[str, Any]) -> None:
+        with self._lock:
+            self._store(self._current, normalize_city(city), (self._clock(), payload))
+
+    def put_forecast(self, city: str, days: int, payload: Dict[str, Any]) -> None:
+        key = normalize_city(city)
+        with self._lock:
+            entry = self._forecast.get(key)
+            # Keep a longer forecast that is still fresh; it also covers this request.
+            if entry is not None and entry[1] > days and self._fresh(entry[0], self.forecast_ttl):
+                return
+            self._store(self._forecast, key, (self._clock(), days, payload))
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns:
+            dict: hits, superset_hits, misses, hit_rate, expired payloads served
+            while WeatherAPI was unavailable (stale_hits) and cached city counts.
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats["cached_current"] = len(self._current)
+            stats["cached_forecasts"] = len(self._forecast)
+        lookups = stats["hits"] + stats["superset_hits"] + stats["misses"]
+        stats["hit_rate"] = round((stats["hits"] + stats["superset_hits"]) / lookups, 3) if lookups else 0.0
+        return stats
+
+    def clear(self) -> None:
+        with self._lock:
+            self._current.clear()
+            self._forecast.clear()
@@ -0,0 +1,145 @@
+"""
+Columnar extraction and rendering of WeatherAPI forecast payloads.
+
+Each table (daily, hourly, current) is extracted in one pass over the payload
+into named columns: scalar fields are pulled with a single `itemgetter` call
+per row, the hourly `time` field is split once, and the six pollutant readings
+are collected into one float array and classified together. A single row
+(current weather) is classified by the scalar `air_quality` instead, which
+costs a fraction of numpy's per-call overhead. The columns are then rendered
+in the requested output format:
+
+    "csv"      The original `a, b, c` CSV text, byte for byte.
+    "compact"  `a,b,c` without padding, and columns that hold the same value in
+               every row (e.g. the date of an hourly forecast) hoisted into a
+               single `name=value;...` line above the header.
+"""
+from operator import itemgetter
+from typing import Any, Dict, List
+
+import numpy as np
+
+from .aqi import AIR_QUALITY_KEYS, air_quality, classify_air_quality
+
+OUTPUT_FORMATS = ("csv", "compact")
+
+DAILY_COLUMNS = [
+    "date", "avg_temp_c", "max_temp_c", "min_temp_c", "max_wind_kph", "avg_humidity", "avg_visibility",
+    "daily_chance_of_rain", "uv", "condition", "precipitation_mm", "snow_cm", "air_quality",
+]
+HOURLY_COLUMNS = [
+    "date", "hour", "temp_c", "wind_kph", "humidity", "visibility_km", "precipitation_mm", "uv",
+    "condition", "will_it_rain", "will_it_snow", "snow_cm", "air_quality",
+]
+CURRENT_COLUMNS = [
+    "last_updated", "temp_c", "wind_kph", "pressure_in", "humidity", "visibility_km", "precipitation_mm",
+    "uv", "condition", "air_quality",
+]
+
+_DAILY_FIELDS = itemgetter(
+    "avgtemp_c", "maxtemp_c", "mintemp_c", "maxwind_kph", "avghumidity", "avgvis_km",
+    "daily_chance_of_rain", "uv", "condition", "totalprecip_mm", "totalsnow_cm", "air_quality",
+)
+_HOURLY_FIELDS = itemgetter(
+    "time", "temp_c", "wind_kph", "humidity", "vis_km", "precip_mm", "uv",
+    "condition", "will_it_rain", "will_it_snow", "snow_cm", "air_quality",
+)
+_CURRENT_FIELDS = itemgetter(
+    "last_updated", "temp_c", "wind_kph", "pressure_in", "humidity", "vis_km", "precip_mm",
+    "uv", "condition", "air_quality",
+)
+_POLLUTANTS = itemgetter(*AIR_QUALITY_KEYS)
+
+
+def _air_quality_column(readings: tuple) -> List[str]:
+    """
+    Classifies a column of `air_quality` dicts with the same labels as get_air_quality
+    (values rounded to 3 decimals, None giving "Invalid Data").
+    """
+    if len(readings) == 1:
+        so2, no2, pm10, pm2_5, o3, co = values = _POLLUTANTS(readings[0])
+        if None in values:
+            return ["Invalid Data"]
+        return [air_quality(
+            round(so2, 3), round(no2, 3), round(pm10, 3), round(pm2_5, 3), round(o3, 3), round(co, 3)
+        )]
+    flat = [value for reading in readings for value in _POLLUTANTS(reading)]
+    missing = np.array([value is None for value in flat], dtype=bool) if None in flat else None
+    return classify_air_quality(np.array(flat, dtype=float), missing, decimals=3)
+
+
+def _conditions(conditions: tuple) -> List[str]:
+    return [condition["text"] for condition in conditions]
+
+
+def extract_daily(forecastday: List[Dict[str, Any]]) -> Dict[str, list]:
+    """
+    Returns:
+        Dict[str, list]: One list per DAILY_COLUMNS entry, one value per day.
+    """
+    if not forecastday:
+        return {name: [] for name in DAILY_COLUMNS}
+    (avg_temp, max_temp, min_temp, max_wind, humidity, visibility, rain,
+     uv, condition, precipitation, snow, air_quality) = zip(*(_DAILY_FIELDS(day["day"]) for day in forecastday))
+    return dict(zip(DAILY_COLUMNS, [
+        [day["date"] for day in forecastday], avg_temp, max_temp, min_temp, max_wind, humidity, visibility,
+        rain, uv, _conditions(condition), precipitation, snow, _air_quality_column(air_quality),
+    ]))
+
+
+def extract_hourly(hours: List[Dict[str, Any]]) -> Dict[str, list]:
+    """
+    Returns:
+        Dict[str, list]: One list per HOURLY_COLUMNS entry, one value per hour.
+    """
+    if not hours:
+        return {name: [] for name in HOURLY_COLUMNS}
+    (time, temp, wind, humidity, visibility, precipitation, uv,
+     condition, will_it_rain, will_it_snow, snow, air_quality) = zip(*map(_HOURLY_FIELDS, hours))
+    date, hour = zip(*(value.split(' ')[:2] for value in time))
+    return dict(zip(HOURLY_COLUMNS, [
+        date, hour, temp, wind, humidity, visibility, precipitation, uv,
+        _conditions(condition), will_it_rain, will_it_snow, snow, _air_quality_column(air_quality),
+    ]))
+
+
+def extract_current(current: Dict[str, Any]) -> Dict[str, list]:
+    """
+    Returns:
+        Dict[str, list]: One single-value list per CURRENT_COLUMNS entry.
+    """
+    (last_updated, temp, wind, pressure, humidity, visibility, precipitation,
+     uv, condition, air_quality) = _CURRENT_FIELDS(current)
+    return dict(zip(CURRENT_COLUMNS, [
+        [last_updated.split(' ')[1]], [temp], [wind], [pressure], [humidity], [visibility], [precipitation],
+        [uv], [condition["text"]], _air_quality_column((air_quality,)),
+    ]))
+
+
+def render(columns: Dict[str, list], output_format: str = "csv") -> str:
+    """
+    Renders extracted columns as text.
+    Args:
+        columns (Dict[str, list]): Column name to values, as returned by the extract_* functions.
+        output_format (str): "csv" (byte-identical to the original output) or "compact".
+    Returns:
+        str: The rendered table.
+    """
+    if output_format == "csv":
+        lines = [", ".join(columns)]
+        lines.extend(", ".join(map(str, row)) for row in zip(*columns.values()))
+        return "\n".join(lines)
+    if output_format == "compact":
+        constant = {}
+        varying = {}
+        for name, values in columns.items():
+            if len(values) > 1 and all(value == values[0] for value in values):
+                constant[name] = values[0]
+            else:
+                varying[name] = values
+        lines = [";".join(f"{name}={value}" for name, value in constant.items())] if constant else []
+        if varying:
+            lines.append(",".join(varying))
+            lines.extend(",".join(map(str, row)) for row in zip(*varying.values()))
+        return "\n".join(lines)
+    raise ValueError(f"output_format must be one of {', '.join(OUTPUT_FORMATS)}")
@@ -1 +1,9 @@
-from .loader import *
\ No newline at end of file
+import os
+
+from .loader import *
+from .loader import __getattr__
+
+# MCPTOOLS_EAGER_LOAD=1 restores the old behaviour of building everything at import.
+# Here rather than in loader.py, so the modules it builds can import from MCPTools.loader.
+if os.getenv("MCPTOOLS_EAGER_LOAD", "").lower() in ("1", "true", "yes"):
+    registry.preload()
@@ -0,0 +1,277 @@
+"""
+Token-budgeted compaction of tool results.
+
+Every tool result passes through `compact_result` on its way to the client
+(see server.py). A tool declares its budget with `@token_budget(...)` under
+`@mcp.tool()`; its result is then
+    1. projected to the declared fields ("results[].url" keeps `url` in every
+       item of the `results` list; other keys are dropped),
+    2. deduplicated: search results whose URL was already listed are dropped,
+    3. truncated to the budget: long strings are cut at a line or word
+       boundary, and lists and dicts keep their leading entries. What was cut
+       is described under a "_truncated" key (or a trailing note for text).
+Batch and data tools (price predictions, crypto history, weather) declare
+`token_budget(None)`: their results are only serialized compactly, never cut.
+Dict and list results are serialized as JSON without indentation. Tokens are
+estimated locally (see estimate_tokens), so budgets are approximate; the
+estimate leans high.
+
+Budgets can be changed without code changes:
+    TOKEN_BUDGET_<TOOL>     e.g. TOKEN_BUDGET_WIKIPEDIA_SEARCH=3000; "off" disables truncation for that tool
+    TOOL_OUTPUT_COMPACTION  (default 1) "0" sends every result verbatim
+"""
+import json
+import os
+import re
+import threading
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+# Letter runs, digit runs, and the rest (newlines with any indentation, runs of spaces,
+# single symbols): roughly the pieces a BPE tokenizer splits JSON, CSV and prose into.
+_LETTERS = re.compile(r"[^\W\d_]+")
+_DIGITS = re.compile(r"\d+")
+_OTHER = re.compile(r"\s*\n\s*| {2,}|[^\w\s]")
+
+
+class Budget(NamedTuple):
+    tokens: Optional[int]
+    fields: Tuple[str, ...] = ()
+
+
+def token_budget(tokens: Optional[int], fields: Sequence[str] = ()) -> Callable:
+    """
+    Declares a tool's output budget. Place it under @mcp.tool(); the function is returned unchanged.
+    Args:
+        tokens (int): Approximate token budget for the result; None to only project and deduplicate.
+        fields (Sequence[str]): Dotted paths to keep, "[]" marking list items, e.g. "results[].title".
+    """
+    def declare(fn: Callable) -> Callable:
+        fn.token_budget = Budget(tokens, tuple(fields))
+        return fn
+    return declare
+
+
+def enabled() -> bool:
+    return os.getenv("TOOL_OUTPUT_COMPACTION", "1").lower() not in ("0", "false", "no")
+
+
+def budget_for(name: str, fn: Optional[Callable]) -> Optional[Budget]:
+    """
+    Returns:
+        Optional[Budget]: The tool's declared budget with any TOKEN_BUDGET_<TOOL> override, or None.
+    """
+    budget = getattr(fn, "token_budget", None)
+    override = os.getenv(f"TOKEN_BUDGET_{name.upper()}")
+    if override:
+        tokens = None if override.lower() in ("off", "none", "0") else int(override)
+        budget = Budget(tokens, budget.fields if budget else ())
+    return budget
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Approximate token count without a tokenizer vocabulary: a letter run counts one
+    token per 4 letters, a digit run one per 3 digits, and every other piece one.
+    """
+    return (
+        sum((len(run) + 3) // 4 for run in _LETTERS.findall(text))
+        + sum((len(run) + 2) // 3 for run in _DIGITS.findall(text))
+        + len(_OTHER.findall(text))
+    )
+
+
+def serialize(value: Any) -> str:
+    return value if isinstance(value, str) else json.dumps(value, ensure_ascii=False, separators=(",", ":"), default=str)
+
+
+def _tokens(value: Any) -> int:
+    return estimate_tokens(serialize(value))
+
+
+def project(value: Any, fields: Sequence[str]) -> Any:
+    """
+    Keeps only the given dotted paths of a dict result; other values pass through.
+    """
+    if not fields or not isinstance(value, dict):
+        return value
+    tree: Dict[str, Any] = {}
+    for field in fields:
+        node = tree
+        for part in field.split("."):
+            node = node.setdefault(part, {})
+
+    def keep(value: Any, tree: Dict[str, Any]) -> Any:
+        if not tree:
+            return value
+        if isinstance(value, list):
+            return [keep(item, tree) for item in value]
+        if not isinstance(value, dict):
+            return value
+        kept = {}
+        for key, subtree in tree.items():
+            name, is_list = (key[:-2], True) if key.endswith("[]") else (key, False)
+            if name in value:
+                item = value[name]
+                kept[name] = [keep(entry, subtree) for entry in item] if is_list and isinstance(item, list) else keep(item, subtree)
+        return kept
+
+    # Errors and other results without the declared fields are left alone.
+    projected = keep(value, tree)
+    return projected if projected else value
+
+
+def dedupe(value: Any) -> Any:
+    """
+    Drops search results (dicts with a "url") that repeat an earlier item's URL, recursively.
+    Scalars and other items are never dropped: list positions may carry meaning
+    (one prediction per input row, one result per query).
+    """
+    if isinstance(value, dict):
+        return {key: dedupe(item) for key, item in value.items()}
+    if not isinstance(value, list):
+        return value
+    seen, kept = set(), []
+    for item in value:
+        url = item.get("url") if isinstance(item, dict) else None
+        if url and url in seen:
+            continue
+        if url:
+            seen.add(url)
+        kept.append(dedupe(item))
+    return kept
+
+
+def _cut_text(text: str, tokens: int, size: int) -> str:
+    # Scale by the text's own token density, then back off until it fits.
+    end = int(len(text) * tokens / size)
+    while end > 0 and estimate_tokens(text[:end]) > tokens:
+        end = int(end * 0.9)
+    cut = text[:end]
+    boundary = max(cut.rfind("\n"), cut.rfind(" "))
+    if boundary > end * 0.8:
+        cut = cut[:boundary]
+    return cut.rstrip()
+
+
+def _fit(value: Any, tokens: int, path: str, notes: List[str], size: Optional[int] = None) -> Any:
+    size = _tokens(value) if size is None else size
+    if size <= tokens:
+        return value
+    label = path or "result"
+    if isinstance(value, str):
+        cut = _cut_text(value, max(tokens - 8, 1), size)
+        notes.append(f"{label}: cut from ~{size} to ~{estimate_tokens(cut)} tokens")
+        return cut
+    if isinstance(value, list):
+        kept, used = [], 2
+        for item in value:
+            cost = _tokens(item) + 1
+            if used + cost > tokens:
+                if not kept:
+                    kept.append(_fit(item, tokens - used, f"{label}[0]", notes))
+                break
+            kept.append(item)
+            used += cost
+        if len(kept) < len(value):
+            notes.append(f"{label}: kept {len(kept)} of {len(value)} items")
+        return kept
+    if isinstance(value, dict):
+        # Small values are kept whole; the budget left is shared equally by the large ones.
+        overhead = {key: estimate_tokens(json.dumps(key)) + 2 for key in value}
+        sizes = {key: _tokens(item) for key, item in value.items()}
+        remaining = tokens - 2 - sum(overhead.values())
+        shares = {}
+        for i, key in enumerate(sorted(value, key=sizes.get)):
+            shares[key] = min(sizes[key], max(remaining // (len(value) - i), 0))
+            remaining -= shares[key]
+        fitted, used, dropped = {}, 2, 0
+        for key, item in value.items():
+            if shares[key] < sizes[key]:
+                item = _fit(item, shares[key], f"{path}.{key}" if path else key, notes, sizes[key]) if shares[key] else item
+            cost = overhead[key] + (sizes[key] if item is value[key] else _tokens(item))
+            if used + cost > tokens and fitted:
+                dropped += 1
+                continue
+            fitted[key] = item
+            used += cost
+        if dropped:
+            notes.append(f"{label}: dropped {dropped} of {len(value)} entries")
+        return fitted
+    return value
+
+
+def truncate(value: Any, tokens: int) -> Tuple[Any, List[str]]:
+    """
+    Returns:
+        Tuple[Any, List[str]]: The value fitted to about `tokens` tokens, and what was cut.
+    """
+    notes: List[str] = []
+    # Leave room for the note itself.
+    fitted = _fit(value, max(tokens - 30, tokens // 2), "", notes)
+    return fitted, notes
+
+
+class CompactionStats:
+    """
+    Per-tool estimated tokens before (verbatim, as FastMCP would send it) and after compaction.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tools: Dict[str, Dict[str, int]] = {}
+
+    def record(self, tool: str, before: int, after: int, truncated: bool) -> None:
+        with self._lock:
+            counters = self._tools.setdefault(tool, {"calls": 0, "tokens_in": 0, "tokens_out": 0, "truncated": 0})
+            counters["calls"] += 1
+            counters["tokens_in"] += before
+            counters["tokens_out"] += after
+            counters["truncated"] += truncated
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Returns:
+            dict: Per tool: calls, tokens_in, tokens_out, tokens_saved, saved_pct and
+            truncated (calls cut to the budget), plus a "total" row.
+        """
+        with self._lock:
+            tools = {tool: dict(counters) for tool, counters in self._tools.items()}
+        if tools:
+            tools["total"] = {name: sum(counters[name] for counters in tools.values()) for name in ("calls", "tokens_in", "tokens_out", "truncated")}
+        for counters in tools.values():
+            counters["tokens_saved"] = counters["tokens_in"] - counters["tokens_out"]
+            counters["saved_pct"] = round(100 * counters["tokens_saved"] / counters["tokens_in"], 1) if counters["tokens_in"] else 0.0
+        return tools
+
+    def reset(self) -> None:
+        with self._lock:
+            self._tools.clear()
+
+
+def compact_result(name: str, result: Any, budget: Optional[Budget], stats: Optional[CompactionStats] = None) -> Tuple[Any, str]:
+    """
+    Args:
+        name (str): Tool name, for the statistics.
+        result: The tool's return value.
+        budget (Budget): From budget_for(); None only serializes compactly.
+        stats (CompactionStats): Where to record the tokens saved.
+    Returns:
+        Tuple[Any, str]: The compacted result (for structured output) and its text for the client.
+    """
+    before = None
+    if stats is not None:
+        verbatim = result if isinstance(result, str) else json.dumps(result, ensure_ascii=False, indent=2, default=str)
+        before = estimate_tokens(verbatim)
+    notes: List[str] = []
+    if budget is not None:
+        result = dedupe(project(result, budget.fields))
+        if budget.tokens is not None:
+            result, notes = truncate(result, budget.tokens)
+            if notes and isinstance(result, dict):
+                result = {**result, "_truncated": "; ".join(notes)}
+    text = serialize(result)
+    if notes and isinstance(result, str):
+        text = result = f"{result}\n[truncated: {'; '.join(notes)}]"
+    if stats is not None:
+        stats.record(name, before, estimate_tokens(text), bool(notes))
+    return result, text
@@ -0,0 +1,206 @@
+"""
+Local store for Alpha Vantage DIGITAL_CURRENCY_DAILY series.
+
+Every (symbol, market) series is kept in one SQLite table whose primary key is
+(symbol, market, date), stored WITHOUT ROWID so the rows live in the key's
+B-tree: a date lookup is a single O(log n) index probe and a date range is one
+contiguous index scan. Values are kept as the strings Alpha Vantage returns,
+so tools answer exactly what the API would have.
+
+A series is refreshed only when it is stale: its newest stored day is older
+than the day asked for (or than today, UTC), or is today and so still in
+progress, and it has not been checked in the last `recheck_interval` seconds.
+A refresh writes only the days from the newest stored one onwards; that day is
+rewritten because Alpha Vantage publishes the current day while it is still in
+progress.
+"""
+import datetime
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+SERIES_KEY = "Time Series (Digital Currency Daily)"
+FIELDS = ("open", "high", "low", "close", "volume")
+_API_FIELDS = ("1. open", "2. high", "3. low", "4. close", "5. volume")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS daily (
+    symbol TEXT NOT NULL,
+    market TEXT NOT NULL,
+    date TEXT NOT NULL,
+    open TEXT, high TEXT, low TEXT, close TEXT, volume TEXT,
+    PRIMARY KEY (symbol, market, date)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS series (
+    symbol TEXT NOT NULL,
+    market TEXT NOT NULL,
+    checked_at REAL NOT NULL,
+    PRIMARY KEY (symbol, market)
+);
+"""
+
+
+def series_key(symbol: str, market: str) -> Tuple[str, str]:
+    return str(symbol).strip().upper(), str(market).strip().upper()
+
+
+def today_utc() -> str:
+    return datetime.datetime.now(datetime.timezone.utc).date().isoformat()
+
+
+class CryptoStore:
+    """
+    Daily crypto series persisted in SQLite, safe to share between threads.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        recheck_interval: Optional[float] = None,
+        clock: Callable[[], float] = time.time,
+        today: Callable[[], str] = today_utc,
+    ):
+        self.path = path
+        self.recheck_interval = (
+            recheck_interval if recheck_interval is not None else float(os.getenv("CRYPTO_STORE_RECHECK", 3600))
+        )
+        self._clock = clock
+        self._today = today
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(_SCHEMA)
+        self._stats = {"lookups": 0, "hits": 0, "refreshes": 0, "days_written": 0}
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+    def clear(self) -> None:
+        """
+        Deletes every stored series.
+        """
+        with self._lock:
+            self._db.execute("DELETE FROM daily")
+            self._db.execute("DELETE FROM series")
+
+    def newest(self, symbol: str, market: str) -> Optional[str]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT max(date) FROM daily WHERE symbol = ? AND market = ?", series_key(symbol, market)
+            ).fetchone()
+        return row[0]
+
+    def is_stale(self, symbol: str, market: str, until: Optional[str] = None) -> bool:
+        """
+        Args:
+            until (str): The latest day the caller needs ("YYYY-MM-DD"); defaults to today (UTC).
+        Returns:
+            bool: True when the series has no data up to `until`, or only today's
+            partial day, and was not checked recently.
+        """
+        key = series_key(symbol, market)
+        with self._lock:
+            newest, checked_at = self._db.execute(
+                "SELECT (SELECT max(date) FROM daily WHERE symbol = ?1 AND market = ?2),"
+                " (SELECT checked_at FROM series WHERE symbol = ?1 AND market = ?2)",
+                key,
+            ).fetchone()
+        today = self._today()
+        needed = min(until or today, today)
+        # Today's values change until the day closes, so a series that ends today is rechecked
+        # like one with days missing when today is the day asked for.
+        if newest is not None and (newest > needed or newest == needed != today):
+            return False
+        return checked_at is None or self._clock() - checked_at >= self.recheck_interval
+
+    def update(self, symbol: str, market: str, series: Dict[str, Dict[str, Any]]) -> int:
+        """
+        Stores the days of an Alpha Vantage series that are not older than the newest stored day.
+        Returns:
+            int: The number of days written.
+        """
+        key = series_key(symbol, market)
+        newest = self.newest(symbol, market) or ""
+        rows = [
+            (*key, day, *(values.get(field) for field in _API_FIELDS))
+            for day, values in series.items()
+            if day >= newest
+        ]
+        with self._lock:
+            self._db.execute("BEGIN")
+            try:
+                self._db.executemany("INSERT OR REPLACE INTO daily VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+                self._db.execute("INSERT OR REPLACE INTO series VALUES (?, ?, ?)", (*key, self._clock()))
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+            self._stats["refreshes"] += 1
+            self._stats["days_written"] += len(rows)
+        return len(rows)
+
+    def day(self, symbol: str, market: str, date: str) -> Optional[Dict[str, str]]:
+        """
+        Returns:
+            Optional[Dict[str, str]]: {"open", "high", "low", "close", "volume"} for the date, or None.
+        """
+        with self._lock:
+            row = self._db.execute(
+                "SELECT open, high, low, close, volume FROM daily WHERE symbol = ? AND market = ? AND date = ?",
+                (*series_key(symbol, market), str(date).strip()),
+            ).fetchone()
+            self._stats["lookups"] += 1
+            self._stats["hits"] += row is not None
+        return dict(zip(FIELDS, row)) if row else None
+
+    def days(self, symbol: str, market: str, start: str = "", end: str = "") -> List[Dict[str, str]]:
+        """
+        Returns:
+            List[Dict[str, str]]: {"date", "open", "high", "low", "close", "volume"} for every
+            stored day from start to end (inclusive, "" for unbounded), oldest first.
+        """
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT date, open, high, low, close, volume FROM daily"
+                " WHERE symbol = ? AND market = ? AND date >= ? AND date <= ? ORDER BY date",
+                (*series_key(symbol, market), start or "", end or "9999-12-31"),
+            ).fetchall()
+        return [dict(zip(("date",) + FIELDS, row)) for row in rows]
+
+    def ohlc(self, symbol: str, market: str, start: str = "", end: str = "") -> Tuple[List[str], np.ndarray]:
+        """
+        Returns:
+            Tuple[List[str], np.ndarray]: The dates from start to end and an (n, 4) float
+            array of their open, high, low and close, ready for PricePipeline.predict.
+        """
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT date, open, high, low, close FROM daily"
+                " WHERE symbol = ? AND market = ? AND date >= ? AND date <= ? ORDER BY date",
+                (*series_key(symbol, market), start or "", end or "9999-12-31"),
+            ).fetchall()
+        if not rows:
+            return [], np.empty((0, 4))
+        return [row[0] for row in rows], np.array([row[1:] for row in rows], dtype=float)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns:
+            dict: Lookups and hits, refreshes and days written, and stored days per series.
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats["series"] = {
+                f"{symbol}/{market}": {"days": days, "oldest": oldest, "newest": newest}
+                for symbol, market, days, oldest, newest in self._db.execute(
+                    "SELECT symbol, market, count(*), min(date), max(date) FROM daily GROUP BY symbol, market"
+                )
+            }
+        return stats
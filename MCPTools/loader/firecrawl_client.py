@@ -0,0 +1,46 @@
+"""
+AsyncFirecrawlApp on the shared AsyncHTTPClient.
+
+The SDK opens an aiohttp.ClientSession for every request and retries on its
+own, so each call paid a new handshake and skipped the firecrawl rate limit
+and circuit breaker. PooledAsyncFirecrawlApp keeps the SDK's methods, payloads
+and error messages but sends every request through the shared client, which
+pools connections, paces, retries and trips the breaker for all tools alike.
+"""
+from typing import Any, Dict, Optional
+
+import aiohttp
+from firecrawl import AsyncFirecrawlApp
+
+from .http_client import AsyncHTTPClient
+
+
+class PooledAsyncFirecrawlApp(AsyncFirecrawlApp):
+    def __init__(self, http: AsyncHTTPClient, api_key: Optional[str] = None, api_url: Optional[str] = None):
+        super().__init__(api_key=api_key, api_url=api_url)
+        self._http = http
+
+    async def _async_request(
+            self,
+            method: str,
+            url: str,
+            headers: Dict[str, str],
+            data: Optional[Dict[str, Any]] = None,
+            retries: int = 3,
+            backoff_factor: float = 0.5) -> Dict[str, Any]:
+        # retries/backoff_factor are the SDK's; the shared client retries 429s itself, and 5xx only
+        # for the GET status polls, so a failed POST never starts a second crawl or research job.
+        response = await self._http.request(method, url, headers=headers, json=data)
+        if response.status_code >= 300:
+            try:
+                error_data = response.json()
+                error_message = error_data.get("error", "No error message provided.")
+                error_details = error_data.get("details", "No additional error details provided.")
+            except ValueError:
+                raise aiohttp.ClientError(
+                    f"Failed to parse Firecrawl error response as JSON. Status code: {response.status_code}"
+                )
+            raise aiohttp.ClientError(await self._get_async_error_message(
+                response.status_code, f"make {method} request", error_message, error_details
+            ))
+        return response.json()
@@ -0,0 +1,408 @@
+"""
+Upstream health probes and per-provider circuit breakers.
+
+Every request through the shared HTTP clients, the Tavily and Firecrawl SDKs'
+included, passes its provider's circuit breaker:
+    closed     requests go through; `failure_threshold` outages in a row open it
+    open       requests fail at once with CircuitOpen, without waiting out a
+               timeout; after `reset_timeout` seconds the breaker half-opens
+    half_open  one trial request goes through (the rest still fail fast); its
+               outcome closes the breaker or opens it again
+An outage is a connection error or timeout, or a 5xx answer after the rate
+limiter's retries; 4xx answers and 429s mean the provider is up.
+
+Background probes run by default, at a low rate (one request per provider
+every five minutes). They start with the first request through the shared
+async client, in the server's event loop, and every `interval` seconds probe
+each provider in PROBES that the server has sent requests to, with a cheap
+request that costs no API quota (MangaDex through its status page). A server
+that never calls out, or HEALTH_PROBES=off, sends none; an outage is then only
+found by failing calls. A failed probe opens the breaker straight away, so
+calls fail fast before any of them has timed out; a successful one closes a
+breaker the probes opened, or half-opens one opened by failing calls.
+
+Tools with local data answer from it while their provider's breaker is open
+(expired weather payloads, the offline Wikipedia index, the stored crypto
+series).
+
+Configuration:
+    CIRCUIT_BREAKERS            "off" sends every request straight through
+    CIRCUIT_FAILURE_THRESHOLD   (default 5)  outages in a row that open a breaker
+    CIRCUIT_RESET_TIMEOUT       (default 30) seconds open before a trial request
+    HEALTH_PROBES               (default on) "off" stops the background probes
+    HEALTH_PROBE_INTERVAL       (default 300) seconds between probes
+    HEALTH_PROBE_TIMEOUT        (default 5)  seconds a probe may take
+"""
+import asyncio
+import logging
+import os
+import threading
+import time
+from collections import Counter
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+import httpx
+
+from .upstreams import upstream_url
+
+logger = logging.getLogger(__name__)
+
+STATES = ("closed", "open", "half_open")
+
+# MangaDex status page components whose status means the API is down.
+_OUTAGE_STATUSES = ("major outage",)
+
+
+class CircuitOpen(Exception):
+    def __init__(self, service: str, retry_in: float, reason: str = ""):
+        detail = f" ({reason})" if reason else ""
+        super().__init__(f"{service} is unavailable{detail}; failing fast, next attempt in {retry_in:.0f} s")
+        self.service = service
+        self.retry_in = retry_in
+        self.reason = reason
+
+
+def is_outage(error: BaseException) -> bool:
+    """
+    Returns:
+        bool: Whether an exception means the provider could not be reached
+        (connection errors and timeouts).
+    """
+    return isinstance(error, (httpx.TransportError, OSError))
+
+
+def mangadex_components(html: str) -> Dict[str, str]:
+    """
+    Returns:
+        Dict[str, str]: Component name -> status ("Operational", "Major Outage", ...)
+        from the MangaDex status page.
+    """
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, "html.parser")
+    names = soup.find_all("span", class_="name")
+    statuses = soup.find_all("span", class_="component-status")
+    return {name.text.strip(): status.text.strip() for name, status in zip(names, statuses)}
+
+
+Get = Callable[[str], Awaitable[httpx.Response]]
+
+
+def _path_probe(service: str, path: str) -> Callable[[Get], Awaitable[Tuple[bool, str]]]:
+    async def probe(get: Get) -> Tuple[bool, str]:
+        response = await get(upstream_url(service, path))
+        return response.status_code < 500, f"HTTP {response.status_code}"
+
+    return probe
+
+
+async def _mangadex_probe(get: Get) -> Tuple[bool, str]:
+    try:
+        response = await get(upstream_url("mangadex_status"))
+        components = mangadex_components(response.text) if response.status_code < 500 else {}
+    except httpx.TransportError:
+        components = {}
+    if "API" not in components:
+        # No status page to go by; ask the API itself.
+        response = await get(upstream_url("mangadex", "/ping"))
+        return response.status_code < 500, f"HTTP {response.status_code}"
+    return components["API"].lower() not in _OUTAGE_STATUSES, f"API {components['API']}"
+
+
+# Service -> probe(get) returning (healthy, detail). Probes only need the provider
+# to answer: a 401 or 404 from an unauthenticated request is healthy.
+PROBES: Dict[str, Callable[[Get], Awaitable[Tuple[bool, str]]]] = {
+    "mangadex": _mangadex_probe,
+    "weatherapi": _path_probe("weatherapi", "/v1/current.json"),
+    "wikipedia": _path_probe("wikipedia", "/w/api.php?action=query&meta=siteinfo&format=json"),
+    "tavily": _path_probe("tavily", "/"),
+    "google": _path_probe("google", "/customsearch/v1"),
+    "firecrawl": _path_probe("firecrawl", "/"),
+}
+
+
+class CircuitBreaker:
+    """
+    Breaker state for one provider; safe to share between threads.
+    """
+
+    def __init__(self, service: str, failure_threshold: int, reset_timeout: float, clock: Callable[[], float]):
+        self.service = service
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.state = "closed"
+        self.reason = ""
+        self._opened_at = 0.0
+        self._opened_by_probe = False
+        self._trial = False
+        self._consecutive = 0
+        self._transitions: Counter = Counter()
+        self._counts = {"calls": 0, "failures": 0, "rejected": 0}
+        self._probe: Optional[Dict[str, Any]] = None
+
+    def _move(self, state: str) -> None:
+        # Caller holds the lock.
+        if state == self.state:
+            return
+        self._transitions[f"{self.state}->{state}"] += 1
+        if state == "open":
+            logger.warning("%s circuit %s -> open (%s)", self.service, self.state, self.reason)
+        else:
+            logger.info("%s circuit %s -> %s", self.service, self.state, state)
+        self.state = state
+        self._trial = False
+        if state == "open":
+            self._opened_at = self._clock()
+        elif state == "closed":
+            self._consecutive = 0
+            self.reason = ""
+
+    def before(self) -> None:
+        """
+        Lets a call through, or raises CircuitOpen. A half-open breaker lets one trial call through.
+        """
+        with self._lock:
+            if self.state == "open":
+                retry_in = self._opened_at + self.reset_timeout - self._clock()
+                if retry_in > 0:
+                    self._counts["rejected"] += 1
+                    raise CircuitOpen(self.service, retry_in, self.reason)
+                self._move("half_open")
+            if self.state == "half_open":
+                if self._trial:
+                    self._counts["rejected"] += 1
+                    raise CircuitOpen(self.service, 0.0, "trial request in flight")
+                self._trial = True
+            self._counts["calls"] += 1
+
+    def success(self) -> None:
+        with self._lock:
+            self._consecutive = 0
+            if self.state == "half_open":
+                self._move("closed")
+
+    def failure(self, reason: str) -> None:
+        with self._lock:
+            self._counts["failures"] += 1
+            self._consecutive += 1
+            if self.state == "half_open" or (self.state == "closed" and self._consecutive >= self.failure_threshold):
+                self.reason = f"{self._consecutive} failed requests in a row, last: {reason}"
+                self._opened_by_probe = False
+                self._move("open")
+
+    def release(self) -> None:
+        """
+        Ends a call that says nothing about the provider's health (cancelled, refused by the rate limiter).
+        """
+        with self._lock:
+            self._trial = False
+
+    def probed(self, healthy: bool, detail: str, seconds: float) -> None:
+        with self._lock:
+            self._probe = {"healthy": healthy, "detail": detail, "ms": round(seconds * 1000, 1), "at": self._clock()}
+            if not healthy and self.state != "open":
+                self.reason = f"health probe: {detail}"
+                self._opened_by_probe = True
+                self._move("open")
+            elif healthy and self.state != "closed":
+                # Probes only show the provider answers; after failing calls, let one real call decide.
+                self._move("closed" if self._opened_by_probe else "half_open")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = {"state": self.state, **self._counts, "consecutive_failures": self._consecutive,
+                     "transitions": dict(self._transitions)}
+            if self.reason:
+                stats["reason"] = self.reason
+            if self._probe is not None:
+                probe = dict(self._probe)
+                probe["age_s"] = round(self._clock() - probe.pop("at"), 1)
+                stats["last_probe"] = probe
+        return stats
+
+
+class HealthMonitor:
+    """
+    Circuit breakers for every upstream service, and the background probes that feed them.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: Optional[int] = None,
+        reset_timeout: Optional[float] = None,
+        interval: Optional[float] = None,
+        probe_timeout: Optional[float] = None,
+        enabled: Optional[bool] = None,
+        probing: Optional[bool] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if enabled is None:
+            enabled = os.getenv("CIRCUIT_BREAKERS", "on").lower() not in ("0", "off", "false", "no")
+        self.enabled = enabled
+        if probing is None:
+            probing = os.getenv("HEALTH_PROBES", "on").lower() not in ("0", "off", "false", "no")
+        self.probing = probing
+        self.failure_threshold = (
+            failure_threshold if failure_threshold is not None else int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", 5))
+        )
+        self.reset_timeout = reset_timeout if reset_timeout is not None else float(os.getenv("CIRCUIT_RESET_TIMEOUT", 30))
+        self.interval = interval if interval is not None else float(os.getenv("HEALTH_PROBE_INTERVAL", 300))
+        self.probe_timeout = probe_timeout if probe_timeout is not None else float(os.getenv("HEALTH_PROBE_TIMEOUT", 5))
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._probes = 0
+
+    def breaker(self, service: str) -> CircuitBreaker:
+        breaker = self._breakers.get(service)
+        if breaker is None:
+            with self._lock:
+                breaker = self._breakers.setdefault(
+                    service, CircuitBreaker(service, self.failure_threshold, self.reset_timeout, self._clock)
+                )
+        return breaker
+
+    def _outcome(self, breaker: CircuitBreaker, result: Any) -> Any:
+        if isinstance(result, httpx.Response) and result.status_code >= 500:
+            breaker.failure(f"HTTP {result.status_code}")
+        else:
+            breaker.success()
+        return result
+
+    def _error(self, breaker: CircuitBreaker, error: BaseException) -> None:
+        if is_outage(error):
+            breaker.failure(type(error).__name__)
+        else:
+            breaker.release()
+
+    def call(self, service: str, send: Callable[[], Any]) -> Any:
+        """
+        Sends a request through the service's breaker from sync code.
+        Args:
+            service (str): A key of UPSTREAMS; "" sends the request straight through.
+            send (callable): Sends the request (with its retries) and returns the response.
+        Raises:
+            CircuitOpen: If the breaker is open.
+        """
+        if not self.enabled or not service:
+            return send()
+        breaker = self.breaker(service)
+        breaker.before()
+        try:
+            result = send()
+        except BaseException as e:
+            self._error(breaker, e)
+            raise
+        return self._outcome(breaker, result)
+
+    async def call_async(self, service: str, send: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Async counterpart of call().
+        """
+        if not self.enabled or not service:
+            return await send()
+        breaker = self.breaker(service)
+        breaker.before()
+        try:
+            result = await send()
+        except BaseException as e:
+            self._error(breaker, e)
+            raise
+        return self._outcome(breaker, result)
+
+    def is_open(self, service: str) -> bool:
+        return self.enabled and service in self._breakers and self._breakers[service].state == "open"
+
+    async def probe(self, service: str, client) -> bool:
+        """
+        Probes one service and feeds the result to its breaker.
+        Args:
+            client (AsyncHTTPClient): Pooled client whose per-host connections the
+                probe uses, bypassing the breakers and rate limits.
+        Returns:
+            bool: Whether the service is healthy.
+        """
+        async def get(url: str) -> httpx.Response:
+            return await client.client_for(urlsplit(url).netloc).get(url)
+
+        start = time.perf_counter()
+        try:
+            healthy, detail = await asyncio.wait_for(PROBES[service](get), self.probe_timeout)
+        except asyncio.TimeoutError:
+            healthy, detail = False, f"no answer within {self.probe_timeout:g} s"
+        except httpx.TransportError as e:
+            healthy, detail = False, type(e).__name__
+        self.breaker(service).probed(healthy, detail, time.perf_counter() - start)
+        with self._lock:
+            self._probes += 1
+        return healthy
+
+    async def probe_all(self, client) -> Dict[str, bool]:
+        """
+        Probes every service in PROBES that has a breaker (that requests were sent to), at once.
+        Returns:
+            Dict[str, bool]: Whether each service is healthy.
+        """
+        with self._lock:
+            services = [service for service in PROBES if service in self._breakers]
+        results = await asyncio.gather(*(self.probe(service, client) for service in services))
+        return dict(zip(services, results))
+
+    async def _run(self, client) -> None:
+        while True:
+            try:
+                await self.probe_all(client)
+            except Exception as e:
+                logger.warning("Health probes failed: %s", e)
+            await asyncio.sleep(self.interval)
+
+    def start(self, client) -> None:
+        """
+        Starts the background probes in the running event loop; does nothing if
+        they are already running there, or if probing or the breakers are off.
+        """
+        if not self.enabled or not self.probing or self.interval <= 0:
+            return
+        loop = asyncio.get_running_loop()
+        if self._task is not None and not self._task.done() and self._loop is loop:
+            return
+        self._loop = loop
+        self._task = loop.create_task(self._run(client))
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def reset(self) -> None:
+        """
+        Resets every breaker (and its counters); all services start closed again.
+        """
+        with self._lock:
+            self._breakers = {
+                service: CircuitBreaker(service, self.failure_threshold, self.reset_timeout, self._clock)
+                for service in self._breakers
+            }
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns:
+            dict: Per service: breaker state, calls let through, outages, calls
+            rejected while open, transitions (e.g. "closed->open": 2), the reason
+            it opened and the last probe (healthy, detail, ms, age_s); and the
+            number of probes run.
+        """
+        with self._lock:
+            breakers = dict(self._breakers)
+            probes = self._probes
+        return {
+            "services": {service: breaker.stats() for service, breaker in sorted(breakers.items())},
+            "probes": probes,
+            "probe_interval_s": self.interval if self.probing else None,
+            "enabled": self.enabled,
+        }
@@ -0,0 +1,339 @@
+"""
+Shared HTTP clients for all tools (HTTPClient for sync code, AsyncHTTPClient for the async tools).
+
+One keep-alive connection pool per upstream host, so repeated tool calls reuse
+TCP+TLS connections instead of handshaking on every request. HTTP/2 is used
+when the optional `h2` package is installed. Every request is traced to count
+how often a connection was reused versus newly opened, and can be passed
+through a per-provider RateLimiter and circuit breaker (HealthMonitor).
+
+Pool sizes and timeouts come from the environment and can be overridden per host:
+    HTTP_MAX_CONNECTIONS      (default 20)  connections per host
+    HTTP_MAX_KEEPALIVE        (default 10)  idle connections kept per host
+    HTTP_KEEPALIVE_EXPIRY     (default 60)  seconds an idle connection is kept
+    HTTP_TIMEOUT              (default 30)  read/write/pool timeout in seconds
+    HTTP_CONNECT_TIMEOUT      (default 10)  connect timeout in seconds
+    HTTP2                     (default auto) "0" to force HTTP/1.1
+"""
+import importlib.util
+import logging
+import os
+import threading
+from typing import Any, Dict, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+from .health import HealthMonitor
+from .rate_limit import IDEMPOTENT_METHODS, RateLimiter
+from .upstreams import service_for_url
+
+# httpx logs every request URL at INFO, and several upstreams take the API key as a query parameter.
+logging.getLogger("httpx").setLevel(logging.WARNING)
+
+
+def _env_float(name: str, default: float) -> float:
+    value = os.getenv(name)
+    return float(value) if value else default
+
+
+def http2_available() -> bool:
+    return importlib.util.find_spec("h2") is not None
+
+
+class ConnectionStats:
+    """
+    Per-host request counters, split by whether the request opened a new connection.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._hosts: Dict[str, Dict[str, int]] = {}
+
+    def record(self, host: str, new_connection: bool, http_version: str = "") -> None:
+        with self._lock:
+            counters = self._hosts.setdefault(host, {"requests": 0, "new_connections": 0, "reused_connections": 0})
+            counters["requests"] += 1
+            counters["new_connections" if new_connection else "reused_connections"] += 1
+            if http_version:
+                counters[http_version] = counters.get(http_version, 0) + 1
+
+    def snapshot(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            return {host: dict(counters) for host, counters in self._hosts.items()}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._hosts.clear()
+
+
+class _TracingTransport(httpx.HTTPTransport):
+    """
+    HTTP transport that records, for every request, whether a new TCP connection was opened.
+    """
+
+    def __init__(self, host: str, stats: ConnectionStats, **kwargs):
+        super().__init__(**kwargs)
+        self._host = host
+        self._stats = stats
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        opened = []
+
+        def trace(event_name: str, info: Dict[str, Any]) -> None:
+            if event_name == "connection.connect_tcp.complete":
+                opened.append(True)
+
+        request.extensions = {**request.extensions, "trace": trace}
+        response = super().handle_request(request)
+        self._stats.record(self._host, bool(opened), response.extensions.get("http_version", b"").decode())
+        return response
+
+
+class _AsyncTracingTransport(httpx.AsyncHTTPTransport):
+    """
+    Async counterpart of _TracingTransport.
+    """
+
+    def __init__(self, host: str, stats: ConnectionStats, **kwargs):
+        super().__init__(**kwargs)
+        self._host = host
+        self._stats = stats
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        opened = []
+
+        async def trace(event_name: str, info: Dict[str, Any]) -> None:
+            if event_name == "connection.connect_tcp.complete":
+                opened.append(True)
+
+        request.extensions = {**request.extensions, "trace": trace}
+        response = await super().handle_async_request(request)
+        self._stats.record(self._host, bool(opened), response.extensions.get("http_version", b"").decode())
+        return response
+
+
+class _PooledClient:
+    """
+    Pool settings, per-host overrides and per-host client bookkeeping shared by
+    HTTPClient and AsyncHTTPClient.
+    """
+
+    def __init__(
+        self,
+        max_connections: Optional[int] = None,
+        max_keepalive_connections: Optional[int] = None,
+        keepalive_expiry: Optional[float] = None,
+        timeout: Optional[float] = None,
+        connect_timeout: Optional[float] = None,
+        http2: Optional[bool] = None,
+        stats: Optional[ConnectionStats] = None,
+        transport: Optional[httpx.BaseTransport | httpx.AsyncBaseTransport] = None,
+        limiter: Optional[RateLimiter] = None,
+        health: Optional[HealthMonitor] = None,
+    ):
+        if http2 is None:
+            http2 = os.getenv("HTTP2", "auto").lower() not in ("0", "false", "no") and http2_available()
+        self.defaults = {
+            "max_connections": max_connections or int(_env_float("HTTP_MAX_CONNECTIONS", 20)),
+            "max_keepalive_connections": max_keepalive_connections or int(_env_float("HTTP_MAX_KEEPALIVE", 10)),
+            "keepalive_expiry": keepalive_expiry or _env_float("HTTP_KEEPALIVE_EXPIRY", 60),
+            "timeout": timeout or _env_float("HTTP_TIMEOUT", 30),
+            "connect_timeout": connect_timeout or _env_float("HTTP_CONNECT_TIMEOUT", 10),
+            "http2": http2,
+        }
+        self.stats = stats or ConnectionStats()
+        # A fixed transport (e.g. httpx.MockTransport) replaces the per-host pools; used by benchmarks.
+        self._transport = transport
+        # Per-provider token buckets and retries (see rate_limit.py); None sends requests straight through.
+        self.limiter = limiter
+        # Per-provider circuit breakers (see health.py); None never fails fast.
+        self.health = health
+        self._host_config: Dict[str, Dict[str, Any]] = {}
+        self._clients: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def configure_host(self, host: str, **overrides) -> None:
+        """
+        Override pool settings for one host (takes effect for a new pool only).
+        Args:
+            host (str): Host name, e.g. "api.weatherapi.com".
+            **overrides: Any of max_connections, max_keepalive_connections,
+                keepalive_expiry, timeout, connect_timeout, http2.
+        """
+        unknown = set(overrides) - set(self.defaults)
+        if unknown:
+            raise ValueError(f"Unknown pool settings: {', '.join(sorted(unknown))}")
+        with self._lock:
+            self._host_config.setdefault(host, {}).update(overrides)
+
+    def settings_for(self, host: str) -> Dict[str, Any]:
+        return {**self.defaults, **self._host_config.get(host, {})}
+
+    def _build(self, host: str, settings: Dict[str, Any]):
+        raise NotImplementedError
+
+    def client_for(self, host: str):
+        """
+        Returns:
+            The pooled httpx client for `host`, created on first use.
+        """
+        client = self._clients.get(host)
+        if client is not None:
+            return client
+        with self._lock:
+            client = self._clients.get(host)
+            if client is None:
+                client = self._build(host, self.settings_for(host))
+                self._clients[host] = client
+        return client
+
+    @staticmethod
+    def _limits(settings: Dict[str, Any]) -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=settings["max_connections"],
+            max_keepalive_connections=settings["max_keepalive_connections"],
+            keepalive_expiry=settings["keepalive_expiry"],
+        )
+
+    @staticmethod
+    def _timeout(settings: Dict[str, Any]) -> httpx.Timeout:
+        return httpx.Timeout(settings["timeout"], connect=settings["connect_timeout"])
+
+    def connection_stats(self) -> Dict[str, Dict[str, int]]:
+        """
+        Returns:
+            Dict[str, Dict[str, int]]: Per host: requests, new_connections,
+            reused_connections and a count per HTTP version.
+        """
+        return self.stats.snapshot()
+
+
+class HTTPClient(_PooledClient):
+    """
+    Pooled HTTP client with one httpx.Client (and connection pool) per host.
+
+    Mirrors the `requests` call style used by the tools: `get(url, params=..., headers=...)`
+    returns a response with `status_code`, `json()` and `text`.
+    """
+
+    def _build(self, host: str, settings: Dict[str, Any]) -> httpx.Client:
+        transport = self._transport or _TracingTransport(
+            host, self.stats, http2=settings["http2"], limits=self._limits(settings)
+        )
+        return httpx.Client(transport=transport, timeout=self._timeout(settings), follow_redirects=True)
+
+    def request(self, method: str, url: str, idempotent: Optional[bool] = None, **kwargs) -> httpx.Response:
+        """
+        idempotent: whether a 5xx answer may be retried; defaults to True for GET and HEAD only.
+        """
+        client = self.client_for(urlsplit(url).netloc)
+        if idempotent is None:
+            idempotent = method.upper() in IDEMPOTENT_METHODS
+
+        def send() -> httpx.Response:
+            if self.limiter is None:
+                return client.request(method, url, **kwargs)
+            return self.limiter.call(url, lambda: client.request(method, url, **kwargs), idempotent=idempotent)
+
+        if self.health is None:
+            return send()
+        return self.health.call(service_for_url(url), send)
+
+    def get(self, url: str, **kwargs) -> httpx.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> httpx.Response:
+        return self.request("POST", url, **kwargs)
+
+    def close(self) -> None:
+        with self._lock:
+            for client in self._clients.values():
+                client.close()
+            self._clients.clear()
+
+
+class AsyncHTTPClient(_PooledClient):
+    """
+    Async pooled HTTP client with one httpx.AsyncClient per host, for the async tools.
+    Pools are bound to the event loop they were first used on (the server's loop).
+    """
+
+    def _build(self, host: str, settings: Dict[str, Any]) -> httpx.AsyncClient:
+        transport = self._transport or _AsyncTracingTransport(
+            host, self.stats, http2=settings["http2"], limits=self._limits(settings)
+        )
+        return httpx.AsyncClient(transport=transport, timeout=self._timeout(settings), follow_redirects=True)
+
+    async def request(self, method: str, url: str, idempotent: Optional[bool] = None, **kwargs) -> httpx.Response:
+        """
+        idempotent: whether a 5xx answer may be retried; defaults to True for GET and HEAD only.
+        """
+        client = self.client_for(urlsplit(url).netloc)
+        if idempotent is None:
+            idempotent = method.upper() in IDEMPOTENT_METHODS
+
+        async def send() -> httpx.Response:
+            if self.limiter is None:
+                return await client.request(method, url, **kwargs)
+            return await self.limiter.call_async(
+                url, lambda: client.request(method, url, **kwargs), idempotent=idempotent
+            )
+
+        if self.health is None:
+            return await send()
+        # Health probes (if on) start with the first upstream request, not with the server.
+        self.health.start(self)
+        return await self.health.call_async(service_for_url(url), send)
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("GET", url, **kwargs)
+
+    def session(self, base_url: str, headers: Dict[str, str], idempotent: Optional[bool] = None) -> "PooledSession":
+        """
+        An httpx.AsyncClient look-alike for SDKs that open a client per call (see PooledSession).
+        idempotent=True lets its POSTs be retried on 5xx too.
+        """
+        return PooledSession(self, base_url, headers, idempotent)
+
+    async def post(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("POST", url, **kwargs)
+
+    async def aclose(self) -> None:
+        clients = list(self._clients.values())
+        self._clients.clear()
+        for client in clients:
+            await client.aclose()
+
+
+class PooledSession:
+    """
+    Stands in for an httpx.AsyncClient(base_url=..., headers=...) that an SDK
+    opens and closes around every call (AsyncTavilyClient does). Requests go
+    through the shared pools, rate limits and circuit breakers; leaving the
+    `async with` block keeps the pooled connections open.
+    """
+
+    def __init__(self, client: AsyncHTTPClient, base_url: str, headers: Dict[str, str], idempotent: Optional[bool] = None):
+        self._client = client
+        self._base_url = base_url.rstrip("/")
+        self._headers = headers
+        self._idempotent = idempotent
+
+    async def __aenter__(self) -> "PooledSession":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        return None
+
+    async def request(self, method: str, path: str, **kwargs) -> httpx.Response:
+        headers = {**self._headers, **(kwargs.pop("headers", None) or {})}
+        return await self._client.request(
+            method, self._base_url + path, idempotent=self._idempotent, headers=headers, **kwargs
+        )
+
+    async def get(self, path: str, **kwargs) -> httpx.Response:
+        return await self.request("GET", path, **kwargs)
+
+    async def post(self, path: str, **kwargs) -> httpx.Response:
+        return await self.request("POST", path, **kwargs)
@@ -0,0 +1,319 @@
+"""
+Background jobs for long-running tools (e.g. deep research).
+
+A tool starts a job and returns its id at once; the work runs as an asyncio
+task in the server's event loop, so other tool calls keep being served, and
+companion tools poll the job's status and fetch its result.
+
+Jobs are kept in a bounded SQLite table so they survive server restarts:
+    - finished jobs are deleted `retention` seconds after they finish, and the
+      oldest finished jobs are evicted when the table holds `max_jobs`;
+    - a new job is refused while `max_jobs` jobs are still active;
+    - jobs that were queued or running when the server stopped are resumed the
+      next time a tool of their kind is used. A handler that records an
+      `upstream_id` (the id of the job on the provider's side) picks up polling
+      it again instead of starting the work over.
+
+Several server processes may share the table (an MCP client starts one stdio
+server per connection). Every active job has an owner (`owner_pid`) that
+refreshes its `heartbeat_at` every third of the lease while it runs the job.
+Another process takes a job over only once its heartbeat is older than the
+lease, and claims it with a conditional UPDATE, so exactly one process
+resumes a job whose owner has stopped.
+
+Configuration:
+    JOBS_LEASE_SECONDS   (default 30) heartbeat age after which a job is resumed elsewhere
+"""
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+ACTIVE = ("queued", "running")
+FINISHED = ("completed", "failed")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    params TEXT NOT NULL,
+    status TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    upstream_id TEXT,
+    progress TEXT,
+    result TEXT,
+    error TEXT,
+    owner_pid INTEGER,
+    heartbeat_at REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, updated_at);
+"""
+_JSON_FIELDS = ("params", "progress", "result")
+# Columns added after the first release; older tables get them on open.
+_ADDED_COLUMNS = {"owner_pid": "INTEGER", "heartbeat_at": "REAL"}
+
+
+def _placeholders(values: tuple) -> str:
+    """
+    Returns:
+        str: "(?, ?, ...)" with one placeholder per value, for an SQL `IN`.
+    """
+    return f"({', '.join('?' * len(values))})"
+
+
+class JobTableFull(Exception):
+    pass
+
+
+class JobTable:
+    """
+    Bounded, persistent job records; safe to share between threads.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_jobs: Optional[int] = None,
+        retention: Optional[float] = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.path = path
+        self.max_jobs = max_jobs if max_jobs is not None else int(os.getenv("JOBS_MAX", 200))
+        self.retention = retention if retention is not None else float(os.getenv("JOBS_RETENTION_HOURS", 24)) * 3600
+        self._clock = clock
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(_SCHEMA)
+        columns = {row["name"] for row in self._db.execute("PRAGMA table_info(jobs)")}
+        for name, kind in _ADDED_COLUMNS.items():
+            if name not in columns:
+                self._db.execute(f"ALTER TABLE jobs ADD COLUMN {name} {kind}")
+        self._evicted = 0
+
+    @staticmethod
+    def _job(row: sqlite3.Row) -> Dict[str, Any]:
+        job = dict(row)
+        for field in _JSON_FIELDS:
+            job[field] = json.loads(job[field]) if job[field] is not None else None
+        return job
+
+    def _evict(self) -> None:
+        # Caller holds the lock.
+        cursor = self._db.execute(
+            f"DELETE FROM jobs WHERE status IN {_placeholders(FINISHED)} AND updated_at < ?",
+            (*FINISHED, self._clock() - self.retention),
+        )
+        self._evicted += cursor.rowcount
+        excess = self._db.execute("SELECT count(*) FROM jobs").fetchone()[0] - self.max_jobs + 1
+        if excess > 0:
+            cursor = self._db.execute(
+                f"DELETE FROM jobs WHERE id IN (SELECT id FROM jobs WHERE status IN {_placeholders(FINISHED)}"
+                " ORDER BY updated_at LIMIT ?)",
+                (*FINISHED, excess),
+            )
+            self._evicted += cursor.rowcount
+
+    def create(self, kind: str, params: Dict[str, Any], owner: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Args:
+            owner (int): The pid of the process that will run the job.
+        Raises:
+            JobTableFull: If max_jobs jobs are still active.
+        """
+        now = self._clock()
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            self._evict()
+            if self._db.execute("SELECT count(*) FROM jobs").fetchone()[0] >= self.max_jobs:
+                raise JobTableFull(f"{self.max_jobs} jobs are already queued or running; try again later")
+            self._db.execute(
+                "INSERT INTO jobs (id, kind, params, status, created_at, updated_at, owner_pid, heartbeat_at)"
+                " VALUES (?, ?, ?, 'queued', ?, ?, ?, ?)",
+                (job_id, kind, json.dumps(params), now, now, owner, now),
+            )
+            row = self._db.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._job(row)
+
+    def update(self, job_id: str, **fields: Any) -> None:
+        """
+        Sets any of status, upstream_id, progress, result and error.
+        """
+        fields = {name: json.dumps(value) if name in _JSON_FIELDS else value for name, value in fields.items()}
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        with self._lock:
+            self._db.execute(
+                f"UPDATE jobs SET {assignments}, updated_at = ? WHERE id = ?",
+                (*fields.values(), self._clock(), job_id),
+            )
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._db.execute("SELECT * FROM jobs WHERE id = ?", (str(job_id).strip(),)).fetchone()
+        if row is None:
+            return None
+        job = self._job(row)
+        if job["status"] in FINISHED and job["updated_at"] < self._clock() - self.retention:
+            return None
+        return job
+
+    def claim(self, kind: str, owner: int, lease: float) -> List[Dict[str, Any]]:
+        """
+        Takes over the kind's active jobs whose heartbeat is older than `lease` seconds
+        (or that have none).
+        Returns:
+            list: The jobs claimed for `owner`; a job another process claimed first is left out.
+        """
+        now = self._clock()
+        expired = now - lease
+        claimed = []
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT id FROM jobs WHERE kind = ? AND status IN {_placeholders(ACTIVE)}"
+                " AND (heartbeat_at IS NULL OR heartbeat_at < ?) ORDER BY created_at",
+                (kind, *ACTIVE, expired),
+            ).fetchall()
+            for row in rows:
+                # Conditional, so of two processes claiming the same job only one gets it.
+                cursor = self._db.execute(
+                    f"UPDATE jobs SET owner_pid = ?, heartbeat_at = ? WHERE id = ? AND status IN {_placeholders(ACTIVE)}"
+                    " AND (heartbeat_at IS NULL OR heartbeat_at < ?)",
+                    (owner, now, row["id"], *ACTIVE, expired),
+                )
+                if cursor.rowcount == 1:
+                    claimed.append(self._job(self._db.execute("SELECT * FROM jobs WHERE id = ?", (row["id"],)).fetchone()))
+        return claimed
+
+    def heartbeat(self, job_ids: List[str], owner: int) -> None:
+        """
+        Refreshes the heartbeat of the jobs `owner` still holds.
+        """
+        if not job_ids:
+            return
+        with self._lock:
+            self._db.execute(
+                f"UPDATE jobs SET heartbeat_at = ? WHERE owner_pid = ? AND id IN {_placeholders(tuple(job_ids))}",
+                (self._clock(), owner, *job_ids),
+            )
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns:
+            dict: Jobs per status, capacity (max_jobs), retention in hours and jobs evicted.
+        """
+        with self._lock:
+            counts = dict(self._db.execute("SELECT status, count(*) FROM jobs GROUP BY status").fetchall())
+            evicted = self._evicted
+        return {"jobs": counts, "max_jobs": self.max_jobs, "retention_hours": self.retention / 3600, "evicted": evicted}
+
+
+# A handler runs one job: handler(job, update) -> result. `update(**fields)` persists
+# progress (and upstream_id) as it goes; an exception marks the job failed.
+Handler = Callable[[Dict[str, Any], Callable[..., None]], Awaitable[Any]]
+
+
+class JobRunner:
+    """
+    Runs jobs from a JobTable as asyncio tasks, one handler per job kind.
+    """
+
+    def __init__(self, table: JobTable, lease: Optional[float] = None, owner: Optional[int] = None):
+        self.table = table
+        self.lease = lease if lease is not None else float(os.getenv("JOBS_LEASE_SECONDS", 30))
+        self.owner = owner if owner is not None else os.getpid()
+        self._handlers: Dict[str, Handler] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._heartbeat: Optional[asyncio.Task] = None
+
+    def register(self, kind: str, handler: Handler) -> None:
+        """
+        Registers the handler for a kind and resumes the kind's unfinished jobs that
+        no live process holds. Must be called from the event loop; later calls for
+        the same kind do nothing.
+        """
+        if kind in self._handlers:
+            return
+        self._handlers[kind] = handler
+        self._start_heartbeat()
+        self._resume(kind)
+
+    def _start_heartbeat(self) -> None:
+        if self._heartbeat is None:
+            self._heartbeat = asyncio.ensure_future(self._beat())
+
+    def _resume(self, kind: str) -> None:
+        for job in self.table.claim(kind, self.owner, self.lease):
+            if job["id"] in self._tasks:
+                continue
+            logger.info("Resuming %s job %s", kind, job["id"])
+            self._spawn(job)
+
+    async def _beat(self) -> None:
+        # Keeps this process's jobs leased and picks up jobs whose owner has stopped.
+        while True:
+            await asyncio.sleep(self.lease / 3)
+            try:
+                self.table.heartbeat(list(self._tasks), self.owner)
+                for kind in list(self._handlers):
+                    self._resume(kind)
+            except sqlite3.Error as e:
+                logger.warning("Job heartbeat failed: %s", e)
+
+    def stop(self) -> None:
+        """
+        Cancels the heartbeat and the running jobs; they stay active in the table and
+        are resumed by a process once the lease runs out.
+        """
+        if self._heartbeat is not None:
+            self._heartbeat.cancel()
+            self._heartbeat = None
+        for task in list(self._tasks.values()):
+            task.cancel()
+
+    def start(self, kind: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Returns:
+            dict: The new job record (status "queued").
+        Raises:
+            JobTableFull: If the table has no room.
+        """
+        job = self.table.create(kind, params, owner=self.owner)
+        self._start_heartbeat()
+        self._spawn(job)
+        return job
+
+    def _spawn(self, job: Dict[str, Any]) -> None:
+        task = asyncio.ensure_future(self._run(job))
+        self._tasks[job["id"]] = task
+        task.add_done_callback(lambda _: self._tasks.pop(job["id"], None))
+
+    async def _run(self, job: Dict[str, Any]) -> None:
+        job_id = job["id"]
+        self.table.update(job_id, status="running")
+        try:
+            result = await self._handlers[job["kind"]](job, lambda **fields: self.table.update(job_id, **fields))
+        except asyncio.CancelledError:
+            # Server shutdown: leave the job active so it is resumed on the next start.
+            raise
+        except Exception as e:
+            logger.warning("%s job %s failed: %s", job["kind"], job_id, e)
+            self.table.update(job_id, status="failed", error=str(e) or type(e).__name__)
+        else:
+            self.table.update(job_id, status="completed", result=result)
+
+    def running(self) -> int:
+        return len(self._tasks)
+
+    def stats(self) -> Dict[str, Any]:
+        return dict(self.table.stats(), tasks=self.running(), lease_seconds=self.lease)
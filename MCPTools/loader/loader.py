@@ -1,25 +1,323 @@
-from tavily import TavilyClient
 from dotenv import load_dotenv
 import os
-from firecrawl import FirecrawlApp
-import joblib
-import requests
-from openai import OpenAI
+from urllib.parse import urlsplit
+from .registry import ResourceRegistry
+from .upstreams import UPSTREAMS, upstream_url
 
 abs_path = os.path.abspath(__file__)
 dir_path = os.path.dirname(abs_path)
 parent_dir = os.path.dirname(dir_path)
 system_dir = os.path.dirname(parent_dir)
 load_dotenv(os.path.join(system_dir, ".env"))
-model = joblib.load(os.path.join(dir_path, "ML-models/voting_regressor.joblib"))
-feature_scaler = joblib.load(os.path.join(dir_path, "ML-models/feature_scaler.joblib"))
-target_scaler = joblib.load(os.path.join(dir_path, "ML-models/target_scaler.joblib"))
 
-client = TavilyClient(api_key=os.getenv("TAVILY_API_KEY"))
 alphavantage_api_key = os.getenv("ALPHAVANTAGE_API")
 weather_api_key = os.getenv("WEATHER_API_KEY")
 search_api = os.getenv("GOOGLE_SEARCH_API_KEY")
 programmable_search_engine_id = os.getenv("PROGRAMMABLE_SEARCH_ENGINE_ID")
 firecrawl_api_key = os.getenv("FIRECRAWL_SANE_API")
-firecrawl_web_search_app = FirecrawlApp(api_key=firecrawl_api_key)
-open_router_open_api_client = OpenAI(api_key=os.getenv("OPENROUTER"), base_url="https://openrouter.ai/api/v1")
\ No newline at end of file
+
+def data_path(filename: str, override: str = "") -> str:
+    """
+    Path of a local store: $<override> if set, else <MCPTOOLS_DATA_DIR>/<filename>
+    (default data directory: ~/.cache/mcptools). Resolved on each call, not at import.
+    """
+    if override and os.getenv(override):
+        return os.getenv(override)
+    data_dir = os.getenv("MCPTOOLS_DATA_DIR") or os.path.join(os.path.expanduser("~"), ".cache", "mcptools")
+    return os.path.join(data_dir, filename)
+
+
+def wikipedia_index_path() -> str:
+    return data_path("wikipedia.sqlite3", "WIKIPEDIA_INDEX_PATH")
+
+
+# Models and API clients are expensive to build (joblib unpickling, SDK imports),
+# so they are only built the first time a tool asks for them.
+registry = ResourceRegistry()
+
+
+def _load_joblib(filename: str):
+    import joblib
+    return joblib.load(os.path.join(dir_path, "ML-models", filename))
+
+
+def _build_tavily_client():
+    from tavily import TavilyClient
+    return TavilyClient(api_key=os.getenv("TAVILY_API_KEY"), api_base_url=upstream_url("tavily"))
+
+
+def _build_firecrawl_app():
+    from firecrawl import FirecrawlApp
+    return FirecrawlApp(api_key=firecrawl_api_key, api_url=upstream_url("firecrawl"))
+
+
+def _build_open_router_client():
+    from openai import OpenAI
+    return OpenAI(
+        api_key=os.getenv("OPENROUTER"),
+        base_url=upstream_url("openrouter", "/api/v1"),
+        http_client=get_http_client().client_for(urlsplit(upstream_url("openrouter")).netloc),
+    )
+
+
+def _build_http_client():
+    from .http_client import HTTPClient
+    return HTTPClient(limiter=get_rate_limiter(), health=get_health_monitor())
+
+
+def _build_async_tavily_client():
+    from tavily import AsyncTavilyClient
+    api_key, base_url = os.getenv("TAVILY_API_KEY"), upstream_url("tavily")
+    client = AsyncTavilyClient(api_key=api_key, api_base_url=base_url)
+    # The SDK opens an httpx.AsyncClient per call; hand it a session on the shared pool instead.
+    headers = {"Content-Type": "application/json", "Authorization": f"Bearer {api_key}", "X-Client-Source": "tavily-python"}
+    # Tavily's POST endpoints (search, extract, crawl, map) only read, so 5xx answers may be retried.
+    client._client_creator = lambda: get_async_http_client().session(base_url, headers, idempotent=True)
+    return client
+
+
+def _build_async_firecrawl_app():
+    from .firecrawl_client import PooledAsyncFirecrawlApp
+    return PooledAsyncFirecrawlApp(get_async_http_client(), api_key=firecrawl_api_key, api_url=upstream_url("firecrawl"))
+
+
+def _build_async_open_router_client():
+    from openai import AsyncOpenAI
+    return AsyncOpenAI(
+        api_key=os.getenv("OPENROUTER"),
+        base_url=upstream_url("openrouter", "/api/v1"),
+        http_client=get_async_http_client().client_for(urlsplit(upstream_url("openrouter")).netloc),
+    )
+
+
+def _build_async_http_client():
+    from .http_client import AsyncHTTPClient
+    # Shares the connection counters, rate limits and circuit breakers with the sync client.
+    return AsyncHTTPClient(stats=get_http_client().stats, limiter=get_rate_limiter(), health=get_health_monitor())
+
+
+def _build_rate_limiter():
+    from .rate_limit import RateLimiter
+    return RateLimiter()
+
+
+def _build_health_monitor():
+    from .health import HealthMonitor
+    return HealthMonitor()
+
+
+def _build_weather_cache():
+    from ..get_weather.cache import WeatherCache
+    return WeatherCache()
+
+
+def _build_price_pipeline():
+    from .predictor import BatchSizeRouter, PricePipeline, load_price_predictor
+
+    def sklearn_pipeline():
+        return PricePipeline(get_feature_scaler(), get_model(), get_target_scaler())
+
+    # MCPTOOLS_FUSED_PREDICTOR=0 runs the sklearn objects instead of the compiled predictor.
+    if os.getenv("MCPTOOLS_FUSED_PREDICTOR", "1").lower() in ("0", "false", "no"):
+        return sklearn_pipeline()
+    predictor = load_price_predictor(
+        os.path.join(dir_path, "ML-models"), get_feature_scaler, get_model, get_target_scaler
+    )
+    if isinstance(predictor, PricePipeline):
+        return predictor
+    # Larger batches go to sklearn, which overtakes the fused predictor at a few hundred rows.
+    return BatchSizeRouter(predictor, sklearn_pipeline, int(os.getenv("MCPTOOLS_FUSED_PREDICTOR_MAX_ROWS", 256)))
+
+
+def _build_single_flight():
+    from .single_flight import SingleFlight
+    return SingleFlight()
+
+
+def _build_wiki_extract_cache():
+    from ..wikipedia.cache import ExtractCache
+    return ExtractCache()
+
+
+def _build_wikipedia_index():
+    from ..wikipedia.index import WikipediaIndex
+    return WikipediaIndex(wikipedia_index_path())
+
+
+def _build_search_latency():
+    from ..search.latency import LatencyTracker
+    return LatencyTracker()
+
+
+def _build_job_runner():
+    from .jobs import JobRunner, JobTable
+    return JobRunner(JobTable(data_path("jobs.sqlite3", "JOBS_PATH")))
+
+
+def _build_manga_summary_cache():
+    from .summary_cache import SummaryCache
+    return SummaryCache(data_path("manga_summaries.sqlite3", "MANGA_SUMMARY_CACHE_PATH"))
+
+
+def _build_summary_cascade():
+    from ..summarize import SummaryCascade
+    return SummaryCascade()
+
+
+def _build_project_tree():
+    from .project_tree import ProjectTree
+    return ProjectTree()
+
+
+def _build_compaction_stats():
+    from .compaction import CompactionStats
+    return CompactionStats()
+
+
+def _build_crypto_store():
+    from .crypto_store import CryptoStore
+    return CryptoStore(data_path("crypto_daily.sqlite3", "CRYPTO_STORE_PATH"))
+
+
+registry.register("model", lambda: _load_joblib("voting_regressor.joblib"))
+registry.register("feature_scaler", lambda: _load_joblib("feature_scaler.joblib"))
+registry.register("target_scaler", lambda: _load_joblib("target_scaler.joblib"))
+registry.register("tavily_client", _build_tavily_client)
+registry.register("firecrawl_app", _build_firecrawl_app)
+registry.register("open_router_client", _build_open_router_client)
+registry.register("http_client", _build_http_client)
+registry.register("async_tavily_client", _build_async_tavily_client)
+registry.register("async_firecrawl_app", _build_async_firecrawl_app)
+registry.register("async_open_router_client", _build_async_open_router_client)
+registry.register("async_http_client", _build_async_http_client)
+registry.register("rate_limiter", _build_rate_limiter)
+registry.register("health_monitor", _build_health_monitor)
+registry.register("weather_cache", _build_weather_cache)
+registry.register("single_flight", _build_single_flight)
+registry.register("price_pipeline", _build_price_pipeline)
+registry.register("crypto_store", _build_crypto_store)
+registry.register("wiki_extract_cache", _build_wiki_extract_cache)
+registry.register("wikipedia_index", _build_wikipedia_index)
+registry.register("search_latency", _build_search_latency)
+registry.register("job_runner", _build_job_runner)
+registry.register("compaction_stats", _build_compaction_stats)
+registry.register("manga_summary_cache", _build_manga_summary_cache)
+registry.register("summary_cascade", _build_summary_cascade)
+registry.register("project_tree", _build_project_tree)
+
+
+def get_model():
+    return registry.get("model")
+
+
+def get_feature_scaler():
+    return registry.get("feature_scaler")
+
+
+def get_target_scaler():
+    return registry.get("target_scaler")
+
+
+def get_tavily_client():
+    return registry.get("tavily_client")
+
+
+def get_firecrawl_app():
+    return registry.get("firecrawl_app")
+
+
+def get_open_router_client():
+    return registry.get("open_router_client")
+
+
+def get_http_client():
+    return registry.get("http_client")
+
+
+def get_async_tavily_client():
+    return registry.get("async_tavily_client")
+
+
+def get_async_firecrawl_app():
+    return registry.get("async_firecrawl_app")
+
+
+def get_async_open_router_client():
+    return registry.get("async_open_router_client")
+
+
+def get_async_http_client():
+    return registry.get("async_http_client")
+
+
+def get_rate_limiter():
+    return registry.get("rate_limiter")
+
+
+def get_health_monitor():
+    return registry.get("health_monitor")
+
+
+def get_weather_cache():
+    return registry.get("weather_cache")
+
+
+def get_single_flight():
+    return registry.get("single_flight")
+
+
+def get_price_pipeline():
+    return registry.get("price_pipeline")
+
+
+def get_crypto_store():
+    return registry.get("crypto_store")
+
+
+def get_wiki_extract_cache():
+    return registry.get("wiki_extract_cache")
+
+
+def get_wikipedia_index():
+    return registry.get("wikipedia_index")
+
+
+def get_search_latency():
+    return registry.get("search_latency")
+
+
+def get_job_runner():
+    return registry.get("job_runner")
+
+
+def get_compaction_stats():
+    return registry.get("compaction_stats")
+
+
+def get_manga_summary_cache():
+    return registry.get("manga_summary_cache")
+
+
+def get_summary_cascade():
+    return registry.get("summary_cascade")
+
+
+def get_project_tree():
+    return registry.get("project_tree")
+
+
+# Old module-level names, resolved through the registry on attribute access.
+_LAZY_ATTRIBUTES = {
+    "model": "model",
+    "feature_scaler": "feature_scaler",
+    "target_scaler": "target_scaler",
+    "client": "tavily_client",
+    "firecrawl_web_search_app": "firecrawl_app",
+    "open_router_open_api_client": "open_router_client",
+}
+
+
+def __getattr__(name: str):
+    if name in _LAZY_ATTRIBUTES:
+        return registry.get(_LAZY_ATTRIBUTES[name])
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,330 @@
+"""
+Batched closing-price inference: feature scaler -> VotingRegressor -> target scaler.
+
+Two implementations with the same `predict(features)` interface:
+    PricePipeline         the sklearn objects, called once per batch
+    FusedPricePredictor   the same pipeline compiled to flat NumPy arrays,
+                          cached next to the .joblib files (load_price_predictor)
+and BatchSizeRouter, which serves single rows and small batches from the fused
+predictor (no sklearn call overhead) and large ones from PricePipeline, whose
+compiled tree traversal is several times faster per row from a few hundred
+rows on.
+
+In PricePipeline the scalers are applied as plain NumPy affine
+transforms (the same operations sklearn performs) and the model is called once
+per batch on a float array. No per-row DataFrame and no per-call feature-name
+validation. A single row gives bit-identical results to running the three
+sklearn objects in sequence; in larger batches the linear member's matrix
+product may differ in the last bit (BLAS summation order).
+"""
+import hashlib
+import logging
+import os
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+FEATURES = ("Open", "High", "Low")
+MODEL_FILES = ("feature_scaler.joblib", "voting_regressor.joblib", "target_scaler.joblib")
+COMPILED_FILE = "price_predictor.compiled.npz"
+# Bump when the compiled layout or the compilation rules change.
+COMPILED_FORMAT = 1
+
+
+class PricePipeline:
+    """
+    Predicts closing prices from (n, 3) arrays of Open, High, Low.
+    """
+
+    def __init__(self, feature_scaler: Any, model: Any, target_scaler: Any):
+        self.model = model
+        self.feature_mean = np.asarray(feature_scaler.mean_, dtype=float)
+        self.feature_scale = np.asarray(feature_scaler.scale_, dtype=float)
+        self.target_mean = float(target_scaler.mean_[0])
+        self.target_scale = float(target_scaler.scale_[0])
+
+    def predict(self, features: np.ndarray) -> np.ndarray:
+        """
+        Args:
+            features (np.ndarray): Shape (n, 3), columns in FEATURES order.
+        Returns:
+            np.ndarray: Shape (n,), predicted closing prices.
+        """
+        features = np.asarray(features, dtype=float).reshape(-1, len(FEATURES))
+        if not len(features):
+            return np.empty(0)
+        scaled = (features - self.feature_mean) / self.feature_scale
+        return self.model.predict(scaled) * self.target_scale + self.target_mean
+
+
+def feature_matrix(rows: Iterable[Any]) -> np.ndarray:
+    """
+    Builds the (n, 3) feature array from rows given as {"Open", "High", "Low"}
+    dicts or as [open, high, low] sequences.
+    """
+    matrix = []
+    for row in rows:
+        if isinstance(row, dict):
+            matrix.append([row["Open"], row["High"], row["Low"]])
+        else:
+            matrix.append(row)
+    if not matrix:
+        return np.empty((0, len(FEATURES)))
+    features = np.array(matrix, dtype=float)
+    if features.ndim != 2 or features.shape[1] != len(FEATURES):
+        raise ValueError("Each row must have exactly Open, High and Low")
+    return features
+
+
+class UnsupportedModel(Exception):
+    """A model member that FusedPricePredictor cannot compile."""
+
+
+class FusedPricePredictor:
+    """
+    The scaler -> VotingRegressor -> scaler pipeline compiled into NumPy arrays.
+
+    Everything affine is folded together: the target scaler, the voting weights
+    and the linear members become one weight vector on the raw features plus a
+    constant, and the tree leaf values are pre-multiplied by their share of the
+    vote (1/n_trees for a forest, learning_rate for boosting). All trees are
+    stored in flat node arrays, with leaves pointing at themselves, and are
+    walked together, one level per step.
+
+    Tree thresholds stay in scaled space: sklearn compares the scaled features
+    after casting them to float32, and moving the thresholds to raw space would
+    change which side of a split borderline inputs fall on.
+    """
+
+    def __init__(self, arrays: Dict[str, np.ndarray]):
+        self.arrays = arrays
+        self.constant = float(arrays["constant"])
+        self.linear = arrays["linear"]
+        self.feature_mean = arrays["feature_mean"]
+        self.feature_scale = arrays["feature_scale"]
+        self.roots = arrays["roots"]
+        self.feature = arrays["feature"]
+        self.threshold = arrays["threshold"]
+        self.left = arrays["left"]
+        self.right = arrays["right"]
+        self.value = arrays["value"]
+        self.depth = int(arrays["depth"])
+
+    def predict(self, features: np.ndarray) -> np.ndarray:
+        """
+        Args:
+            features (np.ndarray): Shape (n, 3), columns in FEATURES order.
+        Returns:
+            np.ndarray: Shape (n,), predicted closing prices.
+        """
+        features = np.asarray(features, dtype=float).reshape(-1, len(FEATURES))
+        if not np.isfinite(features).all():
+            raise ValueError("Input contains NaN or infinity")
+        prediction = features @ self.linear + self.constant
+        if len(self.roots):
+            scaled = ((features - self.feature_mean) / self.feature_scale).astype(np.float32)
+            rows = np.arange(len(features))[:, None]
+            nodes = np.broadcast_to(self.roots, (len(features), len(self.roots)))
+            for _ in range(self.depth):
+                go_left = scaled[rows, self.feature[nodes]] <= self.threshold[nodes]
+                nodes = np.where(go_left, self.left[nodes], self.right[nodes])
+            prediction += self.value[nodes].sum(axis=1)
+        return prediction
+
+
+class BatchSizeRouter:
+    """
+    Predicts batches of up to `max_rows` rows with `small` and larger ones with
+    the predictor `large()` returns, built on the first large batch.
+    """
+
+    def __init__(self, small: Any, large: Callable[[], Any], max_rows: int):
+        self.small = small
+        self.max_rows = max_rows
+        self._build_large = large
+        self._large = None
+
+    def predict(self, features: np.ndarray) -> np.ndarray:
+        """
+        Args:
+            features (np.ndarray): Shape (n, 3), columns in FEATURES order.
+        Returns:
+            np.ndarray: Shape (n,), predicted closing prices.
+        """
+        features = np.asarray(features, dtype=float).reshape(-1, len(FEATURES))
+        if len(features) <= self.max_rows:
+            return self.small.predict(features)
+        if self._large is None:
+            self._large = self._build_large()
+        return self._large.predict(features)
+
+
+def _linear_member(member: Any) -> Optional[Tuple[np.ndarray, float]]:
+    from sklearn.linear_model import ElasticNet, Lasso, LinearRegression, Ridge
+    if isinstance(member, (LinearRegression, Ridge, Lasso, ElasticNet)):
+        coef = np.asarray(member.coef_, dtype=float).reshape(-1)
+        return coef, float(np.asarray(member.intercept_).reshape(-1)[0])
+    return None
+
+
+def _tree_members(member: Any) -> Optional[Tuple[List[Any], float, float]]:
+    """
+    Returns:
+        (trees, leaf factor, constant) for tree models, None for anything else.
+    """
+    from sklearn.ensemble import ExtraTreesRegressor, GradientBoostingRegressor, RandomForestRegressor
+    from sklearn.tree import DecisionTreeRegressor, ExtraTreeRegressor
+    if isinstance(member, (DecisionTreeRegressor, ExtraTreeRegressor)):
+        return [member.tree_], 1.0, 0.0
+    if isinstance(member, (RandomForestRegressor, ExtraTreesRegressor)):
+        return [tree.tree_ for tree in member.estimators_], 1.0 / len(member.estimators_), 0.0
+    if isinstance(member, GradientBoostingRegressor):
+        if member.loss != "squared_error":
+            raise UnsupportedModel(f"GradientBoostingRegressor(loss={member.loss!r})")
+        if member.init_ == "zero":
+            constant = 0.0
+        else:
+            constant = float(np.asarray(member.init_.predict(np.zeros((1, member.n_features_in_)))).reshape(-1)[0])
+        return [tree.tree_ for tree in member.estimators_[:, 0]], member.learning_rate, constant
+    return None
+
+
+def compile_price_predictor(feature_scaler: Any, model: Any, target_scaler: Any) -> FusedPricePredictor:
+    """
+    Compiles fitted StandardScalers and a VotingRegressor (linear and tree members)
+    into a FusedPricePredictor. Raises UnsupportedModel for anything else.
+    """
+    from sklearn.ensemble import VotingRegressor
+    from sklearn.preprocessing import StandardScaler
+    if not isinstance(feature_scaler, StandardScaler) or not isinstance(target_scaler, StandardScaler):
+        raise UnsupportedModel("Only StandardScaler feature/target scalers can be folded")
+    if not isinstance(model, VotingRegressor):
+        raise UnsupportedModel(f"Expected a VotingRegressor, got {type(model).__name__}")
+
+    feature_mean = np.asarray(feature_scaler.mean_, dtype=float)
+    feature_scale = np.asarray(feature_scaler.scale_, dtype=float)
+    target_mean = float(target_scaler.mean_[0])
+    target_scale = float(target_scaler.scale_[0])
+    weights = np.ones(len(model.estimators_)) if model.weights is None else np.asarray(model.weights, dtype=float)
+    shares = target_scale * weights / weights.sum()
+
+    constant = target_mean
+    linear = np.zeros(len(FEATURES))
+    roots, feature, threshold, left, right, value = [], [], [], [], [], []
+    depth = 0
+    offset = 0
+    for member, share in zip(model.estimators_, shares):
+        members = _linear_member(member)
+        if members is not None:
+            coef, intercept = members
+            # share * (coef . (x - mean) / scale + intercept)
+            linear += share * coef / feature_scale
+            constant += share * (intercept - float(np.dot(coef, feature_mean / feature_scale)))
+            continue
+        trees = _tree_members(member)
+        if trees is None:
+            raise UnsupportedModel(f"Cannot compile {type(member).__name__}")
+        tree_list, factor, tree_constant = trees
+        constant += share * tree_constant
+        for tree in tree_list:
+            is_leaf = tree.children_left == -1
+            nodes = np.arange(tree.node_count) + offset
+            roots.append(offset)
+            feature.append(np.where(is_leaf, 0, tree.feature))
+            threshold.append(np.where(is_leaf, np.inf, tree.threshold))
+            left.append(np.where(is_leaf, nodes, tree.children_left + offset))
+            right.append(np.where(is_leaf, nodes, tree.children_right + offset))
+            value.append(np.where(is_leaf, share * factor * tree.value.reshape(-1), 0.0))
+            depth = max(depth, int(tree.max_depth))
+            offset += tree.node_count
+
+    def concat(parts: List[np.ndarray], dtype) -> np.ndarray:
+        return np.concatenate(parts).astype(dtype) if parts else np.empty(0, dtype=dtype)
+
+    return FusedPricePredictor({
+        "constant": np.float64(constant),
+        "linear": linear,
+        "feature_mean": feature_mean,
+        "feature_scale": feature_scale,
+        "roots": np.asarray(roots, dtype=np.intp),
+        "feature": concat(feature, np.intp),
+        "threshold": concat(threshold, np.float64),
+        "left": concat(left, np.intp),
+        "right": concat(right, np.intp),
+        "value": concat(value, np.float64),
+        "depth": np.int64(depth),
+    })
+
+
+def model_fingerprint(models_dir: str) -> str:
+    """
+    sha256 over the model files and the compiled format. Deliberately does not
+    import sklearn, so a cache hit needs nothing but NumPy.
+    """
+    digest = hashlib.sha256(f"format-{COMPILED_FORMAT}".encode())
+    for filename in MODEL_FILES:
+        with open(os.path.join(models_dir, filename), "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def probe_features(feature_scaler: Any, n: int = 4096, seed: int = 0) -> np.ndarray:
+    """
+    Inputs spread over the training distribution (mean +/- 3 std), for equivalence checks.
+    """
+    rng = np.random.default_rng(seed)
+    mean = np.asarray(feature_scaler.mean_, dtype=float)
+    scale = np.asarray(feature_scaler.scale_, dtype=float)
+    return np.abs(mean + scale * rng.uniform(-3, 3, size=(n, len(mean))))
+
+
+def check_equivalence(predictor: Any, reference: PricePipeline, features: np.ndarray, rtol: float = 1e-9) -> float:
+    """
+    Returns:
+        float: The largest difference from the sklearn pipeline, relative to the target scale.
+    Raises:
+        AssertionError: If it exceeds rtol.
+    """
+    error = float(np.max(np.abs(predictor.predict(features) - reference.predict(features)))) / reference.target_scale
+    if error > rtol:
+        raise AssertionError(f"Fused predictor differs from sklearn by {error:.3g} (relative to the target scale)")
+    return error
+
+
+def load_price_predictor(models_dir: str, feature_scaler=None, model=None, target_scaler=None) -> Any:
+    """
+    Loads the fused predictor from <models_dir>/price_predictor.compiled.npz when
+    it matches the current model files; otherwise compiles it from the sklearn
+    objects, checks it against them and writes the cache. Falls back to the
+    sklearn PricePipeline when the model cannot be compiled or does not match.
+    Args:
+        feature_scaler, model, target_scaler: Zero-argument callables returning the
+            fitted objects (only called when the cache cannot be used).
+    """
+    path = os.path.join(models_dir, COMPILED_FILE)
+    fingerprint = model_fingerprint(models_dir)
+    try:
+        with np.load(path, allow_pickle=False) as cached:
+            if str(cached["fingerprint"]) == fingerprint:
+                return FusedPricePredictor({name: cached[name] for name in cached.files if name != "fingerprint"})
+    except (OSError, KeyError, ValueError):
+        pass
+
+    reference = PricePipeline(feature_scaler(), model(), target_scaler())
+    try:
+        predictor = compile_price_predictor(feature_scaler(), model(), target_scaler())
+        error = check_equivalence(predictor, reference, probe_features(feature_scaler()))
+    except (UnsupportedModel, AssertionError) as e:
+        logger.warning("Using the sklearn price pipeline: %s", e)
+        return reference
+    logger.info("Compiled price predictor (max relative difference from sklearn %.2g)", error)
+    try:
+        partial = f"{path}.{os.getpid()}.tmp"
+        with open(partial, "wb") as f:
+            np.savez(f, fingerprint=np.array(fingerprint), **predictor.arrays)
+        os.replace(partial, path)
+    except OSError as e:
+        logger.warning("Could not cache the compiled price predictor at %s: %s", path, e)
+    return predictor
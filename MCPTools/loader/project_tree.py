@@ -0,0 +1,376 @@
+"""
+Bounded, cached directory listings for get_project_structure.
+
+A traversal lists each directory once with os.scandir, depth first with
+names sorted, down to a depth limit and up to an entry limit. Entries that
+match an ignore pattern are left out and ignored directories are not entered.
+The patterns use .gitignore syntax: built-in defaults (.git, virtualenvs,
+caches), PROJECT_TREE_IGNORE, and every .gitignore met on the way down.
+
+Snapshots are cached. A snapshot is still valid while the modification time of
+every directory it listed (and of every .gitignore it read) is unchanged, so a
+repeated call costs one stat per directory instead of a traversal. When
+something did change, the traversal runs again but reuses the filtered
+listing of every directory whose mtime is unchanged: only changed directories
+are read again. A directory listed within PROJECT_TREE_MTIME_GRANULARITY of
+its last change is not trusted, as a second change in the same clock tick
+would leave its mtime unchanged.
+
+Configuration:
+    PROJECT_TREE_IGNORE             extra comma-separated ignore patterns
+    PROJECT_TREE_MAX_ENTRIES        (default 20000) entries a snapshot holds at most
+    PROJECT_TREE_CACHE_SIZE         (default 8) snapshots kept, least recently used dropped
+    PROJECT_TREE_MTIME_GRANULARITY  (default 0.1) seconds; 2 on FAT or network filesystems
+"""
+import bisect
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+# Directories first, then files: consecutive patterns of one kind are matched as one regex.
+DEFAULT_IGNORES = (
+    ".git/", ".hg/", ".svn/", "__pycache__/", ".venv/", "venv/", "env/", "node_modules/",
+    ".mypy_cache/", ".pytest_cache/", ".ruff_cache/", ".tox/", ".nox/", ".idea/", "*.pyc", ".DS_Store",
+)
+
+MTIME_GRANULARITY_NS = int(float(os.getenv("PROJECT_TREE_MTIME_GRANULARITY", 0.1)) * 1e9)
+
+
+class Rule(NamedTuple):
+    base: str          # directory of the .gitignore, relative to the root ("" for the root)
+    regex: "re.Pattern"
+    negate: bool
+    dir_only: bool
+
+
+def _translate(pattern: str) -> str:
+    out, i = [], 0
+    while i < len(pattern):
+        if pattern.startswith("**/", i):
+            out.append("(?:.*/)?")
+            i += 3
+        elif pattern.startswith("/**", i) and i + 3 == len(pattern):
+            out.append("/.*")
+            i += 3
+        elif pattern.startswith("**", i):
+            out.append(".*")
+            i += 2
+        elif pattern[i] == "*":
+            out.append("[^/]*")
+            i += 1
+        elif pattern[i] == "?":
+            out.append("[^/]")
+            i += 1
+        elif pattern[i] == "[" and "]" in pattern[i + 2:]:
+            end = pattern.index("]", i + 2)
+            body = pattern[i + 1:end]
+            out.append("[" + ("^" + body[1:] if body.startswith("!") else body).replace("\\", "\\\\") + "]")
+            i = end + 1
+        elif pattern[i] == "\\" and i + 1 < len(pattern):
+            out.append(re.escape(pattern[i + 1]))
+            i += 2
+        else:
+            out.append(re.escape(pattern[i]))
+            i += 1
+    return "".join(out)
+
+
+def parse_rules(lines: List[str], base: str = "") -> List[Rule]:
+    """
+    Compiles .gitignore lines. A pattern without an inner "/" matches a name
+    at any depth below `base`; one with a "/" is anchored to `base`. Consecutive
+    patterns with the same negation and directory-only flag become one rule.
+    """
+    groups: List[Tuple[bool, bool, List[str]]] = []
+    for line in lines:
+        line = line.rstrip("\n\r")
+        if not line.endswith("\\ "):
+            line = line.rstrip()
+        if not line or line.startswith("#"):
+            continue
+        negate = line.startswith("!")
+        if negate or line.startswith("\\!") or line.startswith("\\#"):
+            line = line[1:]
+        dir_only = line.endswith("/")
+        line = line.rstrip("/")
+        if not line:
+            continue
+        pattern = _translate(line.lstrip("/"))
+        if "/" not in line:
+            pattern = "(?:.*/)?" + pattern
+        if groups and groups[-1][:2] == (negate, dir_only):
+            groups[-1][2].append(pattern)
+        else:
+            groups.append((negate, dir_only, [pattern]))
+    return [
+        Rule(base, re.compile("|".join(f"(?:{pattern})" for pattern in patterns), re.DOTALL), negate, dir_only)
+        for negate, dir_only, patterns in groups
+    ]
+
+
+def is_ignored(rules: List[Rule], path: str, is_dir: bool) -> bool:
+    """
+    Returns:
+        bool: Whether `path` (relative to the root, "/"-separated) is ignored; the last matching rule wins.
+    """
+    ignored = False
+    for rule in rules:
+        if rule.dir_only and not is_dir:
+            continue
+        if rule.base:
+            if not path.startswith(rule.base + "/"):
+                continue
+            relative = path[len(rule.base) + 1:]
+        else:
+            relative = path
+        if rule.regex.fullmatch(relative):
+            ignored = not rule.negate
+    return ignored
+
+
+class Listing(NamedTuple):
+    mtime_ns: int
+    listed_ns: int
+    entries: List[Tuple[str, bool, bool]]  # name, is a directory, may be entered (not a symlink)
+
+
+class Children(NamedTuple):
+    listing: Listing                       # the listing they were filtered from
+    rules_key: Tuple                       # the .gitignore files (path, mtime_ns) in force
+    rules: List[Rule]                      # rules for the entries below, with this directory's .gitignore
+    entries: List[Tuple[str, str, bool]]   # name, "Directory" or "File", may be entered
+
+
+class Snapshot(NamedTuple):
+    entries: List[Tuple[str, str]]      # relative path, "Directory" or "File"; depth first, names sorted
+    keys: List[Tuple[str, ...]]         # path parts of each entry, for resuming after a cursor
+    mtimes: Dict[str, int]              # every directory listed and .gitignore read -> mtime_ns
+    truncated: bool
+    trusted: bool                       # False when a listed directory changed within MTIME_GRANULARITY_NS
+
+
+class ProjectTree:
+    """
+    Cached, bounded traversals, keyed by (root, max_depth).
+    """
+
+    def __init__(
+        self,
+        max_entries: Optional[int] = None,
+        max_snapshots: Optional[int] = None,
+        ignore: Optional[List[str]] = None,
+    ):
+        self.max_entries = max_entries if max_entries is not None else int(os.getenv("PROJECT_TREE_MAX_ENTRIES", 20000))
+        self.max_snapshots = max_snapshots if max_snapshots is not None else int(os.getenv("PROJECT_TREE_CACHE_SIZE", 8))
+        if ignore is None:
+            ignore = [pattern.strip() for pattern in os.getenv("PROJECT_TREE_IGNORE", "").split(",")]
+        self.rules = parse_rules(list(DEFAULT_IGNORES) + [pattern for pattern in ignore if pattern])
+        self._lock = threading.Lock()
+        self._snapshots: "OrderedDict[Tuple[str, int], Snapshot]" = OrderedDict()
+        self._listings: Dict[str, Listing] = {}
+        self._children: Dict[Tuple[str, str], Children] = {}
+        self._gitignores: Dict[str, Tuple[int, List[str]]] = {}
+        self._stats = {"hits": 0, "misses": 0, "dirs_listed": 0, "dirs_reused": 0, "scan_seconds": 0.0}
+
+    def _list(self, directory: str) -> Optional[Listing]:
+        try:
+            mtime_ns = os.stat(directory).st_mtime_ns
+        except OSError:
+            return None
+        cached = self._listings.get(directory)
+        if cached is not None and cached.mtime_ns == mtime_ns and cached.listed_ns - mtime_ns > MTIME_GRANULARITY_NS:
+            self._stats["dirs_reused"] += 1
+            return cached
+        listed_ns = time.time_ns()
+        entries = []
+        try:
+            with os.scandir(directory) as it:
+                for entry in it:
+                    try:
+                        is_dir = entry.is_dir()
+                        entries.append((entry.name, is_dir, is_dir and not entry.is_symlink()))
+                    except OSError:
+                        entries.append((entry.name, False, False))
+        except OSError:
+            return None
+        entries.sort()
+        listing = Listing(mtime_ns, listed_ns, entries)
+        self._listings[directory] = listing
+        self._stats["dirs_listed"] += 1
+        return listing
+
+    def _gitignore(self, path: str) -> Tuple[int, List[str]]:
+        try:
+            mtime_ns = os.stat(path).st_mtime_ns
+            cached = self._gitignores.get(path)
+            if cached is None or cached[0] != mtime_ns:
+                with open(path, encoding="utf-8", errors="replace") as f:
+                    cached = (mtime_ns, f.read().splitlines())
+                self._gitignores[path] = cached
+        except OSError:
+            return 0, []
+        return cached
+
+    def _filter(
+        self, root: str, directory: str, relative: str, listing: Listing, rules_key: Tuple, rules: List[Rule],
+        mtimes: Dict[str, int],
+    ) -> Children:
+        """The entries of `directory` that are not ignored, reused while its listing and rules are unchanged."""
+        gitignore = os.path.join(directory, ".gitignore")
+        if any(name == ".gitignore" and not is_dir for name, is_dir, _ in listing.entries):
+            mtime_ns, lines = self._gitignore(gitignore)
+            mtimes[gitignore] = mtime_ns
+            rules_key = rules_key + ((gitignore, mtime_ns),)
+        else:
+            lines = None
+        cached = self._children.get((root, directory))
+        if cached is not None and cached.listing is listing and cached.rules_key == rules_key:
+            return cached
+        if lines:
+            rules = rules + parse_rules(lines, relative)
+        prefix = relative + "/" if relative else ""
+        entries = [
+            (name, "Directory" if is_dir else "File", enterable)
+            for name, is_dir, enterable in listing.entries
+            if not is_ignored(rules, prefix + name, is_dir)
+        ]
+        children = Children(listing, rules_key, rules, entries)
+        self._children[(root, directory)] = children
+        return children
+
+    def _scan(self, root: str, max_depth: int) -> Snapshot:
+        entries: List[Tuple[str, str]] = []
+        keys: List[Tuple[str, ...]] = []
+        mtimes: Dict[str, int] = {}
+        trusted, truncated = True, False
+
+        def descend(directory: str, relative: str, key: Tuple[str, ...], depth: int, rules_key: Tuple, rules: List[Rule]):
+            nonlocal trusted
+            listing = self._list(directory)
+            if listing is None:
+                return None
+            mtimes[directory] = listing.mtime_ns
+            trusted &= listing.listed_ns - listing.mtime_ns > MTIME_GRANULARITY_NS
+            children = self._filter(root, directory, relative, listing, rules_key, rules, mtimes)
+            return directory, relative, key, depth, children
+
+        # Explicit stack of (directory, path relative to root, its key, depth, its children, next child).
+        stack: List[Tuple[str, str, Tuple[str, ...], int, Children, Iterator]] = []
+        frame = descend(root, "", (), 1, (), self.rules)
+        if frame is not None:
+            stack.append((*frame, iter(frame[4].entries)))
+        while stack:
+            directory, relative, key, depth, children, remaining = stack[-1]
+            child = next(remaining, None)
+            if child is None:
+                stack.pop()
+                continue
+            if len(entries) >= self.max_entries:
+                truncated = True
+                break
+            name, kind, enterable = child
+            path = f"{relative}/{name}" if relative else name
+            entries.append((path, kind))
+            keys.append(key + (name,))
+            if enterable and depth < max_depth:
+                frame = descend(
+                    os.path.join(directory, name), path, key + (name,), depth + 1,
+                    children.rules_key, children.rules,
+                )
+                if frame is not None:
+                    stack.append((*frame, iter(frame[4].entries)))
+        return Snapshot(entries, keys, mtimes, truncated, trusted)
+
+    @staticmethod
+    def _unchanged(snapshot: Snapshot) -> bool:
+        if not snapshot.trusted:
+            return False
+        try:
+            return all(os.stat(path).st_mtime_ns == mtime_ns for path, mtime_ns in snapshot.mtimes.items())
+        except OSError:
+            return False
+
+    def snapshot(self, root: str, max_depth: int) -> Snapshot:
+        """
+        Returns:
+            Snapshot: The cached traversal of `root` while it is unchanged, otherwise a new one.
+        """
+        key = (os.path.realpath(root), max_depth)
+        with self._lock:
+            snapshot = self._snapshots.get(key)
+            if snapshot is not None and self._unchanged(snapshot):
+                self._snapshots.move_to_end(key)
+                self._stats["hits"] += 1
+                return snapshot
+            self._stats["misses"] += 1
+            start = time.perf_counter()
+            snapshot = self._scan(key[0], max_depth)
+            self._stats["scan_seconds"] += time.perf_counter() - start
+            self._snapshots[key] = snapshot
+            self._snapshots.move_to_end(key)
+            while len(self._snapshots) > self.max_snapshots:
+                self._snapshots.popitem(last=False)
+            self._prune()
+            return snapshot
+
+    def _prune(self) -> None:
+        # Listings are only worth keeping for directories a cached snapshot may list again.
+        kept = set()
+        for snapshot in self._snapshots.values():
+            kept.update(snapshot.mtimes)
+        self._listings = {path: listing for path, listing in self._listings.items() if path in kept}
+        self._children = {key: children for key, children in self._children.items() if key[1] in kept}
+        self._gitignores = {path: cached for path, cached in self._gitignores.items() if path in kept}
+
+    def page(self, root: str, max_depth: int, limit: int, cursor: Optional[str] = None) -> Dict[str, Any]:
+        """
+        One page of the traversal of `root`.
+        Args:
+            root (str): Directory to list.
+            max_depth (int): Directory levels to list (1: only the entries of `root`).
+            limit (int): Entries per page.
+            cursor (str): "next_cursor" of the previous page; the page starts after that path.
+        Returns:
+            dict: "structure" ({directory: {name: "File" | "Directory"}}, directories as
+            "./a/b" relative to `root`), "entries" in the page, "total_entries", "truncated"
+            (the traversal stopped at PROJECT_TREE_MAX_ENTRIES) and "next_cursor" (None on the last page).
+        """
+        snapshot = self.snapshot(root, max_depth)
+        start = bisect.bisect_right(snapshot.keys, tuple(cursor.split("/"))) if cursor else 0
+        page = snapshot.entries[start:start + limit]
+        structure: Dict[str, Dict[str, str]] = {}
+        for path, kind in page:
+            parent, _, name = path.rpartition("/")
+            structure.setdefault(f"./{parent}" if parent else ".", {})[name] = kind
+        more = start + limit < len(snapshot.entries)
+        return {
+            "structure": structure,
+            "entries": len(page),
+            "total_entries": len(snapshot.entries),
+            "truncated": snapshot.truncated,
+            "next_cursor": page[-1][0] if more and page else None,
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns:
+            dict: Snapshot hits and misses, hit_rate, directories listed vs reused from
+            an unchanged listing, total traversal time (ms) and snapshots cached.
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats["snapshots"] = len(self._snapshots)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 3) if lookups else 0.0
+        stats["scan_ms"] = round(1000 * stats.pop("scan_seconds"), 3)
+        return stats
+
+    def clear(self) -> None:
+        with self._lock:
+            self._snapshots.clear()
+            self._listings.clear()
+            self._children.clear()
+            self._gitignores.clear()
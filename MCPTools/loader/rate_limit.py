@@ -0,0 +1,311 @@
+"""
+Per-provider rate limiting for the shared HTTP clients.
+
+Every request to a rate-limited upstream takes a token from that provider's
+token bucket first. When the bucket is empty the request waits its turn (in
+arrival order) instead of failing, as long as it can be sent within the
+deadline; otherwise RateLimitExceeded is raised without calling the provider.
+
+Answers that say the provider is overloaded are retried:
+    - 429 responses and Alpha Vantage's 200 "rate limit" notes, for any request;
+    - 5xx responses only for idempotent requests (GET and HEAD, or marked
+      `idempotent`): a POST that failed may still have been carried out, and
+      sending it again could, e.g., start a second deep research run;
+    - after the response's Retry-After when it has one, otherwise after a
+      jittered exponential backoff (a random delay up to base * 2^attempt);
+    - a 429 also pauses the provider's bucket for that delay, so queued
+      requests back off with it.
+When the retries or the deadline run out, the last response is returned.
+
+Limits come from the environment, as "<requests>/<seconds>[:<burst>]" (burst
+defaults to <requests>); "off" disables limiting for a provider:
+    RATE_LIMIT_<SERVICE>      e.g. RATE_LIMIT_ALPHAVANTAGE=5/60 (defaults in DEFAULT_LIMITS)
+    RATE_LIMITS               "off" disables every token bucket (retries stay on)
+    RATE_LIMIT_DEADLINE       (default 30)  seconds a request may spend queued or backing off
+    RATE_LIMIT_RETRIES        (default 3)   retries of a throttled or failed answer
+    RATE_LIMIT_BACKOFF        (default 0.5) backoff base in seconds
+    RATE_LIMIT_MAX_BACKOFF    (default 30)  longest single backoff in seconds
+"""
+import asyncio
+import email.utils
+import logging
+import os
+import random
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+from .upstreams import UPSTREAMS, service_for_url
+
+logger = logging.getLogger(__name__)
+
+# Published free-tier limits; providers not listed are not limited (but still retried).
+DEFAULT_LIMITS = {
+    "alphavantage": "5/60",
+    "google": "100/60",
+    "firecrawl": "10/60",
+    "mangadex": "5/1",
+}
+
+_ALPHAVANTAGE_NOTES = ("rate limit", "call frequency", "requests per")
+# Methods whose 5xx answers are retried unless the caller says otherwise.
+IDEMPOTENT_METHODS = ("GET", "HEAD")
+
+
+class RateLimitExceeded(Exception):
+    def __init__(self, service: str, wait: float):
+        super().__init__(f"{service} rate limit: no request slot within the deadline (next in {wait:.1f} s)")
+        self.service = service
+        self.wait = wait
+
+
+def parse_limit(value: str) -> Optional[tuple]:
+    """
+    Returns:
+        Optional[tuple]: (tokens per second, burst) for "<requests>/<seconds>[:<burst>]", None for "off".
+    """
+    value = value.strip().lower()
+    if value in ("", "0", "off", "none"):
+        return None
+    rate, _, burst = value.partition(":")
+    requests, _, seconds = rate.partition("/")
+    requests, seconds = float(requests), float(seconds or 1)
+    return requests / seconds, float(burst) if burst else max(1.0, requests)
+
+
+def retry_after(response: httpx.Response) -> Optional[float]:
+    """
+    Returns:
+        Optional[float]: Seconds from the Retry-After header (delay or HTTP date), if present.
+    """
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def _alphavantage_throttled(response: httpx.Response) -> bool:
+    # Alpha Vantage answers an exceeded limit with 200 and a short {"Note"} or {"Information"} body.
+    if response.status_code != 200 or len(response.content) > 2048:
+        return False
+    try:
+        payload = response.json()
+    except ValueError:
+        return False
+    note = str(payload.get("Note") or payload.get("Information") or "").lower() if isinstance(payload, dict) else ""
+    return any(phrase in note for phrase in _ALPHAVANTAGE_NOTES)
+
+
+# Service -> check for throttling signalled in a successful response.
+THROTTLE_CHECKS: Dict[str, Callable[[httpx.Response], bool]] = {
+    "alphavantage": _alphavantage_throttled,
+}
+
+
+class TokenBucket:
+    """
+    Token bucket whose tokens can be reserved ahead of time, so waiting
+    requests are served in arrival order.
+    """
+
+    def __init__(self, rate: float, burst: float, clock: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.burst = burst
+        self._clock = clock
+        self._tokens = burst
+        self._updated = clock()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self, max_wait: float) -> tuple:
+        """
+        Returns:
+            tuple: (True, seconds until the reserved token may be used), or
+            (False, seconds a token would take) without reserving when that exceeds max_wait.
+        """
+        with self._lock:
+            now = self._clock()
+            # Tokens go negative while reserved ahead; they are paid back as they refill.
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            wait = max(0.0, (1 - self._tokens) / self.rate, self._paused_until - now)
+            if wait > max_wait:
+                return False, wait
+            self._tokens -= 1
+            return True, wait
+
+    def pause(self, seconds: float) -> None:
+        with self._lock:
+            self._paused_until = max(self._paused_until, self._clock() + seconds)
+
+
+class RateLimiter:
+    """
+    Token buckets, retries and counters per upstream service; shared by the sync
+    and async HTTP clients.
+    """
+
+    def __init__(
+        self,
+        limits: Optional[Dict[str, str]] = None,
+        deadline: Optional[float] = None,
+        retries: Optional[int] = None,
+        backoff: Optional[float] = None,
+        max_backoff: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+        rng: Optional[random.Random] = None,
+    ):
+        if limits is None and os.getenv("RATE_LIMITS", "on").lower() in ("0", "off", "false", "no"):
+            limits = {}
+        if limits is None:
+            limits = {
+                service: os.getenv(f"RATE_LIMIT_{service.upper()}", DEFAULT_LIMITS.get(service, "off"))
+                for service in UPSTREAMS
+            }
+        self.limits = {service: value for service, value in limits.items() if parse_limit(value)}
+        self.deadline = deadline if deadline is not None else float(os.getenv("RATE_LIMIT_DEADLINE", 30))
+        self.retries = retries if retries is not None else int(os.getenv("RATE_LIMIT_RETRIES", 3))
+        self.backoff = backoff if backoff is not None else float(os.getenv("RATE_LIMIT_BACKOFF", 0.5))
+        self.max_backoff = max_backoff if max_backoff is not None else float(os.getenv("RATE_LIMIT_MAX_BACKOFF", 30))
+        self._clock = clock
+        self._rng = rng or random.Random()
+        self._buckets = {service: TokenBucket(*parse_limit(value), clock=clock) for service, value in self.limits.items()}
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, float]] = {}
+
+    def _count(self, service: str, name: str, value: float = 1) -> None:
+        with self._lock:
+            counters = self._stats.setdefault(service, {
+                "requests": 0, "queued": 0, "max_queue_depth": 0, "throttled": 0, "throttle_seconds": 0.0,
+                "retries": 0, "rate_limited": 0, "server_errors": 0, "deadline_exceeded": 0,
+            })
+            counters[name] += value
+            if name == "queued":
+                counters["max_queue_depth"] = max(counters["max_queue_depth"], counters["queued"])
+
+    def _acquire(self, service: str, deadline_at: float) -> float:
+        """
+        Returns:
+            float: Seconds to wait before sending (the caller then sleeps, queued).
+        Raises:
+            RateLimitExceeded: If no token is available before the deadline.
+        """
+        self._count(service, "requests")
+        bucket = self._buckets.get(service)
+        if bucket is None:
+            return 0.0
+        reserved, wait = bucket.reserve(deadline_at - self._clock())
+        if not reserved:
+            self._count(service, "deadline_exceeded")
+            raise RateLimitExceeded(service, wait)
+        if wait > 0:
+            self._count(service, "throttled")
+            self._count(service, "throttle_seconds", wait)
+        return wait
+
+    def _retry_delay(
+        self, service: str, response: httpx.Response, attempt: int, deadline_at: float, idempotent: bool
+    ) -> Optional[float]:
+        """
+        Returns:
+            Optional[float]: Seconds to wait before retrying `response`, or None to return it.
+        """
+        throttled = response.status_code == 429 or (
+            service in THROTTLE_CHECKS and THROTTLE_CHECKS[service](response)
+        )
+        if throttled:
+            self._count(service, "rate_limited")
+        elif response.status_code >= 500:
+            self._count(service, "server_errors")
+            if not idempotent:
+                return None
+        else:
+            return None
+        delay = retry_after(response)
+        if delay is None:
+            delay = self._rng.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+        if throttled and service in self._buckets:
+            self._buckets[service].pause(delay)
+        if attempt >= self.retries or self._clock() + delay > deadline_at:
+            return None
+        self._count(service, "retries")
+        return delay
+
+    def call(self, url: str, send: Callable[[], httpx.Response], idempotent: bool = True) -> httpx.Response:
+        """
+        Sends a request through the limiter from sync code.
+        Args:
+            url (str): Request URL, used to find the upstream service.
+            send (callable): Sends the request once and returns the response.
+            idempotent (bool): Whether a 5xx answer may be retried.
+        """
+        service = service_for_url(url) or urlsplit(url).netloc
+        deadline_at = self._clock() + self.deadline
+        attempt = 0
+        while True:
+            wait = self._acquire(service, deadline_at)
+            if wait > 0:
+                self._count(service, "queued")
+                try:
+                    time.sleep(wait)
+                finally:
+                    self._count(service, "queued", -1)
+            response = send()
+            delay = self._retry_delay(service, response, attempt, deadline_at, idempotent)
+            if delay is None:
+                return response
+            logger.debug("%s answered %s, retrying in %.2f s", service, response.status_code, delay)
+            response.close()
+            time.sleep(delay)
+            attempt += 1
+
+    async def call_async(
+        self, url: str, send: Callable[[], Awaitable[httpx.Response]], idempotent: bool = True
+    ) -> httpx.Response:
+        """
+        Async counterpart of call().
+        """
+        service = service_for_url(url) or urlsplit(url).netloc
+        deadline_at = self._clock() + self.deadline
+        attempt = 0
+        while True:
+            wait = self._acquire(service, deadline_at)
+            if wait > 0:
+                self._count(service, "queued")
+                try:
+                    await asyncio.sleep(wait)
+                finally:
+                    self._count(service, "queued", -1)
+            response = await send()
+            delay = self._retry_delay(service, response, attempt, deadline_at, idempotent)
+            if delay is None:
+                return response
+            logger.debug("%s answered %s, retrying in %.2f s", service, response.status_code, delay)
+            await response.aclose()
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Returns:
+            dict: Per service: the configured limit, requests, current and maximum
+            queue depth (queued, max_queue_depth), requests that waited for a token
+            (throttled) and the total wait (throttle_seconds), retries, rate-limited
+            and 5xx answers, and requests refused at the deadline.
+        """
+        with self._lock:
+            stats = {service: dict(counters) for service, counters in self._stats.items()}
+        for service, counters in stats.items():
+            counters["throttle_seconds"] = round(counters["throttle_seconds"], 3)
+            counters["limit"] = self.limits.get(service, "off")
+        return stats
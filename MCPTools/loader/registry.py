@@ -0,0 +1,100 @@
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class ResourceRegistry:
+    """
+    Lazily builds named resources (ML models, API clients) on first use.
+
+    Each resource is registered with a zero-argument factory. The first call to
+    `get` runs the factory, caches the result and records how long it took;
+    later calls return the cached object. Builds are guarded by a per-resource
+    lock, so concurrent first calls only build a resource once and unrelated
+    resources never wait on each other.
+    """
+
+    def __init__(self):
+        self._factories: Dict[str, Callable[[], Any]] = {}
+        self._resources: Dict[str, Any] = {}
+        self._build_times: Dict[str, float] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, factory: Callable[[], Any]) -> None:
+        """
+        Register a factory for a resource. Re-registering drops any cached instance.
+        Args:
+            name (str): The resource name.
+            factory (Callable[[], Any]): Builds the resource when first needed.
+        """
+        with self._lock:
+            self._factories[name] = factory
+            self._locks[name] = threading.Lock()
+            self._resources.pop(name, None)
+            self._build_times.pop(name, None)
+
+    def get(self, name: str) -> Any:
+        """
+        Return the resource, building it on first use.
+        Args:
+            name (str): The resource name.
+        Returns:
+            Any: The cached resource.
+        """
+        try:
+            return self._resources[name]
+        except KeyError:
+            pass
+        try:
+            lock = self._locks[name]
+        except KeyError:
+            raise KeyError(f"Unknown resource: {name}") from None
+        with lock:
+            if name in self._resources:
+                return self._resources[name]
+            start = time.perf_counter()
+            resource = self._factories[name]()
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            self._build_times[name] = elapsed_ms
+            self._resources[name] = resource
+            logger.info("Built resource %s in %.1f ms", name, elapsed_ms)
+            return resource
+
+    def is_loaded(self, name: str) -> bool:
+        return name in self._resources
+
+    def names(self) -> list[str]:
+        return list(self._factories)
+
+    def preload(self, *names: str) -> Dict[str, float]:
+        """
+        Build resources ahead of time (all registered resources if none are given).
+        Returns:
+            Dict[str, float]: Build time in milliseconds per resource.
+        """
+        for name in names or self.names():
+            self.get(name)
+        return self.build_times()
+
+    def build_times(self) -> Dict[str, float]:
+        """
+        Returns:
+            Dict[str, float]: Build time in milliseconds for every resource built so far.
+        """
+        return dict(self._build_times)
+
+    def reset(self, name: Optional[str] = None) -> None:
+        """
+        Drop a cached resource (or all of them) so it is rebuilt on next use.
+        """
+        with self._lock:
+            if name is None:
+                self._resources.clear()
+                self._build_times.clear()
+            else:
+                self._resources.pop(name, None)
+                self._build_times.pop(name, None)
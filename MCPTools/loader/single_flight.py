@@ -0,0 +1,88 @@
+"""
+Single-flight deduplication of concurrent identical upstream requests.
+
+When several tool calls with the same normalized arguments run at the same
+time, only the first (the leader) starts the upstream request; the others wait
+on it and all receive its result or its exception. Nothing is cached: once the
+request finishes the next call with the same key starts a new one.
+
+The upstream request runs as its own task, so a caller that is cancelled (for
+example a client that disconnects) does not cancel the request for the others.
+"""
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+def normalize_text(value: Any) -> str:
+    """
+    Normalizes free text for use in a key ("  Donald  Trump " -> "donald trump").
+    """
+    return " ".join(str(value).split()).casefold()
+
+
+class SingleFlight:
+    """
+    Collapses concurrent calls that share a (group, key) into one in-flight call.
+    Groups are free-form names (usually the tool name) used to report metrics.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._in_flight: Dict[Tuple[str, Hashable], asyncio.Task] = {}
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    def _count(self, group: str, counter: str) -> None:
+        counters = self._stats.setdefault(group, {"calls": 0, "executed": 0, "collapsed": 0, "errors": 0})
+        counters[counter] += 1
+
+    async def do(self, group: str, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        """
+        Runs `fn()` unless a call with the same group and key is already in flight,
+        in which case its outcome is shared.
+        Args:
+            group (str): Metrics group, e.g. "get_weather".
+            key (Hashable): The normalized arguments that identify the upstream request.
+            fn (Callable[[], Awaitable]): Starts the upstream request.
+        Returns:
+            The result of the shared call; its exception is raised to every caller.
+        """
+        flight_key = (group, key)
+        with self._lock:
+            self._count(group, "calls")
+            task = self._in_flight.get(flight_key)
+            if task is None:
+                self._count(group, "executed")
+                task = asyncio.ensure_future(fn())
+                self._in_flight[flight_key] = task
+                task.add_done_callback(lambda done: self._finish(group, flight_key, done))
+            else:
+                self._count(group, "collapsed")
+        return await asyncio.shield(task)
+
+    def _finish(self, group: str, flight_key: Tuple[str, Hashable], task: asyncio.Task) -> None:
+        with self._lock:
+            if self._in_flight.get(flight_key) is task:
+                del self._in_flight[flight_key]
+            if task.cancelled() or task.exception() is not None:
+                self._count(group, "errors")
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns:
+            dict: Per group: calls, executed (upstream requests started), collapsed
+            (calls that joined an in-flight request), errors and collapse_rate;
+            plus the number of requests in flight.
+        """
+        with self._lock:
+            groups = {group: dict(counters) for group, counters in self._stats.items()}
+            in_flight = len(self._in_flight)
+        for counters in groups.values():
+            counters["collapse_rate"] = round(counters["collapsed"] / counters["calls"], 3) if counters["calls"] else 0.0
+        return {"groups": groups, "in_flight": in_flight}
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self._stats.clear()
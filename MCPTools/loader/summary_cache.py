@@ -0,0 +1,126 @@
+"""
+Disk cache of per-manga LLM summaries.
+
+A summary is keyed by the MangaDex id together with the manga's
+`attributes.updatedAt` and `attributes.version`, plus a variant string (model
+and options the summary was made with). MangaDex bumps both whenever the entry
+is edited, so a changed manga simply misses the cache and is summarized again;
+its older summaries are dropped when the new one is stored.
+
+The cache is one SQLite table bounded to `max_entries` rows. Every hit stamps
+the row's `used_at`, and the least recently used rows are evicted first.
+"""
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS summaries (
+    manga_id TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    variant TEXT NOT NULL,
+    summary TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    used_at REAL NOT NULL,
+    PRIMARY KEY (manga_id, updated_at, version, variant)
+);
+CREATE INDEX IF NOT EXISTS summaries_used_at ON summaries (used_at);
+"""
+
+
+def summary_key(manga: Dict[str, Any]) -> Optional[Tuple[str, str, int]]:
+    """
+    Returns:
+        Optional[tuple]: (id, updatedAt, version) of a raw MangaDex manga, or None if any is missing.
+    """
+    attributes = manga.get("attributes") or {}
+    if not manga.get("id") or not attributes.get("updatedAt") or attributes.get("version") is None:
+        return None
+    return str(manga["id"]), str(attributes["updatedAt"]), int(attributes["version"])
+
+
+class SummaryCache:
+    """
+    LRU-bounded persistent summaries, safe to share between threads.
+    """
+
+    def __init__(self, path: str, max_entries: Optional[int] = None, clock: Callable[[], float] = time.time):
+        self.path = path
+        self.max_entries = max_entries if max_entries is not None else int(os.getenv("MANGA_SUMMARY_CACHE_SIZE", 5000))
+        self._clock = clock
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(_SCHEMA)
+        self._stats = {"hits": 0, "misses": 0, "stored": 0, "evicted": 0}
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._db.execute("DELETE FROM summaries")
+
+    def get(self, key: Optional[Tuple[str, str, int]], variant: str = "") -> Optional[str]:
+        """
+        Returns:
+            Optional[str]: The cached summary for summary_key(manga) and variant, or None on a miss.
+        """
+        with self._lock:
+            row = None
+            if key is not None:
+                row = self._db.execute(
+                    "SELECT summary FROM summaries WHERE manga_id = ? AND updated_at = ? AND version = ? AND variant = ?",
+                    (*key, variant),
+                ).fetchone()
+            if row is None:
+                self._stats["misses"] += 1
+                return None
+            self._db.execute(
+                "UPDATE summaries SET used_at = ? WHERE manga_id = ? AND updated_at = ? AND version = ? AND variant = ?",
+                (self._clock(), *key, variant),
+            )
+            self._stats["hits"] += 1
+        return row[0]
+
+    def put(self, key: Optional[Tuple[str, str, int]], summary: str, variant: str = "") -> None:
+        if key is None:
+            return
+        now = self._clock()
+        with self._lock:
+            # Summaries of the manga's earlier versions can never be hit again.
+            self._db.execute(
+                "DELETE FROM summaries WHERE manga_id = ? AND variant = ? AND (updated_at != ? OR version != ?)",
+                (key[0], variant, key[1], key[2]),
+            )
+            self._db.execute(
+                "INSERT OR REPLACE INTO summaries VALUES (?, ?, ?, ?, ?, ?, ?)", (*key, variant, summary, now, now)
+            )
+            self._stats["stored"] += 1
+            excess = self._db.execute("SELECT count(*) FROM summaries").fetchone()[0] - self.max_entries
+            if excess > 0:
+                cursor = self._db.execute(
+                    "DELETE FROM summaries WHERE rowid IN (SELECT rowid FROM summaries ORDER BY used_at LIMIT ?)",
+                    (excess,),
+                )
+                self._stats["evicted"] += cursor.rowcount
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns:
+            dict: hits, misses and hit_rate of lookups, summaries stored and evicted,
+            and cached summaries (entries) out of max_entries.
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = self._db.execute("SELECT count(*) FROM summaries").fetchone()[0]
+        stats["max_entries"] = self.max_entries
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 3) if lookups else 0.0
+        return stats
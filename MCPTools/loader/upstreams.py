@@ -0,0 +1,55 @@
+"""
+Base URLs of the upstream APIs the tools call.
+
+Every upstream can be pointed elsewhere, e.g. at the offline stand-in server in
+benchmarks/standin, without touching the tools:
+    MCPTOOLS_STANDIN_URL=http://127.0.0.1:8765   routes every upstream to
+                                                 <url>/<service>, e.g. .../weatherapi/v1/current.json
+    MCPTOOLS_UPSTREAM_<SERVICE>=<url>            overrides one service (takes precedence),
+                                                 e.g. MCPTOOLS_UPSTREAM_WEATHERAPI=http://localhost:9000
+"""
+import os
+
+# Service name -> real base URL (scheme and host only; tools append the path).
+UPSTREAMS = {
+    "weatherapi": "https://api.weatherapi.com",
+    "alphavantage": "https://www.alphavantage.co",
+    "tavily": "https://api.tavily.com",
+    "google": "https://www.googleapis.com",
+    "firecrawl": "https://api.firecrawl.dev",
+    "wikipedia": "https://en.wikipedia.org",
+    "mangadex": "https://api.mangadex.org",
+    "mangadex_status": "https://status.mangadex.org",
+    "openrouter": "https://openrouter.ai",
+}
+
+
+def upstream_url(service: str, path: str = "") -> str:
+    """
+    Args:
+        service (str): A key of UPSTREAMS.
+        path (str): Path to append, starting with "/".
+    Returns:
+        str: The URL to call, honouring MCPTOOLS_UPSTREAM_<SERVICE> and MCPTOOLS_STANDIN_URL.
+    """
+    if service not in UPSTREAMS:
+        raise KeyError(f"Unknown upstream service: {service}")
+    base = os.getenv(f"MCPTOOLS_UPSTREAM_{service.upper()}")
+    if not base:
+        standin = os.getenv("MCPTOOLS_STANDIN_URL")
+        base = f"{standin.rstrip('/')}/{service}" if standin else UPSTREAMS[service]
+    return base.rstrip("/") + path
+
+
+def service_for_url(url: str) -> str:
+    """
+    Returns:
+        str: The UPSTREAMS service whose (possibly redirected) base URL `url` starts with, or "".
+    """
+    matches = []
+    for service in UPSTREAMS:
+        base = upstream_url(service)
+        if url == base or url.startswith((base + "/", base + "?")):
+            matches.append((len(base), service))
+    # Longest base wins, so ".../mangadex_status/..." is not taken for mangadex.
+    return max(matches)[1] if matches else ""
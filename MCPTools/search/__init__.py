@@ -0,0 +1 @@
+from .federated import PROVIDERS, canonical_url, federated_search, merge_rankings
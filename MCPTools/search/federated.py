@@ -0,0 +1,228 @@
+"""
+Federated web search over Tavily, Google Custom Search and Firecrawl.
+
+All providers are queried at once. Results are deduplicated by canonical URL
+and merged with reciprocal rank fusion (a URL scores 1 / (60 + rank) for every
+provider that returned it), so pages several providers agree on rise to the
+top. The search returns as soon as `quorum` providers have answered with at
+least `k` distinct URLs between them, or when the latency budget runs out;
+providers still running are cancelled.
+
+Each provider call is hedged: when it has not answered within that provider's
+recent p95 latency (see LatencyTracker), a second identical request is started
+and whichever answers first wins. Hedging starts once a provider has enough
+latency samples, and costs at most one extra request in twenty.
+
+A provider whose circuit breaker is open (see loader/health.py) fails at once
+and is reported as an error, so it never holds up the quorum.
+"""
+import asyncio
+import re
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from ..loader import (
+    get_async_firecrawl_app, get_async_http_client, get_async_tavily_client,
+    programmable_search_engine_id, search_api, upstream_url,
+)
+from .latency import LatencyTracker
+
+# Reciprocal rank fusion constant (Cormack et al.); damps the weight of the top ranks.
+RRF_K = 60
+
+_TRACKING_PARAMS = {"gclid", "fbclid", "msclkid", "yclid", "igshid", "mc_cid", "mc_eid", "ref", "ref_src", "_hsenc", "_hsmi"}
+
+
+class ProviderError(Exception):
+    pass
+
+
+def canonical_url(url: str) -> str:
+    """
+    Normalizes a URL for deduplication: https, lower-case host without "www.",
+    no default port, fragment, trailing slash or tracking parameters (utm_*,
+    gclid, ...), and sorted query parameters.
+    """
+    parts = urlsplit(str(url).strip())
+    host = (parts.hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+    try:
+        port = parts.port
+    except ValueError:
+        port = None
+    netloc = host if port in (None, 80, 443) else f"{host}:{port}"
+    path = re.sub(r"/{2,}", "/", parts.path or "/")
+    if len(path) > 1:
+        path = path.rstrip("/")
+    query = urlencode(sorted(
+        (name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not name.lower().startswith("utm_") and name.lower() not in _TRACKING_PARAMS
+    ))
+    return urlunsplit(("https", netloc, path, query, ""))
+
+
+async def _tavily(query: str, k: int) -> List[Dict[str, str]]:
+    response = await get_async_tavily_client().search(query, max_results=k)
+    return [
+        {"title": result.get("title", ""), "url": result["url"], "snippet": result.get("content", "")}
+        for result in response.get("results", []) if result.get("url")
+    ]
+
+
+async def _google(query: str, k: int) -> List[Dict[str, str]]:
+    response = await get_async_http_client().get(upstream_url("google", "/customsearch/v1"), params={
+        "key": search_api, "cx": programmable_search_engine_id, "q": query, "num": max(1, min(k, 10)),
+    })
+    payload = response.json()
+    if response.status_code != 200:
+        error = payload.get("error")
+        message = error.get("message") if isinstance(error, dict) else error
+        raise ProviderError(message or f"HTTP {response.status_code}")
+    # No "items" means no results.
+    return [
+        {"title": item.get("title", ""), "url": item["link"], "snippet": item.get("snippet", "")}
+        for item in payload.get("items", []) if item.get("link")
+    ]
+
+
+async def _firecrawl(query: str, k: int) -> List[Dict[str, str]]:
+    response = await get_async_firecrawl_app().search(query=query, limit=k)
+    if not response.get("success"):
+        raise ProviderError(response.get("error") or "Firecrawl search failed")
+    return [
+        {"title": result.get("title", ""), "url": result["url"], "snippet": result.get("description", "")}
+        for result in response.get("data", []) if result.get("url")
+    ]
+
+
+# Provider name -> search(query, k) returning [{"title", "url", "snippet"}] in rank order.
+PROVIDERS: Dict[str, Callable[[str, int], Awaitable[List[Dict[str, str]]]]] = {
+    "tavily": _tavily,
+    "google": _google,
+    "firecrawl": _firecrawl,
+}
+
+
+async def _timed(provider: str, query: str, k: int, tracker: LatencyTracker) -> List[Dict[str, str]]:
+    start = time.perf_counter()
+    try:
+        results = await PROVIDERS[provider](query, k)
+    except asyncio.CancelledError:
+        raise
+    except Exception:
+        tracker.count(provider, "errors")
+        raise
+    tracker.record(provider, time.perf_counter() - start)
+    return results
+
+
+async def _hedged(provider: str, query: str, k: int, tracker: LatencyTracker, hedge: bool) -> Tuple[List[Dict[str, str]], bool]:
+    """
+    Returns:
+        Tuple[List[Dict[str, str]], bool]: The provider's results, and whether a hedged request was started.
+    """
+    first = asyncio.ensure_future(_timed(provider, query, k, tracker))
+    attempts = [first]
+    try:
+        delay = tracker.hedge_delay(provider) if hedge else None
+        if delay is not None:
+            done, _ = await asyncio.wait({first}, timeout=delay)
+            if not done:
+                tracker.count(provider, "hedges")
+                attempts.append(asyncio.ensure_future(_timed(provider, query, k, tracker)))
+        pending, error = set(attempts), None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    if task is not first:
+                        tracker.count(provider, "hedge_wins")
+                    return task.result(), len(attempts) > 1
+                error = task.exception()
+        raise error
+    finally:
+        for task in attempts:
+            if not task.done():
+                task.cancel()
+
+
+def merge_rankings(rankings: Dict[str, List[Dict[str, str]]]) -> List[Dict[str, Any]]:
+    """
+    Deduplicates by canonical URL and orders by reciprocal rank fusion score.
+    Args:
+        rankings (dict): Provider name -> results in that provider's rank order.
+    Returns:
+        List[Dict[str, Any]]: {"title", "url", "snippet", "providers", "score"}, best first.
+    """
+    merged: Dict[str, Dict[str, Any]] = {}
+    for provider, results in rankings.items():
+        for rank, result in enumerate(results, 1):
+            entry = merged.setdefault(canonical_url(result["url"]), {
+                "title": result["title"], "url": result["url"], "snippet": result["snippet"], "providers": [], "score": 0.0,
+            })
+            if provider not in entry["providers"]:
+                entry["providers"].append(provider)
+                entry["score"] += 1 / (RRF_K + rank)
+            if not entry["snippet"]:
+                entry["snippet"] = result["snippet"]
+    return sorted(merged.values(), key=lambda entry: -entry["score"])
+
+
+async def federated_search(
+    query: str,
+    k: int,
+    budget: float,
+    providers: List[str],
+    tracker: LatencyTracker,
+    quorum: int = 2,
+    hedge: bool = True,
+) -> Dict[str, Any]:
+    """
+    Args:
+        query (str): The search query.
+        k (int): Number of merged results wanted.
+        budget (float): Seconds to wait before returning with whatever has arrived.
+        providers (List[str]): Keys of PROVIDERS to query.
+        tracker (LatencyTracker): Per-provider latencies that set the hedging thresholds.
+        quorum (int): Providers that must have answered before returning early.
+        hedge (bool): Start a second request when a provider runs past its p95.
+    Returns:
+        dict: {"results": [{"rank", "title", "url", "snippet", "providers", "score"}],
+               "providers": {name: {"status", "ms", ...}}, "elapsed_ms"}.
+    """
+    start = time.perf_counter()
+    tasks = {asyncio.ensure_future(_hedged(name, query, k, tracker, hedge)): name for name in providers}
+    rankings: Dict[str, List[Dict[str, str]]] = {}
+    status: Dict[str, Dict[str, Any]] = {}
+    pending, reason = set(tasks), "budget"
+    try:
+        while pending:
+            remaining = budget - (time.perf_counter() - start)
+            if remaining <= 0:
+                break
+            done, pending = await asyncio.wait(pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                name, elapsed = tasks[task], round((time.perf_counter() - start) * 1000, 1)
+                if task.exception() is not None:
+                    status[name] = {"status": "error", "ms": elapsed, "error": str(task.exception())}
+                else:
+                    results, hedged = task.result()
+                    rankings[name] = results
+                    status[name] = {"status": "ok", "ms": elapsed, "results": len(results), "hedged": hedged}
+            needed = min(quorum, len(providers) - sum(s["status"] == "error" for s in status.values()))
+            if pending and len(rankings) >= needed and len(merge_rankings(rankings)) >= k:
+                reason = "top_k_filled"
+                break
+    finally:
+        for task in pending:
+            task.cancel()
+            tracker.count(tasks[task], "cancelled")
+            status[tasks[task]] = {"status": "cancelled", "reason": reason}
+
+    results = [
+        {"rank": rank, **entry, "score": round(entry["score"], 5)}
+        for rank, entry in enumerate(merge_rankings(rankings)[:k], 1)
+    ]
+    return {"results": results, "providers": status, "elapsed_ms": round((time.perf_counter() - start) * 1000, 1)}
@@ -0,0 +1,75 @@
+import os
+import threading
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+
+
+class LatencyTracker:
+    """
+    Recent latencies and outcome counters per search provider.
+
+    Latencies are kept in a sliding window of the last `window` successful
+    calls; once a provider has `min_samples` of them, its p95 becomes the delay
+    after which a hedged request is started.
+    """
+
+    def __init__(self, window: Optional[int] = None, min_samples: Optional[int] = None):
+        self.window = window if window is not None else int(os.getenv("SEARCH_LATENCY_WINDOW", 200))
+        self.min_samples = min_samples if min_samples is not None else int(os.getenv("SEARCH_HEDGE_MIN_SAMPLES", 10))
+        self._lock = threading.Lock()
+        self._latencies: Dict[str, Deque[float]] = {}
+        self._counters: Dict[str, Dict[str, int]] = {}
+
+    def _provider(self, provider: str) -> Dict[str, int]:
+        if provider not in self._counters:
+            self._latencies[provider] = deque(maxlen=self.window)
+            self._counters[provider] = {"calls": 0, "errors": 0, "hedges": 0, "hedge_wins": 0, "cancelled": 0}
+        return self._counters[provider]
+
+    def record(self, provider: str, seconds: float) -> None:
+        with self._lock:
+            self._provider(provider)["calls"] += 1
+            self._latencies[provider].append(seconds)
+
+    def count(self, provider: str, counter: str) -> None:
+        with self._lock:
+            counters = self._provider(provider)
+            counters[counter] += 1
+            if counter == "errors":
+                counters["calls"] += 1
+
+    def percentile(self, provider: str, q: float) -> Optional[float]:
+        with self._lock:
+            samples = sorted(self._latencies.get(provider, ()))
+        if not samples:
+            return None
+        return samples[min(len(samples) - 1, int(round(q * (len(samples) - 1))))]
+
+    def hedge_delay(self, provider: str) -> Optional[float]:
+        """
+        Returns:
+            Optional[float]: The provider's p95 latency in seconds, or None while
+            there are too few samples to hedge.
+        """
+        with self._lock:
+            samples = len(self._latencies.get(provider, ()))
+        return self.percentile(provider, 0.95) if samples >= self.min_samples else None
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns:
+            dict: Per provider: calls, errors, hedges (hedged requests started), hedge_wins
+            (hedged requests that answered first), cancelled, samples and p50/p95 in ms.
+        """
+        with self._lock:
+            providers = {name: dict(counters, samples=len(self._latencies[name])) for name, counters in self._counters.items()}
+        for name, stats in providers.items():
+            for label, q in (("p50_ms", 0.5), ("p95_ms", 0.95)):
+                value = self.percentile(name, q)
+                stats[label] = round(value * 1000, 1) if value is not None else None
+        return providers
+
+    def reset(self) -> None:
+        with self._lock:
+            self._latencies.clear()
+            self._counters.clear()
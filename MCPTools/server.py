@@ -1,15 +1,52 @@
+import sys
+from typing import Any, Sequence
+
 from mcp.server.fastmcp import FastMCP
+from mcp.server.fastmcp.exceptions import ToolError
+from mcp.types import ContentBlock, TextContent
+
+from .loader import compaction, get_compaction_stats
+
+
+class CompactingFastMCP(FastMCP):
+    """
+    FastMCP that passes every tool result through the output compaction stage
+    (projection, deduplication and the tool's token budget; see loader/compaction.py)
+    before it is serialized for the client.
+    """
+
+    async def call_tool(self, name: str, arguments: dict[str, Any]) -> Sequence[ContentBlock] | dict[str, Any]:
+        if not compaction.enabled():
+            return await super().call_tool(name, arguments)
+        tool = self._tool_manager.get_tool(name)
+        if not tool:
+            raise ToolError(f"Unknown tool: {name}")
+        result = await tool.run(arguments, context=self.get_context())
+        if not isinstance(result, (dict, list, str)):
+            return tool.fn_metadata.convert_result(result)
+        # Lazy tools are registered as proxies; the budget is declared on the real function.
+        module = sys.modules.get(tool.fn.__module__)
+        budget = compaction.budget_for(name, getattr(module, tool.fn.__name__, tool.fn))
+        result, text = compaction.compact_result(name, result, budget, get_compaction_stats())
+        converted = tool.fn_metadata.convert_result(result)
+        content = [TextContent(type="text", text=text)]
+        if isinstance(converted, tuple):
+            return content, converted[1]
+        return content
 
-mcp = FastMCP(
+
+mcp = CompactingFastMCP(
     name="mcp_tools",
     instructions="You are a helpful assistant that can answer questions and help with tasks.",
+    # Tools are registered up front from their source (see tools/lazy.py); the
+    # tool modules' own @mcp.tool() runs again when they are first imported.
+    warn_on_duplicate_tools=False,
     # host="127.0.0.1",
     # port=8000
     # stateless_http=True
 )
 
 # Import all tools to register them with MCP
-import sys
 import os
 # sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
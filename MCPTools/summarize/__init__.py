@@ -0,0 +1,2 @@
+from .cascade import Summary, SummaryCascade
+from .extractive import ExtractiveSummary, extractive_summary, split_units
@@ -0,0 +1,113 @@
+"""
+Summarization cascade: a local extractive summary first, a remote model only
+when the local one is not good enough.
+
+    passthrough  the text already fits the limit; returned as it is
+    extractive   the local summary's confidence reaches `min_confidence`
+    llm          otherwise, when the caller supplies a model call; if that
+                 call fails, the extractive summary is returned instead, and
+                 an answer over the limit is cut down extractively
+
+Configuration:
+    SUMMARY_MIN_CONFIDENCE   (default 0.4) share of the text's sentence score an
+                             extractive summary must keep; 0 never calls the model,
+                             above 1 always does
+"""
+import logging
+import os
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, NamedTuple, Optional
+
+from .extractive import extractive_summary
+
+logger = logging.getLogger(__name__)
+
+TIERS = ("passthrough", "extractive", "llm")
+
+
+class Summary(NamedTuple):
+    text: str
+    tier: str
+    confidence: float
+
+
+class SummaryCascade:
+    """
+    Runs the cascade and keeps per-tier call counts and latencies.
+    """
+
+    def __init__(self, min_confidence: Optional[float] = None):
+        self.min_confidence = (
+            min_confidence if min_confidence is not None else float(os.getenv("SUMMARY_MIN_CONFIDENCE", 0.4))
+        )
+        self._lock = threading.Lock()
+        self._stats = {tier: {"calls": 0, "seconds": 0.0, "max_seconds": 0.0} for tier in TIERS}
+        self._llm_errors = 0
+
+    def _record(self, tier: str, seconds: float) -> None:
+        with self._lock:
+            counters = self._stats[tier]
+            counters["calls"] += 1
+            counters["seconds"] += seconds
+            counters["max_seconds"] = max(counters["max_seconds"], seconds)
+
+    async def summarize(
+        self,
+        text: str,
+        max_tokens: int,
+        llm: Optional[Callable[[], Awaitable[str]]] = None,
+        max_words: Optional[int] = None,
+        query: str = "",
+    ) -> Summary:
+        """
+        Args:
+            text (str): Text to shrink.
+            max_tokens (int): Token limit of the summary.
+            llm (callable): Optional model call returning a summary; used only for low-confidence texts.
+            max_words (int): Optional word limit as well.
+            query (str): Words to favour in the extractive summary (title, question).
+        Returns:
+            Summary: The text, the tier that produced it and the extractive confidence.
+        """
+        start = time.perf_counter()
+        local = extractive_summary(text, max_tokens, max_words=max_words, query=query)
+        if local.complete:
+            self._record("passthrough", time.perf_counter() - start)
+            return Summary(local.text, "passthrough", local.confidence)
+        if local.confidence >= self.min_confidence or llm is None:
+            self._record("extractive", time.perf_counter() - start)
+            return Summary(local.text, "extractive", local.confidence)
+        try:
+            summary = await llm()
+        except Exception as e:
+            logger.warning("Model summary failed, using the extractive one: %s", e)
+            with self._lock:
+                self._llm_errors += 1
+            self._record("extractive", time.perf_counter() - start)
+            return Summary(local.text, "extractive", local.confidence)
+        summary = extractive_summary(summary, max_tokens, max_words=max_words, query=query).text
+        self._record("llm", time.perf_counter() - start)
+        return Summary(summary, "llm", local.confidence)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns:
+            dict: Per tier: calls, share of all calls, mean and max latency (ms);
+            and model calls that failed (answered from the extractive tier).
+        """
+        with self._lock:
+            tiers = {tier: dict(counters) for tier, counters in self._stats.items()}
+            llm_errors = self._llm_errors
+        total = sum(counters["calls"] for counters in tiers.values())
+        stats = {}
+        for tier, counters in tiers.items():
+            calls = counters["calls"]
+            stats[tier] = {
+                "calls": calls,
+                "share": round(calls / total, 3) if total else 0.0,
+                "mean_ms": round(1000 * counters["seconds"] / calls, 3) if calls else 0.0,
+                "max_ms": round(1000 * counters["max_seconds"], 3),
+            }
+        stats["llm_errors"] = llm_errors
+        return stats
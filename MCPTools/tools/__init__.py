@@ -1,22 +1,59 @@
-from .ping import get_credits
-from .trade import get_bitcoin_price, get_crypto_data
-from .utils import get_datetime, get_project_structure
-from .weather import get_weather
-from .web_search import deep_research, search_firecrawl, internet_search, google_search 
-from .manga import get_summarized_manga_info
-from .wiki import wikipedia_search
+import os
+from ..server import mcp
+from .lazy import register_lazy_tools
+
+# Tool modules are only imported when one of their tools is first called;
+# MCPTOOLS_EAGER_LOAD=1 imports them all up front instead.
+TOOL_MODULES = ["ping", "trade", "utils", "weather", "web_search", "manga", "wiki"]
+
+_tools = register_lazy_tools(
+    mcp,
+    TOOL_MODULES,
+    eager=os.getenv("MCPTOOLS_EAGER_LOAD", "").lower() in ("1", "true", "yes"),
+)
+
+get_credits = _tools["get_credits"]
+get_server_stats = _tools["get_server_stats"]
+get_bitcoin_price = _tools["get_bitcoin_price"]
+get_bitcoin_price_batch = _tools["get_bitcoin_price_batch"]
+get_crypto_data = _tools["get_crypto_data"]
+get_crypto_history = _tools["get_crypto_history"]
+get_datetime = _tools["get_datetime"]
+get_project_structure = _tools["get_project_structure"]
+get_weather = _tools["get_weather"]
+get_weather_batch = _tools["get_weather_batch"]
+deep_research = _tools["deep_research"]
+start_deep_research = _tools["start_deep_research"]
+get_research_status = _tools["get_research_status"]
+get_research_result = _tools["get_research_result"]
+search_firecrawl = _tools["search_firecrawl"]
+internet_search = _tools["internet_search"]
+google_search = _tools["google_search"]
+federated_search = _tools["federated_search"]
+wikipedia_search = _tools["wikipedia_search"]
+get_summarized_manga_info = _tools["get_summarized_manga_info"]
+get_manga_info_batch = _tools["get_manga_info_batch"]
 
 __all__ = [
     "get_credits",
+    "get_server_stats",
     "get_bitcoin_price",
+    "get_bitcoin_price_batch",
     "get_crypto_data",
+    "get_crypto_history",
     "get_datetime",
     "get_project_structure",
     "get_weather",
+    "get_weather_batch",
     "deep_research",
+    "start_deep_research",
+    "get_research_status",
+    "get_research_result",
     "search_firecrawl",
     "internet_search",
     "google_search",
+    "federated_search",
     "wikipedia_search",
-    "get_summarized_manga_info"
-]
\ No newline at end of file
+    "get_summarized_manga_info",
+    "get_manga_info_batch"
+]
@@ -0,0 +1,182 @@
+"""
+Deferred registration of MCP tools.
+
+Tool schemas are read from the tool modules' source with `ast` instead of
+importing them, so `list_tools` can be answered without pulling in pandas,
+BeautifulSoup, pydantic models or SDK clients. Each tool is registered as a
+thin proxy with the real function's name, docstring and signature; the
+implementing module is imported the first time one of its tools is called.
+"""
+import ast
+import importlib
+import inspect
+import logging
+import os
+import threading
+import typing
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+from mcp.server.fastmcp import Context
+
+logger = logging.getLogger(__name__)
+
+TOOLS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Names tool signatures may use in annotations.
+_ANNOTATION_NAMESPACE: Dict[str, Any] = {
+    **{name: getattr(typing, name) for name in typing.__all__},
+    "Context": Context,
+}
+
+_import_lock = threading.Lock()
+
+
+class ToolSpec(NamedTuple):
+    name: str
+    module: str
+    is_async: bool
+    doc: Optional[str]
+    signature: inspect.Signature
+
+
+class _NotStatic(Exception):
+    """A signature element that cannot be evaluated without importing the module."""
+
+
+def _is_mcp_tool_decorator(node: ast.expr) -> bool:
+    return (
+        isinstance(node, ast.Call)
+        and isinstance(node.func, ast.Attribute)
+        and node.func.attr == "tool"
+        and isinstance(node.func.value, ast.Name)
+        and node.func.value.id == "mcp"
+    )
+
+
+def _annotation(node: Optional[ast.expr]) -> Any:
+    if node is None:
+        return inspect.Parameter.empty
+    try:
+        return eval(compile(ast.Expression(node), "<annotation>", "eval"), dict(_ANNOTATION_NAMESPACE))
+    except Exception as e:
+        raise _NotStatic(ast.unparse(node)) from e
+
+
+def _default(node: Optional[ast.expr]) -> Any:
+    if node is None:
+        return inspect.Parameter.empty
+    try:
+        return ast.literal_eval(node)
+    except Exception as e:
+        raise _NotStatic(ast.unparse(node)) from e
+
+
+def _signature(func: ast.FunctionDef | ast.AsyncFunctionDef) -> inspect.Signature:
+    args = func.args
+    positional = args.posonlyargs + args.args
+    defaults = [None] * (len(positional) - len(args.defaults)) + list(args.defaults)
+    params = []
+    for i, (arg, default) in enumerate(zip(positional, defaults)):
+        kind = inspect.Parameter.POSITIONAL_ONLY if i < len(args.posonlyargs) else inspect.Parameter.POSITIONAL_OR_KEYWORD
+        params.append(inspect.Parameter(arg.arg, kind, default=_default(default), annotation=_annotation(arg.annotation)))
+    if args.vararg:
+        params.append(inspect.Parameter(args.vararg.arg, inspect.Parameter.VAR_POSITIONAL, annotation=_annotation(args.vararg.annotation)))
+    for arg, default in zip(args.kwonlyargs, args.kw_defaults):
+        params.append(inspect.Parameter(arg.arg, inspect.Parameter.KEYWORD_ONLY, default=_default(default), annotation=_annotation(arg.annotation)))
+    if args.kwarg:
+        params.append(inspect.Parameter(args.kwarg.arg, inspect.Parameter.VAR_KEYWORD, annotation=_annotation(args.kwarg.annotation)))
+    return inspect.Signature(params, return_annotation=_annotation(func.returns))
+
+
+def _tool_nodes(module: str) -> List[ast.FunctionDef | ast.AsyncFunctionDef]:
+    with open(os.path.join(TOOLS_DIR, f"{module}.py"), encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    return [
+        node for node in tree.body
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef))
+        and any(_is_mcp_tool_decorator(d) for d in node.decorator_list)
+    ]
+
+
+def _spec(module: str, node: ast.FunctionDef | ast.AsyncFunctionDef) -> ToolSpec:
+    return ToolSpec(
+        name=node.name,
+        module=module,
+        is_async=isinstance(node, ast.AsyncFunctionDef),
+        doc=ast.get_docstring(node, clean=False),
+        signature=_signature(node),
+    )
+
+
+def read_tool_specs(module: str) -> List[ToolSpec]:
+    """
+    Read the `@mcp.tool()` functions of a tool module without importing it.
+    Args:
+        module (str): Module name inside MCPTools.tools, e.g. "weather".
+    Returns:
+        List[ToolSpec]: One spec per tool, in source order.
+    """
+    return [_spec(module, node) for node in _tool_nodes(module)]
+
+
+def _load(spec: ToolSpec) -> Callable[..., Any]:
+    with _import_lock:
+        module = importlib.import_module(f"{__package__}.{spec.module}")
+    return getattr(module, spec.name)
+
+
+def make_proxy(spec: ToolSpec) -> Callable[..., Any]:
+    """
+    Build a stand-in for a tool that imports the implementing module on first call.
+    The proxy carries the tool's name, docstring and signature, so FastMCP derives
+    the same schema from it as from the real function.
+    """
+    target: List[Callable[..., Any]] = []
+
+    def resolve() -> Callable[..., Any]:
+        if not target:
+            target.append(_load(spec))
+        return target[0]
+
+    if spec.is_async:
+        async def proxy(*args, **kwargs):
+            return await resolve()(*args, **kwargs)
+    else:
+        def proxy(*args, **kwargs):
+            return resolve()(*args, **kwargs)
+
+    proxy.__name__ = proxy.__qualname__ = spec.name
+    proxy.__doc__ = spec.doc
+    proxy.__module__ = f"{__package__}.{spec.module}"
+    proxy.__signature__ = spec.signature
+    return proxy
+
+
+def register_lazy_tools(mcp, modules: List[str], eager: bool = False) -> Dict[str, Callable[..., Any]]:
+    """
+    Register every tool in `modules` with the MCP server.
+    Args:
+        mcp: The FastMCP server.
+        modules (List[str]): Tool module names inside MCPTools.tools.
+        eager (bool): Import the modules right away (their own `@mcp.tool()` registers them).
+    Returns:
+        Dict[str, Callable]: Tool name to callable (a proxy, or the real function when imported).
+    """
+    tools = {}
+    for module in modules:
+        nodes = _tool_nodes(module)
+        specs = None
+        if not eager:
+            try:
+                specs = [_spec(module, node) for node in nodes]
+            except _NotStatic as e:
+                logger.warning("Importing %s eagerly, cannot evaluate %s statically", module, e)
+        if specs is None:
+            imported = importlib.import_module(f"{__package__}.{module}")
+            tools.update({node.name: getattr(imported, node.name) for node in nodes})
+            continue
+        for spec in specs:
+            proxy = make_proxy(spec)
+            mcp.add_tool(proxy, name=spec.name)
+            tools[spec.name] = proxy
+    return tools
@@ -1,11 +1,19 @@
-from bs4 import BeautifulSoup
-import requests
-from typing import List, Dict, Optional, Union
+from typing import Any, AsyncIterator, List, Dict, Optional, Tuple, Union
 from pydantic import BaseModel
 from datetime import datetime
+import asyncio
+import json
 import openai
 import os
-from ..loader import open_router_open_api_client
+import re
+from mcp.server.fastmcp import Context
+from ..loader import (
+    get_async_open_router_client, get_async_http_client, get_manga_summary_cache, get_summary_cascade, upstream_url,
+)
+from ..loader.summary_cache import summary_key
+from ..loader.compaction import estimate_tokens, token_budget
+from ..loader.health import CircuitOpen, mangadex_components
+from ..loader.rate_limit import RateLimitExceeded
 # from dotenv import load_dotenv
 
 # load_dotenv()
@@ -13,31 +21,50 @@ from ..loader import open_router_open_api_client
 
 from ..server import mcp
 
-def get_mangadex_status():
-    url = "https://status.mangadex.org"
-    response = requests.get(url)
-    
-    soup = BeautifulSoup(response.text, "html.parser")
-    
-    result = soup.find_all("span", class_="component-status")
-    result2 = soup.find_all("span", class_="name")
-    
-    # Clean up the text by stripping whitespace
-    website_status = result[0].text.strip()
-    website_name = result2[0].text.strip()
-    api_status = result[1].text.strip()
-    api_name = result2[1].text.strip()
-    cdn_status = result[2].text.strip()
-    cdn_name = result2[2].text.strip()
-    core_status = result[3].text.strip()
-    core_name = result2[3].text.strip()
-    
-    print("--------------------------------")
-    print(f"Website: {website_name} - {website_status}")
-    print(f"API: {api_name} - {api_status}")
-    print(f"CDN: {cdn_name} - {cdn_status}")
-    print(f"Core: {core_name} - {core_status}")
-    print("--------------------------------")
+# MangaDex's default page size; every hit is sent on to the summarizer.
+MANGADEX_SEARCH_LIMIT = int(os.getenv("MANGADEX_SEARCH_LIMIT", 10))
+# Hits per paged request in get_manga_info_batch (MangaDex allows up to 100).
+MANGADEX_PAGE_SIZE = int(os.getenv("MANGADEX_PAGE_SIZE", 100))
+# /manga serves at most the first 10000 hits of a query (offset + limit).
+MANGADEX_RESULT_WINDOW = 10000
+# ids[] values per request (MangaDex's page size limit).
+MANGADEX_IDS_PER_REQUEST = 100
+MANGADEX_BATCH_CONCURRENCY = int(os.getenv("MANGADEX_BATCH_CONCURRENCY", 4))
+MANGADEX_BATCH_MAX_QUERIES = int(os.getenv("MANGADEX_BATCH_MAX_QUERIES", 200))
+MANGADEX_BATCH_MAX_RESULTS = int(os.getenv("MANGADEX_BATCH_MAX_RESULTS", 500))
+# Id lookups ask for every rating; /manga leaves "pornographic" out unless asked.
+MANGADEX_CONTENT_RATINGS = ["safe", "suggestive", "erotica", "pornographic"]
+_MANGADEX_ID = re.compile(r"^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$", re.IGNORECASE)
+# Validate search hits into the full pydantic models (slower; the output only reads a few fields).
+MANGADEX_VALIDATE = os.getenv("MANGADEX_VALIDATE", "").lower() in ("1", "true", "yes")
+MANGA_SUMMARY_MODEL = os.getenv("MANGA_SUMMARY_MODEL", "x-ai/grok-4")
+# Summaries requested from the model at once (one search page by default).
+MANGA_SUMMARY_CONCURRENCY = int(os.getenv("MANGA_SUMMARY_CONCURRENCY", 10))
+# Limits of the summaries. Descriptions are first shrunk locally (see MCPTools/summarize);
+# the model is only asked when the extractive summary would leave out too much.
+# The whole answer gets MANGA_SUMMARY_TOTAL_TOKENS, split evenly across the hits; one manga
+# never gets more than MANGA_SUMMARY_MAX_TOKENS nor less than MANGA_SUMMARY_MIN_TOKENS, below
+# which a summary is little more than its header. So a full search page (10 hits) can take
+# up to 600 tokens, still inside get_summarized_manga_info's token budget of 800.
+MANGA_SUMMARY_TOTAL_TOKENS = int(os.getenv("MANGA_SUMMARY_TOTAL_TOKENS", 300))
+MANGA_SUMMARY_MAX_TOKENS = int(os.getenv("MANGA_SUMMARY_MAX_TOKENS", 150))
+MANGA_SUMMARY_MIN_TOKENS = int(os.getenv("MANGA_SUMMARY_MIN_TOKENS", 60))
+MANGA_SUMMARY_MAX_WORDS = int(os.getenv("MANGA_SUMMARY_MAX_WORDS", 100))
+MANGA_SUMMARY_SYSTEM_PROMPT = """You are a manga information summarizer. Your task is to:
+    1. Take the raw manga data, clean it and create a concise summary with *description*
+    2. Focus on the most important details (title, main themes, genre)
+    3. Keep the summary under {max_words} words
+    4. Format in a clean, readable way
+    5. Return the string with all information in one string as small as possible. Make it limit {max_tokens} tokens
+    """
+
+async def get_mangadex_status() -> Dict[str, str]:
+    """
+    Component statuses from status.mangadex.org, e.g. {"API": "Operational", ...}.
+    The health monitor probes MangaDex the same way (see loader/health.py).
+    """
+    response = await get_async_http_client().get(upstream_url("mangadex_status"))
+    return mangadex_components(response.text)
 
 class TagAttributes(BaseModel):
     name: Dict[str, str]
@@ -111,8 +138,97 @@ def print_manga_info(mangas: List[Manga]):
             print(f"  - {tag.attributes.name.get('en', '')}")
         print("=====================")
 
+def _en(text: Optional[Dict[str, str]]) -> str:
+    return (text or {}).get("en", "")
+
+def _tag_names(attributes: dict) -> List[str]:
+    return [_en((tag.get("attributes") or {}).get("name")) for tag in attributes.get("tags") or []]
+
+def manga_line(manga: dict, tags: bool = False) -> str:
+    """
+    Format one manga from the raw MangaDex JSON, reading only the fields in the output
+    """
+    attributes = manga.get("attributes") or {}
+    description = _en(attributes.get("description")).replace("\n\n", " ").replace("\n", " ")
+    line = (
+        f"id:{manga.get('id')} title:{_en(attributes.get('title'))},"
+        f"description:{description},"
+        f"status:{attributes.get('status')},year:{attributes.get('year')},"
+        f"contentRating:{attributes.get('contentRating')}"
+    )
+    if tags:
+        line += f",tags:{','.join(_tag_names(attributes))}"
+    return line
+
+def parse_manga_lines(manga_data: List[dict], tags: bool = False, validate: Optional[bool] = None) -> List[str]:
+    """
+    Format MangaDex search hits, one line per manga
+    Args:
+        manga_data: List[dict] -> The "data" list of a /manga response
+        tags: bool -> Whether to include tags
+        validate: bool -> Also validate the hits into the full Manga models (default: MANGADEX_VALIDATE)
+    """
+    if validate is None:
+        validate = MANGADEX_VALIDATE
+    if validate:
+        # Raises pydantic.ValidationError when the response no longer matches the models.
+        store_manga_data(manga_data)
+    return [manga_line(manga, tags) for manga in manga_data]
+
+def _to_bool(value: Union[bool, str]) -> bool:
+    if isinstance(value, bool):
+        return value
+    return str(value).lower() == "true"
+
+class MangaDexError(Exception):
+    pass
+
+async def _manga_page(params: dict) -> dict:
+    """
+    One /manga response (data, limit, offset, total)
+    Raises:
+        MangaDexError: When MangaDex answers with an error instead of results
+    """
+    r = await get_async_http_client().get(f"{upstream_url('mangadex')}/manga", params=params)
+    try:
+        payload = r.json()
+    except ValueError:
+        raise MangaDexError(f"MangaDex answered HTTP {r.status_code} without JSON") from None
+    if r.status_code != 200 or payload.get("result") != "ok":
+        errors = payload.get("errors") or [{}]
+        detail = errors[0].get("detail") or errors[0].get("title") or payload.get("result")
+        raise MangaDexError(f"MangaDex error (HTTP {r.status_code}): {detail}")
+    return payload
+
+async def _search_manga(title: str) -> List[dict]:
+    return (await _manga_page({"title": title, "limit": MANGADEX_SEARCH_LIMIT}))["data"]
+
+async def iter_manga_pages(params: dict, max_results: int, page_size: Optional[int] = None) -> AsyncIterator[Tuple[int, List[dict]]]:
+    """
+    Page through a /manga query with limit/offset, one page in memory at a time
+    Args:
+        params: dict -> Query parameters, e.g. {"title": "Chainsaw Man"}
+        max_results: int -> Hits to fetch at most
+        page_size: int -> Hits per request (default: MANGADEX_PAGE_SIZE, at most 100)
+    Yields:
+        Tuple[int, List[dict]]: The query's total hits and the next page's "data"
+    """
+    page_size = min(page_size or MANGADEX_PAGE_SIZE, 100)
+    offset = 0
+    while offset < max_results:
+        limit = min(page_size, max_results - offset, MANGADEX_RESULT_WINDOW - offset)
+        if limit <= 0:
+            return
+        payload = await _manga_page({**params, "limit": limit, "offset": offset})
+        data = payload.get("data") or []
+        if data:
+            yield payload.get("total", len(data)), data
+        offset += len(data)
+        if len(data) < limit or offset >= payload.get("total", 0):
+            return
+
 # @mcp.tool()
-def get_manga_info_json(title: List[Manga], tags: bool = False) -> Dict[str, str]:
+async def get_manga_info_json(title: str, tags: bool = False) -> Dict[str, str]:
     """
     Get manga information in JSON format
     Args:
@@ -120,105 +236,276 @@ def get_manga_info_json(title: List[Manga], tags: bool = False) -> Dict[str, str
         tags: bool -> Whether to include tags in the output
     Returns:
         Dict[str, str]: A dictionary with the manga information
-        {"result": str -> The manga information}
+        {"result": str -> The manga information} or {"error": str}
     """
-    base_url = "https://api.mangadex.org"
-    # title = "Rising of the Shield Hero"
-    r = requests.get(
-        f"{base_url}/manga",
-        params={"title": title}
-    )
-    # print([manga for manga in r.json()["data"]])
-    response = r.json()['result']
-    if response != "ok":
-        print(f"Error: {response}")
-        exit()
-    manga_data = r.json()["data"]
-    # id = manga_data[0]['id']
-    # print(manga_data)
-    mangas = store_manga_data(manga_data)
-    data = []
-    def convert_to_bool(tags: Union[bool, str]) -> bool:
-        if isinstance(tags, bool):
-            return True if tags else False
-        elif tags.lower() == "true":
-            return True
-        elif tags.lower() == "false":
-            return False
-        else:
-            return False
-    tags = convert_to_bool(tags)
-    if tags:
-        for manga in mangas:
-            tags = []
-            for tag in manga.attributes.tags:
-                tags.append(tag.attributes.name.get('en', ''))
-            # if title.lower() == manga.attributes.title.get('en', '').lower():
-            data.append(
-                f"id:{manga.id} title:{manga.attributes.title.get('en', '')},"
-                f"description:{manga.attributes.description.get('en', '').replace('\n\n', ' ').replace('\n', ' ')},"
-                f"status:{manga.attributes.status},year:{manga.attributes.year},"
-                f"contentRating:{manga.attributes.contentRating},tags:{','.join(tags)}"
-            )
-    else:
-        for manga in mangas:
-            # if title.lower() == manga.attributes.title.get('en', '').lower():
-                data.append(
-                    f"id:{manga.id} title:{manga.attributes.title.get('en', '')},"
-                    f"description:{manga.attributes.description.get('en', '').replace('\n\n', ' ').replace('\n', ' ')},"
-                    f"status:{manga.attributes.status},year:{manga.attributes.year},"
-                    f"contentRating:{manga.attributes.contentRating}"
-                )
+    try:
+        data = parse_manga_lines(await _search_manga(title), _to_bool(tags))
+    except (MangaDexError, CircuitOpen, RateLimitExceeded) as e:
+        return {"error": str(e)}
     return {
         "result": "\n".join(data)
         }
+
+def _query_list(queries: Any) -> List[str]:
+    if isinstance(queries, str):
+        # Accept a JSON list or a comma/newline separated string as well as a list
+        text = queries.strip()
+        if text.startswith("["):
+            queries = json.loads(text)
+        else:
+            queries = text.replace("\n", ",").split(",")
+    return [str(query).strip() for query in queries if str(query).strip()]
+
+async def _report(ctx: Optional[Context], streamed: int, message: str) -> None:
+    # Progress notifications only reach clients that sent a progressToken; direct calls have no request.
+    if ctx is None:
+        return
+    try:
+        await ctx.report_progress(streamed, message=message)
+    except ValueError:
+        pass
+
+async def iter_manga_entries(queries: List[str], tags: bool = False, max_results: int = 10) -> AsyncIterator[Tuple[int, Dict[str, Any]]]:
+    """
+    Resolve titles and MangaDex ids concurrently, yielding results as they arrive
+    Ids go to MangaDex in ids[] batches of up to 100; each distinct title is paged
+    with limit/offset. At most MANGADEX_BATCH_CONCURRENCY requests run at once.
+    Args:
+        queries: List[str] -> Titles and/or MangaDex ids
+        tags: bool -> Whether to include tags
+        max_results: int -> Hits per title
+    Yields:
+        Tuple[int, Dict[str, Any]]: The index of the query and either {"entry": str}
+        (one formatted manga), {"total": int} (once per title, with its total hits),
+        {"done": True} or {"error": str}; every query ends with "done" or "error"
+    """
+    queue: asyncio.Queue = asyncio.Queue()
+    semaphore = asyncio.Semaphore(MANGADEX_BATCH_CONCURRENCY)
+    ids: Dict[str, List[int]] = {}
+    titles: Dict[str, List[int]] = {}
+    for i, query in enumerate(queries):
+        (ids if _MANGADEX_ID.match(query) else titles).setdefault(query.lower(), []).append(i)
+
+    def put(indices: List[int], event: Dict[str, Any]) -> None:
+        for i in indices:
+            queue.put_nowait((i, event))
+
+    async def lookup_ids(chunk: List[str]) -> None:
+        try:
+            async with semaphore:
+                payload = await _manga_page({
+                    "ids[]": chunk, "limit": len(chunk), "contentRating[]": MANGADEX_CONTENT_RATINGS,
+                })
+            found = {str(manga.get("id")).lower(): manga for manga in payload.get("data") or []}
+        except Exception as e:
+            for manga_id in chunk:
+                put(ids[manga_id], {"error": str(e) or type(e).__name__})
+            return
+        for manga_id in chunk:
+            if manga_id not in found:
+                put(ids[manga_id], {"error": "No manga with this id"})
+                continue
+            try:
+                line = parse_manga_lines([found[manga_id]], tags)[0]
+            except Exception as e:
+                put(ids[manga_id], {"error": f"Unexpected MangaDex data: {e}"})
+                continue
+            put(ids[manga_id], {"total": 1})
+            put(ids[manga_id], {"entry": line})
+            put(ids[manga_id], {"done": True})
+
+    async def lookup_title(title: str) -> None:
+        indices, query = titles[title], queries[titles[title][0]]
+        first = True
+        try:
+            async with semaphore:
+                async for total, page in iter_manga_pages({"title": query}, max_results):
+                    if first:
+                        put(indices, {"total": total})
+                        first = False
+                    for line in parse_manga_lines(page, tags):
+                        put(indices, {"entry": line})
+        except Exception as e:
+            put(indices, {"error": str(e) or type(e).__name__})
+            return
+        put(indices, {"done": True})
+
+    unique_ids = list(ids)
+    tasks = [
+        asyncio.ensure_future(lookup_ids(unique_ids[start:start + MANGADEX_IDS_PER_REQUEST]))
+        for start in range(0, len(unique_ids), MANGADEX_IDS_PER_REQUEST)
+    ] + [asyncio.ensure_future(lookup_title(title)) for title in titles]
+    remaining = len(queries)
+    try:
+        while remaining:
+            i, event = await queue.get()
+            if "done" in event or "error" in event:
+                remaining -= 1
+            yield i, event
+    finally:
+        for task in tasks:
+            task.cancel()
+
+@mcp.tool()
+@token_budget(None)
+async def get_manga_info_batch(queries: Any, tags: Any = False, max_results: Any = 10, ctx: Context = None) -> Dict[str, Any]:
+    """
+    Look up several Manga, Manhwa, Manhua titles or MangaDex ids at once
+    Args:
+        queries: Any -> List of titles and/or MangaDex ids (UUIDs), or a comma-separated string
+        tags: Any -> Whether to include tags in the manga info
+        max_results: Any -> Hits per title, fetched page by page (default 10; ids match one manga)
+    Returns:
+        Dict[str, Any]: "results" with one entry per query, in input order: the query and either
+        its "total" hits and formatted "entries", or an "error"; plus "succeeded", "failed" and
+        "failed_queries". Entries are also streamed as progress notifications as they arrive.
+    """
+    try:
+        queries = _query_list(queries)
+        tags = _to_bool(tags)
+        max_results = int(max_results)
+    except Exception as e:
+        return {"error": str(e)}
+    if not queries:
+        return {"error": "queries must contain at least one title or id"}
+    if len(queries) > MANGADEX_BATCH_MAX_QUERIES:
+        return {"error": f"At most {MANGADEX_BATCH_MAX_QUERIES} queries per call"}
+    if not 1 <= max_results <= MANGADEX_BATCH_MAX_RESULTS:
+        return {"error": f"max_results must be between 1 and {MANGADEX_BATCH_MAX_RESULTS}"}
+
+    results: List[Dict[str, Any]] = [{"query": query, "total": 0, "entries": []} for query in queries]
+    streamed = 0
+    async for i, event in iter_manga_entries(queries, tags, max_results):
+        result = results[i]
+        if "entry" in event:
+            result["entries"].append(event["entry"])
+            streamed += 1
+            await _report(ctx, streamed, f"{result['query']}: {event['entry']}")
+        elif "total" in event:
+            result["total"] = event["total"]
+        elif "error" in event:
+            results[i] = {"query": result["query"], "error": event["error"]}
+            if result["entries"]:
+                # Entries already streamed before a later page failed are kept.
+                results[i]["entries"] = result["entries"]
+    failed_queries = [result["query"] for result in results if "error" in result]
+    return {
+        "results": results,
+        "succeeded": len(results) - len(failed_queries),
+        "failed": len(failed_queries),
+        "failed_queries": failed_queries,
+    }
+
+def _summary_limits(hits: int) -> Tuple[int, int]:
+    """
+    Token and word limits of one manga's summary when `hits` share the answer.
+    """
+    max_tokens = min(MANGA_SUMMARY_MAX_TOKENS, max(MANGA_SUMMARY_TOTAL_TOKENS // max(hits, 1), MANGA_SUMMARY_MIN_TOKENS))
+    # Same words-per-token ratio as the single-manga defaults (100 words, 150 tokens).
+    max_words = min(MANGA_SUMMARY_MAX_WORDS, max_tokens * 2 // 3)
+    return max_tokens, max_words
+
+async def _summarize_manga(manga: dict, tags: bool, max_tokens: int, max_words: int) -> str:
+    # Call OpenAI API through OpenRouter
+    response = await get_async_open_router_client().chat.completions.create(
+        model=MANGA_SUMMARY_MODEL,
+        messages=[
+            {"role": "system", "content": MANGA_SUMMARY_SYSTEM_PROMPT.format(max_words=max_words, max_tokens=max_tokens)},
+            {"role": "user", "content": f"Please summarize this manga information: {manga_line(manga, tags)}"}
+        ],
+        max_tokens=1024,
+        temperature=0.7
+    )
+    return response.choices[0].message.content
+
+_MARKDOWN_LINK = re.compile(r"\[([^\]]*)\]\([^)]*\)")
+
+def _clean_description(text: str) -> str:
+    # MangaDex descriptions often end in a "---" block of links and credits.
+    text = text.split("\n---", 1)[0]
+    return _MARKDOWN_LINK.sub(r"\1", text).replace("**", "").replace("__", "")
+
+def _summary_header(manga: dict, tags: bool) -> str:
+    attributes = manga.get("attributes") or {}
+    details = [str(attributes[name]) for name in ("year", "status", "publicationDemographic") if attributes.get(name)]
+    header = f"**{_en(attributes.get('title'))}** ({', '.join(details)})"
+    if tags:
+        header += f" [{', '.join(_tag_names(attributes))}]"
+    return header + ":"
+
 @mcp.tool()
-def get_summarized_manga_info(title: str, tags: bool = False) -> Dict[str, str]:
+@token_budget(800)
+async def get_summarized_manga_info(title: str, tags: bool = False) -> Dict[str, str]:
     """
     Get summarized Manga, Manhwa, Manhua information from Mangadex
     Args:
         title: str -> The title of the manga to search for
         tags: bool -> Whether to include tags in the manga info
     Returns:
-        Dict[str, str]: A dictionary containing the summarized manga information
-    """
-    # Get manga info using the existing function
-    manga_info = get_manga_info_json(title, tags)
-    
-    # Prepare system message for OpenAI
-    system_message = """You are a manga information summarizer. Your task is to:
-    1. Take the raw manga data, clean itand create a concise summary with *description*
-    2. Focus on the most important details (title, main themes, genre)
-    3. If multiple manga are found, summarize each briefly 
-    4. Keep the summary under 100 words per manga
-    5. Format in a clean, readable way
-    6. Return the string with all information in one string as small as possible. Make it limit 300 tokens
+        Dict[str, str]: A dictionary containing the summarized manga information, with an
+        "errors" list ({"id", "title", "error"}) for hits that could not be summarized
     """
-
+    tags = _to_bool(tags)
     try:
-        # Call OpenAI API through OpenRouter
-        response = open_router_open_api_client.chat.completions.create(
-            model="x-ai/grok-4",
-            messages=[
-                {"role": "system", "content": system_message},
-                {"role": "user", "content": f"Please summarize this manga information: {manga_info['result']}"}
-            ],
-            max_tokens=1024,
-            temperature=0.7
+        manga_data = await _search_manga(title)
+    except (MangaDexError, CircuitOpen, RateLimitExceeded) as e:
+        return {"error": str(e)}
+
+    # LLM summaries are cached per manga version and limit; only new or edited entries are summarized again.
+    cache = get_manga_summary_cache()
+    max_tokens, max_words = _summary_limits(len(manga_data))
+    variant = f"{MANGA_SUMMARY_MODEL}:{'tags' if tags else 'plain'}:{max_tokens}"
+    summaries = [cache.get(summary_key(manga), variant) for manga in manga_data]
+    missing = [i for i, summary in enumerate(summaries) if summary is None]
+    semaphore = asyncio.Semaphore(MANGA_SUMMARY_CONCURRENCY)
+
+    async def summarize(manga: dict) -> Tuple[str, bool]:
+        async def llm() -> str:
+            async with semaphore:
+                return await _summarize_manga(manga, tags, max_tokens, max_words)
+
+        header = _summary_header(manga, tags)
+        summary = await get_summary_cascade().summarize(
+            _clean_description(_en((manga.get("attributes") or {}).get("description"))),
+            max(max_tokens - estimate_tokens(header), 20),
+            llm=llm,
+            max_words=max(max_words - len(header.split()), 10),
+            query=title,
         )
-        
-        summary = response.choices[0].message.content
-        return {
-            "title": title,
-            "summary": summary,
-            # "raw_data": manga_info['result']
-        }
-    except Exception as e:
-        return {"error": f"API Error: {str(e)}"}
+        if summary.tier == "llm":
+            return summary.text, True
+        # Local summaries take under a millisecond to redo. Caching them would also keep the
+        # extractive stand-in for a failed model call in place of the model's summary.
+        return f"{header} {summary.text}".rstrip(), False
+
+    fresh = await asyncio.gather(*(summarize(manga_data[i]) for i in missing), return_exceptions=True)
+    errors = []
+    for i, summary in zip(missing, fresh):
+        if isinstance(summary, Exception):
+            errors.append({
+                "id": manga_data[i].get("id"),
+                "title": _en((manga_data[i].get("attributes") or {}).get("title")),
+                "error": f"API Error: {str(summary)}",
+            })
+            continue
+        summaries[i], cacheable = summary
+        if cacheable:
+            cache.put(summary_key(manga_data[i]), summaries[i], variant)
+    # One hit that cannot be summarized does not cost the others theirs.
+    if manga_data and len(errors) == len(manga_data):
+        return {"error": errors[0]["error"], "errors": errors}
+    result = {
+        "title": title,
+        "summary": "\n".join(summary for summary in summaries if summary is not None),
+    }
+    if errors:
+        result["errors"] = errors
+    return result
 
 # Example usage
 if __name__ == "__main__":
-    result = get_summarized_manga_info("Chainsaw Man", tags=True)
+    import asyncio
+    result = asyncio.run(get_summarized_manga_info("Chainsaw Man", tags=True))
     print(result)
 
 
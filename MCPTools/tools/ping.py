@@ -7,13 +7,14 @@ import os
 
 from ..server import mcp
 from ..loader import *
+from ..loader.rate_limit import RateLimitExceeded
+from ..loader.health import CircuitOpen
 
-from typing import Dict
-import requests
+from typing import Dict, Any
 
 
 @mcp.tool()
-def get_credits() -> Dict[str, str]:
+async def get_credits() -> Dict[str, str]:
     """
     This function returns the remaining credits for the Firecrawl API.
     Args:
@@ -21,9 +22,70 @@ def get_credits() -> Dict[str, str]:
     Returns:
         str: A string of the remaining credits.
     """
-    url = "https://api.firecrawl.dev/v1/team/credit-usage"
+    url = upstream_url("firecrawl", "/v1/team/credit-usage")
     headers = {
         "Authorization": f"Bearer {firecrawl_api_key}"
     }
-    response = requests.get(url, headers=headers)
-    return response.json()
\ No newline at end of file
+    try:
+        response = await get_async_http_client().get(url, headers=headers)
+    except (RateLimitExceeded, CircuitOpen) as e:
+        return {"error": str(e)}
+    if response.status_code != 200:
+        return {"error": f"Failed to get credits (HTTP {response.status_code})"}
+    return response.json()
+
+@mcp.tool()
+def get_server_stats() -> Dict[str, Any]:
+    """
+    This function returns runtime statistics of the MCP server.
+    Args:
+        None
+    Returns:
+        dict: Statistics of the resources built so far (a key is left out until its
+        resource is in use):
+            resource_build_ms     build time per resource
+            http_connections      new vs reused connections per host
+            weather_cache         weather cache hits and misses
+            single_flight         duplicate requests collapsed per tool
+            crypto_store          days held in the local crypto store
+            wiki_extract_cache    Wikipedia extract cache hits
+            wikipedia_index       the offline Wikipedia index
+            search_latency        federated search latency per provider
+            rate_limits           queue depth, throttling and retries per provider
+            upstream_health       circuit breaker state and last health probe per provider
+            jobs                  background jobs per status
+            output_compaction     tokens saved per tool by output compaction
+            manga_summary_cache   manga summary cache hit rate
+            summaries             calls and latency per summarization tier
+            project_tree          project structure snapshot hits, directories listed vs reused
+    """
+    stats = {"resource_build_ms": registry.build_times()}
+    if registry.is_loaded("http_client"):
+        stats["http_connections"] = get_http_client().connection_stats()
+    if registry.is_loaded("weather_cache"):
+        stats["weather_cache"] = get_weather_cache().stats()
+    if registry.is_loaded("single_flight"):
+        stats["single_flight"] = get_single_flight().stats()
+    if registry.is_loaded("crypto_store"):
+        stats["crypto_store"] = get_crypto_store().stats()
+    if registry.is_loaded("wiki_extract_cache"):
+        stats["wiki_extract_cache"] = get_wiki_extract_cache().stats()
+    if registry.is_loaded("wikipedia_index"):
+        stats["wikipedia_index"] = get_wikipedia_index().stats()
+    if registry.is_loaded("search_latency"):
+        stats["search_latency"] = get_search_latency().stats()
+    if registry.is_loaded("rate_limiter"):
+        stats["rate_limits"] = get_rate_limiter().stats()
+    if registry.is_loaded("health_monitor"):
+        stats["upstream_health"] = get_health_monitor().stats()
+    if registry.is_loaded("job_runner"):
+        stats["jobs"] = get_job_runner().stats()
+    if registry.is_loaded("compaction_stats"):
+        stats["output_compaction"] = get_compaction_stats().stats()
+    if registry.is_loaded("manga_summary_cache"):
+        stats["manga_summary_cache"] = get_manga_summary_cache().stats()
+    if registry.is_loaded("summary_cascade"):
+        stats["summaries"] = get_summary_cascade().stats()
+    if registry.is_loaded("project_tree"):
+        stats["project_tree"] = get_project_tree().stats()
+    return stats
@@ -7,10 +7,17 @@ import os
 
 from ..server import mcp
 from ..loader import *
+from ..loader.compaction import token_budget
 
 from typing import Dict, Any
-import requests
-import pandas as pd
+import json
+import logging
+from ..loader.crypto_store import SERIES_KEY, series_key
+from ..loader.predictor import feature_matrix
+
+logger = logging.getLogger(__name__)
+
+BITCOIN_BATCH_MAX_ROWS = int(os.getenv("BITCOIN_BATCH_MAX_ROWS", 100000))
 
 @mcp.tool()
 def get_bitcoin_price(request: dict[str, Any]) -> dict[str, Any]:
@@ -28,20 +35,96 @@ def get_bitcoin_price(request: dict[str, Any]) -> dict[str, Any]:
         # model = joblib.load("voting_regressor.joblib")
         # feature_scaler = joblib.load("feature_scaler.joblib")
         # target_scaler = joblib.load("target_scaler.joblib")
-        features = pd.DataFrame({
-			'Open': [float(request['Open'])],
-			'High': [float(request['High'])],
-			'Low': [float(request['Low'])],
-		})
-        features = feature_scaler.transform(features)
-        target = model.predict(features).reshape(-1, 1)
-        target = target_scaler.inverse_transform(target).item()
+        features = feature_matrix([[float(request['Open']), float(request['High']), float(request['Low'])]])
+        target = get_price_pipeline().predict(features).item()
         return {"Closing Price given from the Machine Learning Model is": target}
     except Exception as e:
         return {"Unable to predict the closing price": str(e)}
-    
+
+
 @mcp.tool()
-def get_crypto_data(symbol: str, date: str, market: str = "US"):
+@token_budget(None)
+async def get_bitcoin_price_batch(rows: Any = None, start_date: str = "", end_date: str = "", symbol: str = "BTC", market: str = "USD") -> dict[str, Any]:
+    """
+    Predicts closing prices for many rows at once with the same ML model as get_bitcoin_price.
+
+    Args:
+        rows (Any): List of {"Open", "High", "Low"} dicts or [open, high, low] lists (or the same as a JSON string).
+        start_date (str): Instead of rows, predict every day from start_date to end_date ("YYYY-MM-DD"),
+                          using that day's Open/High/Low from the local crypto store.
+        end_date (str): Last day of the range (inclusive). Defaults to the latest available day.
+        symbol (str): Crypto symbol for the date range. Default "BTC".
+        market (str): Market for the date range. Default "USD".
+    Example:
+        rows = [{"Open": 104000, "High": 106500, "Low": 103200}, [105100, 107000, 104400]]
+    Returns:
+        dict: {"predictions": [float, ...]} in row order, or for a date range
+              {"predictions": [{"date", "open", "high", "low", "close", "predicted_close"}, ...]}.
+    """
+    try:
+        if isinstance(rows, str) and rows.strip():
+            rows = json.loads(rows)
+        if rows:
+            if len(rows) > BITCOIN_BATCH_MAX_ROWS:
+                return {"error": f"At most {BITCOIN_BATCH_MAX_ROWS} rows per call"}
+            predictions = get_price_pipeline().predict(feature_matrix(rows))
+            return {"predictions": predictions.tolist()}
+        if not start_date:
+            return {"error": "Either rows or start_date must be given"}
+
+        await _refresh_series(symbol, market, end_date)
+        dates, ohlc = get_crypto_store().ohlc(symbol, market, start_date, end_date)
+        if not dates:
+            return {"error": f"No {symbol} data between {start_date} and {end_date or 'the latest day'}"}
+        if len(dates) > BITCOIN_BATCH_MAX_ROWS:
+            return {"error": f"At most {BITCOIN_BATCH_MAX_ROWS} days per call"}
+        features = ohlc[:, :3]
+        predictions = get_price_pipeline().predict(features)
+        return {
+            "predictions": [
+                {
+                    "date": day,
+                    "open": open_,
+                    "high": high,
+                    "low": low,
+                    "close": close,
+                    "predicted_close": predicted,
+                }
+                for day, (open_, high, low, close), predicted in zip(dates, ohlc.tolist(), predictions.tolist())
+            ]
+        }
+    except Exception as e:
+        return {"error": str(e)}
+
+
+async def _refresh_series(symbol: str, market: str, until: str = "") -> None:
+    """
+    Brings the locally stored DIGITAL_CURRENCY_DAILY series for a symbol up to date
+    when it is stale (see CryptoStore.is_stale); otherwise makes no request.
+    """
+    store = get_crypto_store()
+    if not store.is_stale(symbol, market, until or None):
+        return
+
+    async def fetch():
+        url = upstream_url("alphavantage", "/query") + f"?function=DIGITAL_CURRENCY_DAILY&symbol={symbol}&market={market}&apikey={alphavantage_api_key}"
+        response = await get_async_http_client().get(url)
+        payload = response.json()
+        if response.status_code != 200 or SERIES_KEY not in payload:
+            raise ValueError(payload.get('Error Message') or payload.get('Information') or "Failed to get crypto data")
+        store.update(symbol, market, payload[SERIES_KEY])
+
+    try:
+        # Concurrent refreshes of the same series share one Alpha Vantage request.
+        await get_single_flight().do("get_crypto_series", series_key(symbol, market), fetch)
+    except Exception as e:
+        if store.newest(symbol, market) is None:
+            raise
+        logger.warning("Serving stored %s/%s data, refresh failed: %s", symbol, market, e)
+
+
+@mcp.tool()
+async def get_crypto_data(symbol: str, date: str, market: str = "US"):
     """
     This function takes a crypto symbol, date, and market and returns the crypto data.
     It uses the Alpha Vantage API to get the crypto data.
@@ -54,19 +137,43 @@ def get_crypto_data(symbol: str, date: str, market: str = "US"):
         dict: A dictionary of the crypto data.
         {"open": str, "high": str, "low": str}
     """
-    url = f"https://www.alphavantage.co/query?function=DIGITAL_CURRENCY_DAILY&symbol={symbol}&market={market}&apikey={alphavantage_api_key}"
-    response = requests.get(url)
-    if response.status_code == 200:
-        result = response.json()['Time Series (Digital Currency Daily)'][date]
-        result = {
-            "open": result['1. open'],
-            "high": result['2. high'],
-            "low": result['3. low']
-            # "close": result['4. close'],
-            # "volume": result['5. volume']
-        }
-        return result
-    else:
-        return {
-            "error": response.json()['Error Message']
-        }
\ No newline at end of file
+    try:
+        await _refresh_series(symbol, market, str(date).strip())
+    except Exception as e:
+        return {"error": str(e)}
+    result = get_crypto_store().day(symbol, market, date)
+    if result is None:
+        return {"error": f"No {symbol} data for {date}"}
+    return {
+        "open": result['open'],
+        "high": result['high'],
+        "low": result['low']
+        # "close": result['close'],
+        # "volume": result['volume']
+    }
+
+
+@mcp.tool()
+@token_budget(None)
+async def get_crypto_history(symbol: str, start_date: str, end_date: str = "", market: str = "USD") -> dict[str, Any]:
+    """
+    Daily open/high/low/close/volume of a crypto symbol between two dates, from the local
+    store (Alpha Vantage is only called when the stored series is out of date).
+    Args:
+        symbol (str): The crypto symbol, e.g. "BTC".
+        start_date (str): First day ("YYYY-MM-DD"), inclusive.
+        end_date (str): Last day, inclusive. Defaults to the latest available day.
+        market (str): The market, e.g. "USD". Default "USD".
+    Returns:
+        dict: {"symbol", "market", "days": [{"date", "open", "high", "low", "close", "volume"}, ...]}
+              oldest first, values as strings, or an error message.
+    """
+    try:
+        await _refresh_series(symbol, market, end_date)
+    except Exception as e:
+        return {"error": str(e)}
+    days = get_crypto_store().days(symbol, market, start_date, end_date)
+    if not days:
+        return {"error": f"No {symbol} data between {start_date} and {end_date or 'the latest day'}"}
+    symbol, market = series_key(symbol, market)
+    return {"symbol": symbol, "market": market, "days": days}
@@ -7,7 +7,9 @@ import os
 
 from ..server import mcp
 from ..loader import *
+from ..loader.compaction import token_budget
 from typing import Dict, Any
+import asyncio
 import os
 from datetime import datetime
 
@@ -21,21 +23,43 @@ def get_datetime() -> dict[str, Any]:
     """
     return {"datetime": datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
 
+PROJECT_TREE_MAX_DEPTH = int(os.getenv("PROJECT_TREE_MAX_DEPTH", 16))
+PROJECT_TREE_MAX_PAGE = int(os.getenv("PROJECT_TREE_MAX_PAGE", 1000))
+
 @mcp.tool()
-def get_project_structure() -> dict[str, Any]:
+# Paged by `limit`; cutting a page would skip entries that next_cursor has already passed.
+@token_budget(None)
+async def get_project_structure(path: str = ".", max_depth: Any = 4, limit: Any = 150, cursor: str = "") -> dict[str, Any]:
     """
-    Returns the file/folder structure of the current directory.
+    Returns the file/folder structure of a directory under the current directory, page by page.
+    Ignored: version control and cache directories, virtualenvs, and anything matched by a .gitignore.
+
+    Args:
+        path (str): Directory to list, relative to the current directory (default ".").
+        max_depth (int): Directory levels to list (default 4; 1 lists only the entries of `path`).
+        limit (int): Entries per page (default 150).
+        cursor (str): "next_cursor" of the previous page, to continue the listing.
 
     Returns:
-        dict: Folder and file structure.
+        dict: {"structure": {folder: {name: "File" | "Directory"}}, "entries", "total_entries",
+        "truncated" (the listing hit its entry limit), "next_cursor" (None on the last page)}
+        or {"error": str}.
     """
-    project_structure = {}
     try:
-        for root, dirs, files in os.walk("."):
-            for name in files:
-                project_structure.setdefault(root, {})[name] = "File"
-            for name in dirs:
-                project_structure.setdefault(root, {})[name] = "Directory"
+        max_depth, limit = int(max_depth), int(limit)
+    except (TypeError, ValueError) as e:
+        return {"error": str(e)}
+    if not 1 <= max_depth <= PROJECT_TREE_MAX_DEPTH:
+        return {"error": f"max_depth must be between 1 and {PROJECT_TREE_MAX_DEPTH}"}
+    if not 1 <= limit <= PROJECT_TREE_MAX_PAGE:
+        return {"error": f"limit must be between 1 and {PROJECT_TREE_MAX_PAGE}"}
+    base = os.path.realpath(".")
+    root = os.path.realpath(os.path.join(base, path or "."))
+    if os.path.commonpath([base, root]) != base:
+        return {"error": "path must be inside the current directory"}
+    if not os.path.isdir(root):
+        return {"error": f"Not a directory: {path}"}
+    try:
+        return await asyncio.to_thread(get_project_tree().page, root, max_depth, limit, cursor or None)
     except Exception as e:
         return {"error": str(e)}
-    return project_structure
\ No newline at end of file
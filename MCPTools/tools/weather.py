@@ -5,13 +5,219 @@ import os
 # from MCPTools.server import mcp
 # from MCPTools.loader.loader import *
 
+import asyncio
+import json
+import logging
 from ..server import mcp
 from ..loader import *
+from ..loader.rate_limit import RateLimitExceeded
+from ..loader.health import CircuitOpen
+from ..loader.compaction import token_budget
 from typing import Dict, Any
-import requests
 from ..get_weather import *
+from ..get_weather.cache import normalize_city
+from ..get_weather.columns import OUTPUT_FORMATS
+
+logger = logging.getLogger(__name__)
+
+WEATHER_BATCH_CONCURRENCY = int(os.getenv("WEATHER_BATCH_CONCURRENCY", 8))
+WEATHER_BATCH_MAX_CITIES = int(os.getenv("WEATHER_BATCH_MAX_CITIES", 100))
+
+async def _weather_request(endpoint: str, city: str, days: int = None):
+    params = {"key": weather_api_key,
+              "q": city,
+              "aqi": "yes",
+              "tides": "yes",
+              "alerts": "yes",
+              }
+    if days is not None:
+        params["days"] = days
+    # WeatherAPI answers these POSTs like GETs, so a 5xx may be retried.
+    return await get_async_http_client().post(upstream_url("weatherapi", f"/v1/{endpoint}"), params=params,
+                                              idempotent=True)
+
+
+async def _current_payload(city: str):
+    """
+    current.json payload for a city, from the weather cache when possible. None on failure.
+    Concurrent misses for the same city share one upstream request. While WeatherAPI's
+    circuit is open, an expired payload is returned, marked "stale" (CircuitOpen without one).
+    """
+    cache = get_weather_cache()
+    payload = cache.get_current(city)
+    if payload is None:
+        async def fetch():
+            try:
+                response = await _weather_request("current.json", city)
+            except CircuitOpen:
+                payload = cache.get_current(city, stale=True)
+                if payload is None:
+                    raise
+                return {**payload, "stale": True}
+            except RateLimitExceeded:
+                return None
+            if response.status_code != 200:
+                return None
+            payload = response.json()
+            cache.put_current(city, payload)
+            return payload
+
+        payload = await get_single_flight().do("get_weather", ("current.json", normalize_city(city)), fetch)
+    return payload
+
+
+async def _forecast_payload(city: str, days: int):
+    """
+    forecast.json payload for a city, from the weather cache when possible. None on failure.
+    Concurrent misses for the same city and days share one upstream request. While
+    WeatherAPI's circuit is open, an expired forecast is returned, marked "stale"
+    (CircuitOpen without one).
+    """
+    cache = get_weather_cache()
+    payload = cache.get_forecast(city, days)
+    if payload is None:
+        async def fetch():
+            try:
+                response = await _weather_request("forecast.json", city, days)
+            except CircuitOpen:
+                payload = cache.get_forecast(city, days, stale=True)
+                if payload is None:
+                    raise
+                return {**payload, "stale": True}
+            except RateLimitExceeded:
+                return None
+            if response.status_code != 200:
+                return None
+            payload = response.json()
+            cache.put_forecast(city, days, payload)
+            return payload
+
+        payload = await get_single_flight().do("get_weather", ("forecast.json", normalize_city(city), days), fetch)
+    return payload
+
+
+def _render_forecast(payload: dict[str, Any], forecast_type: str, days: int, day_for_hourly: int, output_format: str = "csv"):
+    """
+    Renders a forecast payload as CSV (or compact) text, or returns an error dict.
+    """
+    if forecast_type == "daily":
+        return load_daily_data_forecast(payload, output_format)
+    if day_for_hourly < days:
+        return load_hourly_data_forecast(payload['forecast']['forecastday'][day_for_hourly], output_format)
+    return {"error": "Day for hourly forecast is greater than the number of days"}
+
+def _to_bool(value: Any) -> bool:
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, str):
+        return value.lower() in ('true', 't', 'yes', 'y', '1')
+    return bool(value)
+
+
+def _to_int(value: Any) -> int:
+    if isinstance(value, int):
+        return value
+    if isinstance(value, str):
+        return int(float(value))  # handles both "1" and "1.0"
+    return int(value)
+
+
+def _weather_options(current: Any, forecast: Any, days: Any, forecast_type: str, day_for_hourly: Any, output_format: str):
+    """
+    Converts and validates the get_weather options shared by get_weather and get_weather_batch.
+    Returns:
+        dict: The normalized options, or {"error": ...}.
+    """
+    # Convert input types
+    current = _to_bool(current)
+    forecast = _to_bool(forecast)
+    days = _to_int(days)
+    day_for_hourly = _to_int(day_for_hourly)
+    forecast_type = str(forecast_type).lower().strip()
+    output_format = str(output_format).lower().strip()
+
+    # Validate parameters
+    if days < 1:
+        return {"error": "Days parameter must be at least 1"}
+
+    if forecast_type not in ["daily", "hourly"]:
+        return {"error": "forecast_type must be either 'daily' or 'hourly'"}
+
+    if output_format not in OUTPUT_FORMATS:
+        return {"error": "output_format must be either 'csv' or 'compact'"}
+
+    if forecast_type == "hourly":
+        if day_for_hourly >= days:
+            # Automatically adjust days if needed
+            days = day_for_hourly + 1
+            logger.info("Adjusted forecast days to %d to accommodate hourly forecast request", days)
+        elif day_for_hourly < 0:
+            return {"error": "day_for_hourly cannot be negative"}
+
+    if not current and not forecast:
+        return {"error": "Either current or forecast (or both) must be True"}
+
+    return {"current": current, "forecast": forecast, "days": days, "forecast_type": forecast_type,
+            "day_for_hourly": day_for_hourly, "output_format": output_format}
+
+
+def _stale_flag(*payloads) -> dict[str, Any]:
+    # Payloads served from the expired cache while WeatherAPI's circuit is open.
+    return {"stale": True} if any(payload and payload.get("stale") for payload in payloads) else {}
+
+
+async def _city_weather(city: str, current: bool, forecast: bool, days: int, forecast_type: str, day_for_hourly: int, output_format: str) -> dict[str, Any]:
+    """
+    get_weather for one city with already validated options.
+    """
+    if current and not forecast:
+        current_data = await _current_payload(city)
+        if current_data is None:
+            return {"error": "Failed to get current weather data"}
+        else:
+            data = load_data_current(current_data, output_format)
+            return {
+                "current": data,
+                **_stale_flag(current_data),
+            }
+
+    elif forecast and not current:
+        forecast_data = await _forecast_payload(city, days)
+        if forecast_data is None:
+            return {"error": "Failed to get forecast weather data"}
+        else:
+            data = _render_forecast(forecast_data, forecast_type, days, day_for_hourly, output_format)
+            if isinstance(data, dict):
+                return data
+            return {
+                "forecast": data,
+                **_stale_flag(forecast_data),
+            }
+
+    else:
+        # Fetched concurrently. Once a forecast is cached its `current` block also
+        # answers the current lookup, without a second request.
+        forecast_data, current_data = await asyncio.gather(
+            _forecast_payload(city, days),
+            _current_payload(city),
+        )
+
+        if forecast_data is not None:
+            data = _render_forecast(forecast_data, forecast_type, days, day_for_hourly, output_format)
+            if isinstance(data, dict):
+                return data
+        else:
+            data = "Failed to get forecast weather data"
+        return {
+            "current": load_data_current(current_data, output_format) if current_data is not None else "Failed to get current weather data",
+            "forecast": data,
+            **_stale_flag(forecast_data, current_data),
+        }
+
+
 @mcp.tool()
-def get_weather(city: str, current: Any = True, forecast: Any = False, days: Any = 1, forecast_type: str = "daily", day_for_hourly: Any = 0) -> dict[str, Any]:
+@token_budget(None)
+async def get_weather(city: str, current: Any = True, forecast: Any = False, days: Any = 1, forecast_type: str = "daily", day_for_hourly: Any = 0, output_format: str = "csv") -> dict[str, Any]:
     """
     Fetches weather data from WeatherAPI.
 
@@ -23,144 +229,80 @@ def get_weather(city: str, current: Any = True, forecast: Any = False, days: Any
         forecast_type (str): Type of forecast to get ("daily" or "hourly"). Only works if forecast=True.
         day_for_hourly (Any): Day for hourly forecast (if forecast_type="hourly"). 0 is today, 1 is tomorrow, etc.
                               Must be less than days parameter.
+        output_format (str): "csv" (default) or "compact". Compact drops the padding after commas and
+                             moves columns with the same value in every row (e.g. the date of an hourly
+                             forecast) into a single "name=value;..." line above the header.
     Returns:
-        dict: Weather data or error.
+        dict: Weather data or error. "stale": true marks cached data served while WeatherAPI is unavailable.
     """
     try:
-        # Convert types more robustly
-        def to_bool(value: Any) -> bool:
-            if isinstance(value, bool):
-                return value
-            if isinstance(value, str):
-                return value.lower() in ('true', 't', 'yes', 'y', '1')
-            return bool(value)
-
-        def to_int(value: Any) -> int:
-            if isinstance(value, int):
-                return value
-            if isinstance(value, str):
-                return int(float(value))  # handles both "1" and "1.0"
-            return int(value)
-
-        # Convert input types
-        current = to_bool(current)
-        forecast = to_bool(forecast)
-        days = to_int(days)
-        day_for_hourly = to_int(day_for_hourly)
-        forecast_type = str(forecast_type).lower().strip()
-
-        # Validate parameters
-        if days < 1:
-            return {"error": "Days parameter must be at least 1"}
-        
-        if forecast_type not in ["daily", "hourly"]:
-            return {"error": "forecast_type must be either 'daily' or 'hourly'"}
-        
-        if forecast_type == "hourly":
-            if day_for_hourly >= days:
-                # Automatically adjust days if needed
-                days = day_for_hourly + 1
-                print(f"Adjusted forecast days to {days} to accommodate hourly forecast request")
-            elif day_for_hourly < 0:
-                return {"error": "day_for_hourly cannot be negative"}
-
-        current_response = None
-        forecast_response = None
-        if current and not forecast:
-            current_response = requests.post(f"https://api.weatherapi.com/v1/current.json",
-                             params={"key": weather_api_key,
-                                     "q": city,
-                                     "aqi": "yes",
-                                     "tides": "yes",
-                                     "alerts": "yes",
-                                     })
-            if current_response.status_code != 200:
-                return {"error": "Failed to get current weather data"}
-            else:
-                data = load_data_current(current_response.json())
-                return {
-                    "current": data
-                }
-            
-        elif forecast and not current:
-            forecast_response = requests.post(f"https://api.weatherapi.com/v1/forecast.json",
-                             params={"key": weather_api_key,
-                                     "q": city,
-                                     "aqi": "yes",
-                                     "tides": "yes",
-                                     "alerts": "yes",
-                                     "days": days
-                                     })
-            if forecast_response.status_code != 200:
-                return {"error": "Failed to get forecast weather data"}
-            else:
-                if forecast_type.lower().strip() == "daily":
-                    data = load_daily_data_forecast(forecast_response.json())
-                elif forecast_type.lower().strip() == "hourly":
-                    if day_for_hourly < days:
-                        data = load_hourly_data_forecast(forecast_response.json()['forecast']['forecastday'][day_for_hourly])
-                    else:
-                        return {"error": "Day for hourly forecast is greater than the number of days"}
-                return {
-                    "forecast": data
-                }
-        
-        elif current and forecast:
-            current_response = requests.post(f"https://api.weatherapi.com/v1/current.json",
-                             params={"key": weather_api_key,
-                                     "q": city,
-                                     "aqi": "yes",
-                                     "tides": "yes",
-                                     "alerts": "yes",
-                                     })
-            
-            forecast_response = requests.post(f"https://api.weatherapi.com/v1/forecast.json",
-                             params={"key": weather_api_key,
-                                     "q": city,
-                                     "aqi": "yes",
-                                     "tides": "yes",
-                                     "alerts": "yes",
-                                     "days": days
-                                     })
-            
-            if current_response.status_code == 200 and forecast_response.status_code == 200:
-                if forecast_type.lower().strip() == "daily":
-                    data = load_daily_data_forecast(forecast_response.json())
-                elif forecast_type.lower().strip() == "hourly":
-                    if day_for_hourly < days:
-                        data = load_hourly_data_forecast(forecast_response.json()['forecast']['forecastday'][day_for_hourly])
-                    else:
-                        return {"error": "Day for hourly forecast is greater than the number of days"}
-                return {
-                    "current": load_data_current(current_response.json()),
-                    "forecast": data
-                }
-            
-            if current_response.status_code != 200 or forecast_response.status_code != 200:
-                if current_response.status_code != 200 and forecast_response.status_code == 200:
-                    if forecast_type.lower().strip() == "daily":
-                        data = load_daily_data_forecast(forecast_response.json())
-                    elif forecast_type.lower().strip() == "hourly":
-                        if day_for_hourly < days:
-                            data = load_hourly_data_forecast(forecast_response.json()['forecast']['forecastday'][day_for_hourly])
-                        else:
-                            return {"error": "Day for hourly forecast is greater than the number of days"}
-                    return {
-                        "current": "Failed to get current weather data",
-                        "forecast": data
-                    }
-                elif current_response.status_code == 200 and forecast_response.status_code != 200:
-                    data = load_data_current(current_response.json())
-                    return {
-                        "current": data,
-                        "forecast": "Failed to get forecast weather data"
-                    }
-                else:
-                    return {
-                        "current": "Failed to get current weather data",
-                        "forecast": "Failed to get forecast weather data"
-                    }
+        options = _weather_options(current, forecast, days, forecast_type, day_for_hourly, output_format)
+        if "error" in options:
+            return options
+        return await _city_weather(city, **options)
+    except Exception as e:
+        return {"error": str(e)}
+
+
+def _city_list(cities: Any) -> list[str]:
+    if isinstance(cities, str):
+        # Accept a JSON list or a comma/newline separated string as well as a list
+        text = cities.strip()
+        if text.startswith("["):
+            cities = json.loads(text)
         else:
-            return {"error": "Either current or forecast (or both) must be True"}
+            cities = text.replace("\n", ",").split(",")
+    return [str(city).strip() for city in cities if str(city).strip()]
+
+
+@mcp.tool()
+@token_budget(None)
+async def get_weather_batch(cities: Any, current: Any = True, forecast: Any = False, days: Any = 1, forecast_type: str = "daily", day_for_hourly: Any = 0, output_format: str = "csv", max_concurrency: Any = None) -> dict[str, Any]:
+    """
+    Fetches weather data for many cities in one call. Takes the same options as get_weather.
+
+    Args:
+        cities (Any): List of city names, or a comma-separated string.
+        current (Any): Get current weather. Default is True. Can be boolean or string.
+        forecast (Any): Get forecast. Default is False. Can be boolean or string.
+        days (Any): Total forecast days (if forecast=True). Must be at least 1.
+        forecast_type (str): Type of forecast to get ("daily" or "hourly"). Only works if forecast=True.
+        day_for_hourly (Any): Day for hourly forecast (if forecast_type="hourly"). 0 is today, 1 is tomorrow, etc.
+        output_format (str): "csv" (default) or "compact", as in get_weather.
+        max_concurrency (Any): Cities fetched at the same time. Defaults to WEATHER_BATCH_CONCURRENCY (8).
+    Returns:
+        dict: "results" with one entry per city, in input order, each holding the city and either
+              its get_weather data or an "error"; plus "succeeded", "failed" and "failed_cities".
+    """
+    try:
+        options = _weather_options(current, forecast, days, forecast_type, day_for_hourly, output_format)
+        if "error" in options:
+            return options
+        cities = _city_list(cities)
+        if not cities:
+            return {"error": "cities must contain at least one city"}
+        if len(cities) > WEATHER_BATCH_MAX_CITIES:
+            return {"error": f"At most {WEATHER_BATCH_MAX_CITIES} cities per call"}
+        limit = _to_int(max_concurrency) if max_concurrency not in (None, "") else WEATHER_BATCH_CONCURRENCY
+        if limit < 1:
+            return {"error": "max_concurrency must be at least 1"}
     except Exception as e:
-        return {"error": str(e)}
\ No newline at end of file
+        return {"error": str(e)}
+
+    semaphore = asyncio.Semaphore(limit)
+
+    async def fetch(city: str) -> dict[str, Any]:
+        async with semaphore:
+            try:
+                return {"city": city, **await _city_weather(city, **options)}
+            except Exception as e:
+                return {"city": city, "error": str(e)}
+
+    results = await asyncio.gather(*(fetch(city) for city in cities))
+    failed_cities = [result["city"] for result in results if "error" in result]
+    return {
+        "results": results,
+        "succeeded": len(results) - len(failed_cities),
+        "failed": len(failed_cities),
+        "failed_cities": failed_cities,
+    }
@@ -1,5 +1,7 @@
 import sys
 import os
+import asyncio
+import time
 # sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
 # from MCPTools.server import mcp
@@ -7,12 +9,28 @@ import os
 
 from ..server import mcp
 from ..loader import *
+from ..loader.single_flight import normalize_text
+from ..search import PROVIDERS, federated_search as _federated_search
+from ..loader.jobs import JobTableFull
+from ..loader.rate_limit import RateLimitExceeded
+from ..loader.health import CircuitOpen
+from ..loader.compaction import token_budget
 from typing import Dict, Any
-import requests
+from datetime import datetime, timezone
 from urllib.parse import quote_plus
 
+FEDERATED_SEARCH_PROVIDERS = os.getenv("FEDERATED_SEARCH_PROVIDERS", "tavily,google,firecrawl")
+FEDERATED_SEARCH_QUORUM = int(os.getenv("FEDERATED_SEARCH_QUORUM", 2))
+FEDERATED_SEARCH_HEDGE = os.getenv("FEDERATED_SEARCH_HEDGE", "1").lower() not in ("0", "false", "no")
+DEEP_RESEARCH_POLL_SECONDS = float(os.getenv("DEEP_RESEARCH_POLL_SECONDS", 5))
+DEEP_RESEARCH_TIMEOUT = float(os.getenv("DEEP_RESEARCH_TIMEOUT", 1800))
+# Longer final analyses are cut down locally with the extractive summarizer.
+DEEP_RESEARCH_MAX_TOKENS = int(os.getenv("DEEP_RESEARCH_MAX_TOKENS", 1024))
+DEEP_RESEARCH_SYSTEM_PROMPT = "When presenting the finalAnalysis, strictly limit the total combined tokens (input + your output) to **no more than 1024 tokens**. Focus on delivering **high-density**, **information-rich feedback**: eliminate redundancy, shrink filler words, and favor compact expressions. Structure content with brief headings, bullet points, equations, or tables where appropriate. Prioritize clarity, precision, and relevance—if a detail isn't essential, omit it. Ensure every sentence adds substantive value."
+
 @mcp.tool()
-def internet_search(query: str, depth: str = "basic") -> dict[str, Any]:
+@token_budget(1500, fields=("query", "answer", "results[].title", "results[].url", "results[].content"))
+async def internet_search(query: str, depth: str = "basic") -> dict[str, Any]:
     """
     Performs a web search using Tavily.
 
@@ -24,11 +42,19 @@ def internet_search(query: str, depth: str = "basic") -> dict[str, Any]:
     Returns:
         dict: Search results from Tavily.
     """
-    response = client.search(query, search_depth=depth)
-    return response
+    # Identical concurrent searches share one Tavily request.
+    try:
+        return await get_single_flight().do(
+            "internet_search",
+            (normalize_text(query), str(depth).lower()),
+            lambda: get_async_tavily_client().search(query, search_depth=depth),
+        )
+    except (RateLimitExceeded, CircuitOpen) as e:
+        return {"error": str(e)}
 
 @mcp.tool()
-def google_search(query: str) -> Dict[str, str]:
+@token_budget(1000)
+async def google_search(query: str) -> Dict[str, str]:
     """
     This function takes a search query and returns a list of search results.
     It uses the Google Custom Search API to get the search results.
@@ -40,12 +66,26 @@ def google_search(query: str) -> Dict[str, str]:
     """
     query = quote_plus(query)
 
-    url = f"https://www.googleapis.com/customsearch/v1?key={search_api}&cx={programmable_search_engine_id}&q={query}"
-    response = requests.get(url)
+    url = upstream_url("google", "/customsearch/v1") + f"?key={search_api}&cx={programmable_search_engine_id}&q={query}"
+    try:
+        response = await get_async_http_client().get(url)
+    except (RateLimitExceeded, CircuitOpen) as e:
+        return {"error": str(e)}
     # with open("google_search_results3.json", "w") as f:
     #     json.dump(response.json(), f, indent=4)
 
-    search_results = response.json()['items']
+    if response.status_code != 200:
+        # Google nests the message ({"error": {"code", "message"}}); proxies may send a plain
+        # string, or an HTML/text page that is not JSON at all.
+        try:
+            error = response.json().get('error')
+            message = error.get('message') if isinstance(error, dict) else error
+        except (ValueError, AttributeError):
+            message = response.text.strip()[:200]
+        return {"error": message or f"Google search failed (HTTP {response.status_code})"}
+    payload = response.json()
+    # No "items" means no results.
+    search_results = payload.get('items', [])
     results_list = []
     for i, result in enumerate(search_results, 1):
         title = result.get('title', 'Untitled')
@@ -72,7 +112,40 @@ def google_search(query: str) -> Dict[str, str]:
 
 
 @mcp.tool()
-def search_firecrawl(query: str, limit: int = 5) -> Dict[str, str]:
+@token_budget(1200, fields=("results[].title", "results[].url", "results[].snippet", "results[].providers", "providers", "elapsed_ms"))
+async def federated_search(query: str, k: int = 5, budget_ms: int = 3000, providers: str = "") -> dict[str, Any]:
+    """
+    Searches Tavily, Google and Firecrawl at the same time and returns one merged,
+    deduplicated ranking. Prefer this over the single-provider search tools.
+
+    Args:
+        query (str): Search query.
+        k (int): Number of results. Default 5.
+        budget_ms (int): Latency budget; slower providers are cancelled and the
+            results gathered so far are returned. Default 3000.
+        providers (str): Comma-separated subset of "tavily,google,firecrawl". Default: all.
+    Returns:
+        dict: {"results": [{"rank", "title", "url", "snippet", "providers", "score"}, ...],
+               "providers": {name: {"status": "ok" | "error" | "cancelled", ...}}, "elapsed_ms"}
+    """
+    names = [name.strip().lower() for name in (providers or FEDERATED_SEARCH_PROVIDERS).split(",") if name.strip()]
+    unknown = [name for name in names if name not in PROVIDERS]
+    if unknown or not names:
+        return {"error": f"Unknown providers {unknown}; choose from {sorted(PROVIDERS)}"}
+    return await _federated_search(
+        query,
+        k=max(1, int(k)),
+        budget=max(0.05, int(budget_ms) / 1000),
+        providers=list(dict.fromkeys(names)),
+        tracker=get_search_latency(),
+        quorum=FEDERATED_SEARCH_QUORUM,
+        hedge=FEDERATED_SEARCH_HEDGE,
+    )
+
+
+@mcp.tool()
+@token_budget(1200)
+async def search_firecrawl(query: str, limit: int = 5) -> Dict[str, str]:
     """
     Web Search Tool
     This tool is used to search the web for information.
@@ -85,7 +158,10 @@ def search_firecrawl(query: str, limit: int = 5) -> Dict[str, str]:
         str: A string of the search results.
     """
     limit = int(limit)
-    response = firecrawl_web_search_app.search(query=query, limit=limit)
+    try:
+        response = await get_async_firecrawl_app().search(query=query, limit=limit)
+    except (RateLimitExceeded, CircuitOpen) as e:
+        return {"error": str(e)}
     status = response['success']
     if status:
         data = []
@@ -105,7 +181,8 @@ def search_firecrawl(query: str, limit: int = 5) -> Dict[str, str]:
 
 
 @mcp.tool()
-def deep_research(query: str, max_depth: int = 3) -> Dict[str, str]:
+@token_budget(1500)
+async def deep_research(query: str, max_depth: int = 3) -> Dict[str, str]:
     """
     Deep Web Research Tool
     This tool is used to research the deep web for information.
@@ -119,16 +196,141 @@ def deep_research(query: str, max_depth: int = 3) -> Dict[str, str]:
         {"finalAnalysis": str}
     """
     max_depth = int(max_depth)
-    response = firecrawl_web_search_app.deep_research(
-        query=query,
-        max_depth=max_depth,
-        system_prompt="When presenting the finalAnalysis, strictly limit the total combined tokens (input + your output) to **no more than 1024 tokens**. Focus on delivering **high-density**, **information-rich feedback**: eliminate redundancy, shrink filler words, and favor compact expressions. Structure content with brief headings, bullet points, equations, or tables where appropriate. Prioritize clarity, precision, and relevance—if a detail isn't essential, omit it. Ensure every sentence adds substantive value."
-    )
+    try:
+        response = await get_async_firecrawl_app().deep_research(
+            query=query,
+            max_depth=max_depth,
+            system_prompt=DEEP_RESEARCH_SYSTEM_PROMPT,
+        )
+    except (RateLimitExceeded, CircuitOpen) as e:
+        return {"error": str(e)}
     if response['success']:
         return {
-            "finalAnalysis": response['data']['finalAnalysis'],
+            "finalAnalysis": await _trim_analysis(response['data']['finalAnalysis']),
         }
     else:
         return {
             "error": response['error']
-        }
\ No newline at end of file
+        }
+
+
+async def _trim_analysis(analysis: str) -> str:
+    # The system prompt asks Firecrawl for at most 1024 tokens, which it does not always keep to.
+    return (await get_summary_cascade().summarize(analysis, DEEP_RESEARCH_MAX_TOKENS)).text
+
+
+async def _deep_research_job(job: Dict[str, Any], update) -> Dict[str, str]:
+    """
+    Runs a start_deep_research job: starts the research on Firecrawl (unless a
+    previous run already did) and polls it until it finishes.
+    """
+    app = get_async_firecrawl_app()
+    upstream_id = job["upstream_id"]
+    if not upstream_id:
+        response = await app.async_deep_research(
+            query=job["params"]["query"],
+            max_depth=job["params"]["max_depth"],
+            system_prompt=DEEP_RESEARCH_SYSTEM_PROMPT,
+        )
+        if not response.get('success') or not response.get('id'):
+            raise RuntimeError(response.get('error') or "Firecrawl did not start the research")
+        upstream_id = response['id']
+        update(upstream_id=upstream_id)
+    # Measured from job creation, so a job resumed after a restart keeps its original deadline.
+    deadline = job["created_at"] + DEEP_RESEARCH_TIMEOUT
+    while True:
+        try:
+            status = await app.check_deep_research_status(upstream_id)
+        except (RateLimitExceeded, CircuitOpen):
+            # The research keeps running on Firecrawl; skip this poll rather than fail the job.
+            status = {}
+        if status:
+            update(progress={
+                "currentDepth": status.get('currentDepth'),
+                "maxDepth": status.get('maxDepth'),
+                "sources": len(status.get('sources') or []),
+                "activities": [activity.get('message') for activity in (status.get('activities') or [])[-3:]],
+            })
+        if status.get('status') == "completed":
+            return {"finalAnalysis": await _trim_analysis(status['data']['finalAnalysis'])}
+        if status.get('status') == "failed" or status.get('success') is False:
+            raise RuntimeError(status.get('error') or "Deep research failed")
+        if time.time() + DEEP_RESEARCH_POLL_SECONDS > deadline:
+            raise TimeoutError(f"Deep research did not finish within {DEEP_RESEARCH_TIMEOUT:.0f} s")
+        await asyncio.sleep(DEEP_RESEARCH_POLL_SECONDS)
+
+
+def _research_jobs():
+    runner = get_job_runner()
+    # The first call after a server start also resumes the research jobs it left unfinished.
+    runner.register("deep_research", _deep_research_job)
+    return runner
+
+
+def _job_times(job: Dict[str, Any]) -> Dict[str, str]:
+    return {
+        name: datetime.fromtimestamp(job[name], timezone.utc).isoformat(timespec="seconds")
+        for name in ("created_at", "updated_at")
+    }
+
+
+@mcp.tool()
+async def start_deep_research(query: str, max_depth: int = 3) -> Dict[str, str]:
+    """
+    Starts a deep web research job in the background and returns at once.
+    Use this instead of deep_research for anything that may take more than a
+    minute; poll get_research_status and fetch the analysis with get_research_result.
+    Args:
+        query (str): The research question.
+        max_depth (int): The maximum depth of the search. Default 3.
+    Returns:
+        dict: {"job_id": str, "status": "queued"}
+    """
+    try:
+        job = _research_jobs().start("deep_research", {"query": query, "max_depth": int(max_depth)})
+    except JobTableFull as e:
+        return {"error": str(e)}
+    return {"job_id": job["id"], "status": job["status"]}
+
+
+@mcp.tool()
+async def get_research_status(job_id: str) -> Dict[str, Any]:
+    """
+    Reports the progress of a start_deep_research job.
+    Args:
+        job_id (str): The id returned by start_deep_research.
+    Returns:
+        dict: {"job_id", "query", "status": "queued" | "running" | "completed" | "failed",
+               "progress": {"currentDepth", "maxDepth", "sources", "activities"},
+               "created_at", "updated_at"} and "error" for a failed job.
+    """
+    job = _research_jobs().table.get(job_id)
+    if job is None or job["kind"] != "deep_research":
+        return {"error": f"Unknown or expired job id {job_id!r}"}
+    status = {"job_id": job["id"], "query": job["params"]["query"], "status": job["status"],
+              "progress": job["progress"] or {}, **_job_times(job)}
+    if job["error"]:
+        status["error"] = job["error"]
+    return status
+
+
+@mcp.tool()
+@token_budget(1500)
+async def get_research_result(job_id: str) -> Dict[str, Any]:
+    """
+    Fetches the final analysis of a finished start_deep_research job.
+    Results are kept for JOBS_RETENTION_HOURS (default 24) after the job finishes.
+    Args:
+        job_id (str): The id returned by start_deep_research.
+    Returns:
+        dict: {"finalAnalysis": str} once completed; {"status", "progress"} while the
+        job is still running; {"error": str} if it failed or the id is unknown.
+    """
+    job = _research_jobs().table.get(job_id)
+    if job is None or job["kind"] != "deep_research":
+        return {"error": f"Unknown or expired job id {job_id!r}"}
+    if job["status"] == "completed":
+        return job["result"]
+    if job["status"] == "failed":
+        return {"error": job["error"]}
+    return {"status": job["status"], "progress": job["progress"] or {}}
@@ -7,11 +7,18 @@ import os
 
 from ..server import mcp
 from ..loader.loader import *
+from ..loader.single_flight import normalize_text
+from ..loader.compaction import token_budget
+from ..loader.health import CircuitOpen
+from ..wikipedia import search_extracts
 from typing import Dict, Any
-import requests
+import asyncio
+
+WIKIPEDIA_BACKEND = os.getenv("WIKIPEDIA_BACKEND", "api").strip().lower()
 
 @mcp.tool() 
-def wikipedia_search(query: str, search_limit: str = "5") -> Dict[str, str]:
+@token_budget(1500)
+async def wikipedia_search(query: str, search_limit: str = "5") -> Dict[str, str]:
     """
     This function takes a search query and returns a list of search results.
     It uses the Wikipedia API to get the search results.
@@ -31,42 +38,38 @@ def wikipedia_search(query: str, search_limit: str = "5") -> Dict[str, str]:
     #     "results_string": response.json()
     # }
     search_limit = int(search_limit)
-    URL = 'https://en.wikipedia.org/w/api.php'
-    params = {
-        'action': 'query',
-        'format': 'json',
-        'list': 'search',
-        'srsearch': query,
-        'srlimit': search_limit
-    }
-    r = requests.get(URL, params=params)
-    # with open("wikipedia_search_results.json", "w") as f:
-    #     json.dump(r.json(), f, indent=4)
-    results = r.json()['query']['search']
+    # Identical concurrent searches share one set of Wikipedia requests.
+    return await get_single_flight().do(
+        "wikipedia_search",
+        (normalize_text(query), search_limit),
+        lambda: _wikipedia_search(query, search_limit),
+    )
 
-    titles = [r['title'] for r in results]
-    page_ids = [r['pageid'] for r in results]
-    d = []
-    q = []
-    for title, page_id in zip(titles, page_ids):
-        p = requests.get(URL, params={
-            'action': 'query',
-            'format': 'json',
-            'prop': 'extracts|info',
-            'explaintext': True,
-            'exintro': True,
-            'titles': title,
-            'inprop': 'url'
-        }).json()
-        # q.append(p)
-        # page = next(iter(p['query']['pages'].values()))
-        page = p['query']['pages'][str(page_id)]
-        data = f"{page['title']} ({page['fullurl']}): {page['extract']}"
-        # data = p.get('')
-        d.append(data)
-        # print(page['title'], page['extract'], page['fullurl'])
-    # with open("wikipedia_search_results33.json", "w") as f:
-    #     json.dump(q, f, indent=4)
+
+async def _wikipedia_search(query: str, search_limit: int) -> Dict[str, str]:
+    # WIKIPEDIA_BACKEND=local answers from the offline index (MCPTools/wikipedia/index.py);
+    # "auto" uses it when it exists and has matches, and the API otherwise.
+    backend = WIKIPEDIA_BACKEND
+    if backend == "local" or (backend == "auto" and os.path.exists(wikipedia_index_path())):
+        pages = await asyncio.to_thread(get_wikipedia_index().search, query, search_limit)
+        if pages or backend == "local":
+            return {
+                "results_string": "\n".join(f"{page['title']} ({page['url']}): {page['extract']}" for page in pages)
+            }
+
+    # Hits, extracts and URLs come back from one generator=search request.
+    try:
+        pages = await search_extracts(query, search_limit, get_wiki_extract_cache())
+    except CircuitOpen as e:
+        # Wikipedia is down: the offline index, when there is one, still answers.
+        if not os.path.exists(wikipedia_index_path()):
+            return {"error": str(e)}
+        pages = await asyncio.to_thread(get_wikipedia_index().search, query, search_limit)
+        return {
+            "results_string": "\n".join(f"{page['title']} ({page['url']}): {page['extract']}" for page in pages),
+            "note": "Wikipedia is unavailable; answered from the offline index",
+        }
+    d = [f"{page['title']} ({page['fullurl']}): {page.get('extract', '')}" for page in pages]
     return {
         "results_string": "\n".join(d)
-    }
\ No newline at end of file
+    }
@@ -0,0 +1 @@
+from .fetch import search_extracts
@@ -0,0 +1,68 @@
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+
+class ExtractCache:
+    """
+    LRU cache of Wikipedia intro extracts keyed by (pageid, revision).
+
+    A page's extract only changes with a new revision, so entries never expire:
+    an edit changes `lastrevid` and simply misses the cache.
+    """
+
+    def __init__(self, max_pages: Optional[int] = None):
+        self.max_pages = max_pages if max_pages is not None else int(os.getenv("WIKI_EXTRACT_CACHE_SIZE", 2048))
+        self._lock = threading.Lock()
+        self._extracts: "OrderedDict[Tuple[int, int], str]" = OrderedDict()
+        self._stats = {"hits": 0, "misses": 0}
+
+    @staticmethod
+    def _key(page: Dict[str, Any]) -> Optional[Tuple[int, int]]:
+        if "pageid" not in page or "lastrevid" not in page:
+            return None
+        return int(page["pageid"]), int(page["lastrevid"])
+
+    def fill(self, page: Dict[str, Any]) -> bool:
+        """
+        Sets page["extract"] from the cache.
+        Returns:
+            bool: False on a miss.
+        """
+        key = self._key(page)
+        with self._lock:
+            extract = self._extracts.get(key) if key else None
+            if extract is None:
+                self._stats["misses"] += 1
+                return False
+            self._extracts.move_to_end(key)
+            self._stats["hits"] += 1
+        page["extract"] = extract
+        return True
+
+    def put(self, page: Dict[str, Any]) -> None:
+        key = self._key(page)
+        if key is None or "extract" not in page:
+            return
+        with self._lock:
+            self._extracts[key] = page["extract"]
+            self._extracts.move_to_end(key)
+            while len(self._extracts) > self.max_pages:
+                self._extracts.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns:
+            dict: hits, misses and hit_rate of lookups for truncated extracts, and cached pages.
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats["cached_pages"] = len(self._extracts)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 3) if lookups else 0.0
+        return stats
+
+    def clear(self) -> None:
+        with self._lock:
+            self._extracts.clear()
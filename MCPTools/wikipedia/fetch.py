@@ -0,0 +1,84 @@
+"""
+Wikipedia search with intro extracts in as few round trips as possible.
+
+One `generator=search` query returns the hits together with their intro
+extract, URL and revision. TextExtracts serves at most 20 intro extracts per
+request (`exlimit`), so for larger result sets (or when the API truncates for
+any other reason) the missing extracts are taken from the ExtractCache,
+keyed by pageid + revision, and whatever is still missing is fetched in
+concurrent multi-title requests, falling back to one request per page.
+"""
+import asyncio
+from typing import Any, Dict, List
+
+from ..loader import get_async_http_client, upstream_url
+from .cache import ExtractCache
+
+# TextExtracts' limit for exintro extracts per request.
+MAX_EXTRACTS_PER_REQUEST = 20
+
+EXTRACT_PARAMS = {
+    'action': 'query',
+    'format': 'json',
+    'prop': 'extracts|info',
+    'explaintext': True,
+    'exintro': True,
+    'exlimit': 'max',
+    'inprop': 'url',
+}
+
+
+async def _fetch_pages(url: str, titles: List[str]) -> Dict[int, Dict[str, Any]]:
+    """
+    Returns:
+        Dict[int, Dict[str, Any]]: The pages that came back with an extract, by pageid.
+    """
+    response = await get_async_http_client().get(url, params={**EXTRACT_PARAMS, 'titles': "|".join(titles)})
+    pages = response.json().get('query', {}).get('pages', {}).values()
+    return {page['pageid']: page for page in pages if 'extract' in page and 'pageid' in page}
+
+
+async def _fetch_chunk(url: str, chunk: List[Dict[str, Any]]) -> Dict[int, Dict[str, Any]]:
+    fetched = await _fetch_pages(url, [page['title'] for page in chunk])
+    if len(chunk) > 1:
+        retry = [page for page in chunk if page['pageid'] not in fetched]
+        for pages in await asyncio.gather(*(_fetch_pages(url, [page['title']]) for page in retry)):
+            fetched.update(pages)
+    return fetched
+
+
+async def search_extracts(query: str, limit: int, cache: ExtractCache) -> List[Dict[str, Any]]:
+    """
+    Args:
+        query (str): The search query.
+        limit (int): The number of search results.
+        cache (ExtractCache): Extracts by pageid + revision, consulted for truncated results.
+    Returns:
+        List[Dict[str, Any]]: The result pages in search order, each with "pageid",
+        "title", "fullurl", "lastrevid" and (unless Wikipedia has none) "extract".
+    """
+    url = upstream_url("wikipedia", "/w/api.php")
+    response = await get_async_http_client().get(url, params={
+        **EXTRACT_PARAMS,
+        'generator': 'search',
+        'gsrsearch': query,
+        'gsrlimit': limit,
+    })
+    pages = sorted(response.json().get('query', {}).get('pages', {}).values(), key=lambda page: page.get('index', 0))
+
+    missing = []
+    for page in pages:
+        if 'extract' in page:
+            cache.put(page)
+        elif not cache.fill(page):
+            missing.append(page)
+    if missing:
+        chunks = [missing[i:i + MAX_EXTRACTS_PER_REQUEST] for i in range(0, len(missing), MAX_EXTRACTS_PER_REQUEST)]
+        fetched = {}
+        for pages_by_id in await asyncio.gather(*(_fetch_chunk(url, chunk) for chunk in chunks)):
+            fetched.update(pages_by_id)
+        for page in missing:
+            if page['pageid'] in fetched:
+                page['extract'] = fetched[page['pageid']]['extract']
+                cache.put(fetched[page['pageid']])
+    return pages
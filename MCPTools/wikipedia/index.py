@@ -0,0 +1,317 @@
+"""
+Offline Wikipedia search backend: an SQLite FTS5 index built from a dump.
+
+Supported dumps (optionally .gz or .bz2 compressed):
+    *.xml    Wikimedia abstract dumps (enwiki-*-abstract.xml): <doc> elements
+             with <title>Wikipedia: ...</title>, <url> and <abstract>
+    *.jsonl  one {"title", "url", "extract"} object per line ("abstract" or
+             "text" are accepted for the extract; the url is derived from the
+             title when missing)
+
+Ingest streams the dump with bounded memory: XML is read with iterparse and
+every <doc> is discarded once it is buffered, and pages are written in
+transactions of `batch_size`. It is incremental and resumable: pages are
+upserted by title (unchanged pages are not rewritten), and the number of
+documents committed from each dump file is stored in the same transaction as
+the pages, so an interrupted ingest continues where it stopped and a dump that
+was fully ingested and has not changed is skipped.
+
+Searches rank an exact title match first, then by FTS5's BM25, weighting
+title matches above extract matches. All query words must match; when that gives fewer than `limit` pages
+the rest are filled with pages matching any word.
+
+Usage:
+    python -m MCPTools.wikipedia.index ingest enwiki-latest-abstract.xml.gz
+    python -m MCPTools.wikipedia.index search "pune district"
+"""
+import bz2
+import gzip
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import xml.etree.ElementTree as ElementTree
+from typing import Any, Callable, Dict, IO, Iterator, List, Optional, Tuple
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    id INTEGER PRIMARY KEY,
+    title TEXT NOT NULL UNIQUE,
+    url TEXT NOT NULL,
+    extract TEXT NOT NULL
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS pages_fts USING fts5(
+    title, extract, content='pages', content_rowid='id', tokenize='porter unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER IF NOT EXISTS pages_ai AFTER INSERT ON pages BEGIN
+    INSERT INTO pages_fts(rowid, title, extract) VALUES (new.id, new.title, new.extract);
+END;
+CREATE TRIGGER IF NOT EXISTS pages_ad AFTER DELETE ON pages BEGIN
+    INSERT INTO pages_fts(pages_fts, rowid, title, extract) VALUES ('delete', old.id, old.title, old.extract);
+END;
+CREATE TRIGGER IF NOT EXISTS pages_au AFTER UPDATE ON pages BEGIN
+    INSERT INTO pages_fts(pages_fts, rowid, title, extract) VALUES ('delete', old.id, old.title, old.extract);
+    INSERT INTO pages_fts(rowid, title, extract) VALUES (new.id, new.title, new.extract);
+END;
+CREATE TABLE IF NOT EXISTS ingests (
+    source TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime REAL NOT NULL,
+    documents INTEGER NOT NULL,
+    complete INTEGER NOT NULL
+);
+"""
+
+_UPSERT = """
+INSERT INTO pages (title, url, extract) VALUES (?, ?, ?)
+ON CONFLICT (title) DO UPDATE SET url = excluded.url, extract = excluded.extract
+WHERE url IS NOT excluded.url OR extract IS NOT excluded.extract
+"""
+
+# An exact title match ranks first. FTS5's bm25() normalizes by the length of the
+# whole row, so a long extract would otherwise push "Pune" below "Pune district".
+# Then bm25() weights per FTS column (title, extract); lower scores rank first.
+_SEARCH = """
+SELECT pages.id, pages.title, pages.url, pages.extract FROM pages_fts
+JOIN pages ON pages.id = pages_fts.rowid
+WHERE pages_fts MATCH ? ORDER BY pages.title = ? COLLATE NOCASE DESC, bm25(pages_fts, 10.0, 1.0) LIMIT ?
+"""
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+_TITLE_PREFIX = "Wikipedia: "
+
+
+def page_url(title: str) -> str:
+    return "https://en.wikipedia.org/wiki/" + title.replace(" ", "_")
+
+
+def _open(path: str) -> IO[bytes]:
+    if path.endswith(".gz"):
+        return gzip.open(path, "rb")
+    if path.endswith(".bz2"):
+        return bz2.open(path, "rb")
+    return open(path, "rb")
+
+
+def _iter_abstract_xml(stream: IO[bytes]) -> Iterator[Tuple[str, str, str]]:
+    events = ElementTree.iterparse(stream, events=("start", "end"))
+    _, root = next(events)
+    for event, element in events:
+        if event == "end" and element.tag == "doc":
+            title = (element.findtext("title") or "").strip()
+            if title.startswith(_TITLE_PREFIX):
+                title = title[len(_TITLE_PREFIX):]
+            yield title, (element.findtext("url") or "").strip(), (element.findtext("abstract") or "").strip()
+            # Drop the parsed <doc> (and the root's reference to it) to keep memory bounded.
+            root.clear()
+
+
+def _iter_jsonl(stream: IO[bytes]) -> Iterator[Tuple[str, str, str]]:
+    for line in stream:
+        if not line.strip():
+            continue
+        page = json.loads(line)
+        extract = page.get("extract") or page.get("abstract") or page.get("text") or ""
+        yield str(page.get("title", "")).strip(), str(page.get("url") or "").strip(), str(extract).strip()
+
+
+def iter_dump(path: str) -> Iterator[Tuple[str, str, str]]:
+    """
+    Yields (title, url, extract) for every document in a dump, in file order.
+    """
+    name = path[:-3] if path.endswith(".gz") else path[:-4] if path.endswith(".bz2") else path
+    parse = _iter_jsonl if name.endswith((".jsonl", ".json", ".ndjson")) else _iter_abstract_xml
+    with _open(path) as stream:
+        yield from parse(stream)
+
+
+def match_expression(query: str, operator: str = "AND") -> Optional[str]:
+    """
+    Builds an FTS5 MATCH expression from free text, quoting every word so that
+    user input is never parsed as FTS5 syntax.
+    """
+    words = _WORD.findall(query)
+    if not words:
+        return None
+    return f" {operator} ".join('"' + word + '"' for word in words)
+
+
+class WikipediaIndex:
+    """
+    FTS5 index of Wikipedia pages, safe to share between threads.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+        self._stats = {"searches": 0, "search_ms": 0.0}
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+    def page_count(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT count(*) FROM pages").fetchone()[0]
+
+    def ingest(
+        self,
+        source: str,
+        batch_size: int = 1000,
+        max_documents: Optional[int] = None,
+        progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Adds the pages of a dump to the index, resuming an earlier interrupted ingest of it.
+        Args:
+            source (str): Path of the dump file.
+            batch_size (int): Documents per transaction; bounds memory and the work lost on a crash.
+            max_documents (int): Stop after reading this many documents (a partial run).
+            progress (Callable): Called with the running counters after every batch.
+        Returns:
+            dict: documents (read from the file in this run), resumed_from, written,
+            unchanged, skipped (empty), seconds and complete.
+        """
+        source = os.path.abspath(source)
+        stat = os.stat(source)
+        with self._lock:
+            state = self._db.execute(
+                "SELECT size, mtime, documents, complete FROM ingests WHERE source = ?", (source,)
+            ).fetchone()
+        resume_from = 0
+        if state is not None and (state[0], state[1]) == (stat.st_size, stat.st_mtime):
+            if state[3]:
+                return {"documents": 0, "resumed_from": state[2], "written": 0, "unchanged": 0,
+                        "skipped": 0, "seconds": 0.0, "complete": True}
+            resume_from = state[2]
+
+        counters = {"documents": 0, "resumed_from": resume_from, "written": 0, "unchanged": 0, "skipped": 0}
+        start = time.perf_counter()
+        position = resume_from
+        batch: List[Tuple[str, str, str]] = []
+        complete = True
+        for index, (title, url, extract) in enumerate(iter_dump(source), 1):
+            if index <= resume_from:
+                continue
+            if max_documents is not None and counters["documents"] >= max_documents:
+                complete = False
+                break
+            position = index
+            counters["documents"] += 1
+            if title and extract:
+                batch.append((title, url or page_url(title), extract))
+            else:
+                counters["skipped"] += 1
+            if len(batch) >= batch_size:
+                self._commit(source, stat, position, batch, False, counters)
+                batch = []
+                if progress:
+                    progress(dict(counters, seconds=time.perf_counter() - start))
+        self._commit(source, stat, position, batch, complete, counters)
+        counters["seconds"] = time.perf_counter() - start
+        counters["complete"] = complete
+        return counters
+
+    def _commit(self, source: str, stat: os.stat_result, position: int, batch: List[Tuple[str, str, str]],
+                complete: bool, counters: Dict[str, Any]) -> None:
+        """
+        Writes a batch of pages and the ingest position in one transaction.
+        """
+        with self._lock:
+            self._db.execute("BEGIN")
+            try:
+                # rowcount counts the pages inserted or changed, not the rows the FTS triggers write.
+                written = self._db.executemany(_UPSERT, batch).rowcount if batch else 0
+                self._db.execute(
+                    "INSERT OR REPLACE INTO ingests VALUES (?, ?, ?, ?, ?)",
+                    (source, stat.st_size, stat.st_mtime, position, int(complete)),
+                )
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+        counters["written"] += written
+        counters["unchanged"] += len(batch) - written
+
+    def search(self, query: str, limit: int = 5) -> List[Dict[str, Any]]:
+        """
+        Returns:
+            List[Dict[str, Any]]: Up to `limit` pages ({"title", "url", "extract"}), best first.
+        """
+        start = time.perf_counter()
+        pages: Dict[int, Dict[str, Any]] = {}
+        title_query = " ".join(query.split())
+        with self._lock:
+            for operator in ("AND", "OR"):
+                expression = match_expression(query, operator)
+                if expression is None or len(pages) >= limit:
+                    break
+                for page_id, title, url, extract in self._db.execute(_SEARCH, (expression, title_query, limit)):
+                    if len(pages) < limit:
+                        pages.setdefault(page_id, {"title": title, "url": url, "extract": extract})
+            self._stats["searches"] += 1
+            self._stats["search_ms"] += (time.perf_counter() - start) * 1000
+        return list(pages.values())
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns:
+            dict: Indexed pages, searches and their mean latency, and per-dump ingest progress.
+        """
+        with self._lock:
+            stats = {
+                "pages": self._db.execute("SELECT count(*) FROM pages").fetchone()[0],
+                "searches": self._stats["searches"],
+                "mean_search_ms": round(self._stats["search_ms"] / self._stats["searches"], 3)
+                if self._stats["searches"] else 0.0,
+                "dumps": {
+                    source: {"documents": documents, "complete": bool(complete)}
+                    for source, documents, complete in self._db.execute("SELECT source, documents, complete FROM ingests")
+                },
+            }
+        return stats
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    import argparse
+    from ..loader.loader import wikipedia_index_path
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--index", default=wikipedia_index_path(), help="Index file (default: %(default)s)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    ingest = commands.add_parser("ingest", help="Add dump files to the index")
+    ingest.add_argument("dumps", nargs="+")
+    ingest.add_argument("--batch-size", type=int, default=1000)
+    search = commands.add_parser("search", help="Query the index")
+    search.add_argument("query")
+    search.add_argument("--limit", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    index = WikipediaIndex(args.index)
+    if args.command == "ingest":
+        for dump in args.dumps:
+            result = index.ingest(dump, batch_size=args.batch_size, progress=lambda c: print(
+                f"\r{c['resumed_from'] + c['documents']:,} documents, {c['written']:,} written", end="", flush=True))
+            if result["complete"] and not result["documents"] and result["resumed_from"]:
+                print(f"{dump}: already ingested and unchanged, skipped")
+                continue
+            rate = result["documents"] / result["seconds"] if result["seconds"] else 0.0
+            print(f"\r{dump}: {result['documents']:,} documents read ({rate:,.0f}/s), {result['written']:,} written, "
+                  f"{result['unchanged']:,} unchanged, {result['skipped']:,} empty"
+                  + (f", resumed after {result['resumed_from']:,}" if result["resumed_from"] else ""))
+        print(f"{index.page_count():,} pages in {args.index}")
+    else:
+        for page in index.search(args.query, args.limit):
+            print(f"{page['title']} ({page['url']}): {page['extract']}")
+
+
+if __name__ == "__main__":
+    main()
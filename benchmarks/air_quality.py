@@ -0,0 +1,136 @@
+"""
+Equivalence check and microbenchmark for the batch air-quality classifier.
+
+Compares `classify_air_quality` against the original per-call `air_quality`
+implementation (kept below as `legacy_air_quality`) on random readings plus
+edge cases (threshold boundaries, negatives, None, NaN, infinity), checks the
+`decimals=3` mode against rounding every value first, then times
+both on hourly-forecast-sized batches. Exits non-zero on any label mismatch.
+
+Usage:
+    python benchmarks/air_quality.py --samples 100000
+"""
+import argparse
+import os
+import sys
+import timeit
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from MCPTools.get_weather.aqi import AIR_QUALITY_THRESHOLDS, air_quality, classify_air_quality
+
+
+def legacy_air_quality(so2, no2, pm10, pm2_5, o3, co):
+    """The air_quality implementation before the precomputed table, verbatim."""
+    values = [so2, no2, pm10, pm2_5, o3, co]
+    if any(v is None or v < 0 for v in values):
+        return "Invalid Data"
+    thresholds = {
+        "Good": {
+            "SO2": (0, 20), "NO2": (0, 40), "PM10": (0, 20), "PM2.5": (0, 10), "O3": (0, 60), "CO": (0, 4400)
+        },
+        "Fair": {
+            "SO2": (20, 80), "NO2": (40, 70), "PM10": (20, 50), "PM2.5": (10, 25), "O3": (60, 100), "CO": (4400, 9400)
+        },
+        "Moderate": {
+            "SO2": (80, 250), "NO2": (70, 150), "PM10": (50, 100), "PM2.5": (25, 50), "O3": (100, 140), "CO": (9400, 12400)
+        },
+        "Poor": {
+            "SO2": (250, 350), "NO2": (150, 200), "PM10": (100, 200), "PM2.5": (50, 75), "O3": (140, 180), "CO": (12400, 15400)
+        },
+        "Very Poor": {
+            "SO2": (350, float('inf')), "NO2": (200, float('inf')), "PM10": (200, float('inf')), "PM2.5": (75, float('inf')),
+            "O3": (180, float('inf')), "CO": (15400, float('inf'))
+        }
+    }
+    worst_quality = "Good"
+    pollutant_values = {"SO2": so2, "NO2": no2, "PM10": pm10, "PM2.5": pm2_5, "O3": o3, "CO": co}
+    quality_levels = ["Good", "Fair", "Moderate", "Poor", "Very Poor"]
+    for pollutant, value in pollutant_values.items():
+        for quality in quality_levels:
+            min_val, max_val = thresholds[quality][pollutant]
+            if min_val <= value < max_val:
+                current_index = quality_levels.index(quality)
+                worst_index = quality_levels.index(worst_quality)
+                if current_index > worst_index:
+                    worst_quality = quality
+                break
+        else:
+            return "Data out of range"
+    return worst_quality
+
+
+def sample_rows(n: int, rng: np.random.Generator) -> list[list]:
+    """Random readings around the thresholds, with boundaries and bad values mixed in."""
+    scale = AIR_QUALITY_THRESHOLDS[:, -1] * 1.3
+    rows = np.round(rng.random((n, 6)) * scale, 3).tolist()
+    boundaries = np.concatenate([np.zeros((6, 1)), AIR_QUALITY_THRESHOLDS], axis=1)
+    specials = [None, float("nan"), float("inf"), float("-inf"), -0.001, 0.0]
+    for row in rows:
+        if rng.random() < 0.3:
+            column = rng.integers(6)
+            row[column] = float(rng.choice(boundaries[column]))
+        if rng.random() < 0.05:
+            row[rng.integers(6)] = specials[rng.integers(len(specials))]
+    return rows
+
+
+def check_equivalence(rows: list[list]) -> int:
+    missing = np.array([[v is None for v in row] for row in rows])
+    values = np.array([[np.nan if v is None else v for v in row] for row in rows], dtype=float)
+    batch = classify_air_quality(values, missing)
+    mismatches = 0
+    for row, label in zip(rows, batch):
+        expected = legacy_air_quality(*row)
+        mismatches += expected != label or expected != air_quality(*row)
+    return mismatches
+
+
+def unrounded_rows(n: int, rng: np.random.Generator) -> list[list]:
+    """Raw readings with many values within a few ulps of T - 0.0005 and -0.0005."""
+    rows = (rng.random((n, 6)) * AIR_QUALITY_THRESHOLDS[:, -1] * 1.3).tolist()
+    edges = np.concatenate([np.zeros((6, 1)), AIR_QUALITY_THRESHOLDS], axis=1) - 0.0005
+    for row in rows:
+        if rng.random() < 0.5:
+            column = rng.integers(6)
+            value = float(rng.choice(edges[column]))
+            for _ in range(rng.integers(-3, 4)):
+                value = np.nextafter(value, np.inf)
+            row[column] = float(value)
+    return rows
+
+
+def check_rounded_equivalence(rows: list[list]) -> int:
+    batch = classify_air_quality(np.array(rows, dtype=float), decimals=3)
+    return sum(air_quality(*[round(v, 3) for v in row]) != label for row, label in zip(rows, batch))
+
+
+def main(samples: int, seed: int) -> int:
+    rng = np.random.default_rng(seed)
+    rows = sample_rows(samples, rng)
+    mismatches = check_equivalence(rows)
+    print(f"equivalence: {samples} rows, {mismatches} mismatches")
+    mismatches += (rounded := check_rounded_equivalence(unrounded_rows(samples, rng)))
+    print(f"equivalence with decimals=3 against round(value, 3): {samples} rows, {rounded} mismatches")
+
+    print(f"\n{'rows':>7} {'legacy loop':>14} {'table scalar':>14} {'batch':>12} {'speedup':>8}")
+    for n in (1, 24, 24 * 14, 24 * 365):
+        batch_rows = sample_rows(n, rng)
+        batch_rows = [[0.0 if v is None else v for v in row] for row in batch_rows]
+        values = np.array(batch_rows, dtype=float)
+        number = max(1, 20000 // n)
+        legacy = min(timeit.repeat(lambda: [legacy_air_quality(*r) for r in batch_rows], number=number, repeat=3)) / number
+        scalar = min(timeit.repeat(lambda: [air_quality(*r) for r in batch_rows], number=number, repeat=3)) / number
+        batch = min(timeit.repeat(lambda: classify_air_quality(values), number=number, repeat=3)) / number
+        print(f"{n:>7} {legacy * 1e6:>11.1f} us {scalar * 1e6:>11.1f} us {batch * 1e6:>9.1f} us {legacy / batch:>7.1f}x")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--samples", type=int, default=100000, help="Random rows for the equivalence check")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    sys.exit(main(args.samples, args.seed))
@@ -0,0 +1,72 @@
+"""
+Cold-start benchmark for the stdio MCP server.
+
+Spawns ServerSideMCP.py the same way ClientSide-SSE-MCP.py does and measures the
+time from process spawn until `initialize` completes. The "eager" run sets
+MCPTOOLS_EAGER_LOAD=1 so every model and API client is built at import time
+(the old loader behaviour); the "lazy" run builds them on first use.
+
+Usage:
+    python benchmarks/cold_start.py --runs 5
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.stdio import stdio_client
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SERVER_SCRIPT = os.path.join(ROOT_DIR, "ServerSideMCP.py")
+
+
+async def time_to_initialize(eager: bool) -> float:
+    env = dict(os.environ)
+    env["MCPTOOLS_EAGER_LOAD"] = "1" if eager else "0"
+    server_params = StdioServerParameters(command=sys.executable, args=[SERVER_SCRIPT], env=env, cwd=ROOT_DIR)
+    start = time.perf_counter()
+    async with stdio_client(server_params) as (read, write):
+        async with ClientSession(read, write) as session:
+            await session.initialize()
+            elapsed = time.perf_counter() - start
+    return elapsed * 1000
+
+
+def resource_build_times() -> dict[str, float]:
+    sys.path.insert(0, ROOT_DIR)
+    from MCPTools.loader import registry
+
+    times = {}
+    for name in registry.names():
+        try:
+            registry.get(name)
+            times[name] = registry.build_times()[name]
+        except Exception as e:
+            print(f"  {name}: failed to build ({e})")
+    return times
+
+
+async def main(runs: int):
+    results = {}
+    for label, eager in (("eager (before)", True), ("lazy (after)", False)):
+        samples = [await time_to_initialize(eager) for _ in range(runs)]
+        results[label] = samples
+        print(f"{label:>15}: median {statistics.median(samples):8.1f} ms  "
+              f"min {min(samples):8.1f} ms  max {max(samples):8.1f} ms")
+    before = statistics.median(results["eager (before)"])
+    after = statistics.median(results["lazy (after)"])
+    print(f"{'saved':>15}: {before - after:8.1f} ms per server spawn")
+
+    print("\nPer-resource build time (in-process, first use):")
+    for name, elapsed_ms in resource_build_times().items():
+        print(f"  {name:<20} {elapsed_ms:8.1f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="Server spawns per mode")
+    args = parser.parse_args()
+    asyncio.run(main(args.runs))
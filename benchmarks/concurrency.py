@@ -0,0 +1,106 @@
+"""
+Concurrency check for the async tools.
+
+Serves every upstream request from an in-process mock transport that sleeps
+--delay seconds before answering, then issues N identical tool calls through the
+MCP server at once. With async tools the batch should finish in about the time
+of a single call; with blocking tools it would take N times as long. Identical
+concurrent calls are collapsed into one upstream request (single-flight), so the
+number of upstream requests per batch is reported too. Exits non-zero when the
+batch takes more than --max-ratio times a single call.
+
+Usage:
+    python benchmarks/concurrency.py --calls 20 --delay 0.5
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from MCPTools.server import mcp
+from MCPTools.loader import get_single_flight, get_weather_cache, registry
+from MCPTools.loader.http_client import AsyncHTTPClient
+
+AIR_QUALITY = {"co": 230.3, "no2": 13.5, "o3": 68.0, "so2": 7.2, "pm2_5": 8.1, "pm10": 12.4}
+
+CURRENT_WEATHER = {
+    "location": {"name": "Pune"},
+    "current": {
+        "last_updated": "2025-07-18 10:15", "temp_c": 26.3, "wind_kph": 18.4, "pressure_in": 29.74,
+        "humidity": 79, "vis_km": 6.0, "precip_mm": 0.4, "uv": 2.1,
+        "condition": {"text": "Light rain"}, "air_quality": AIR_QUALITY,
+    },
+}
+
+def wiki_page(title: str, index: int) -> dict:
+    return {
+        "pageid": index, "title": title, "index": index, "lastrevid": 100 + index,
+        "fullurl": f"https://en.wikipedia.org/wiki/{title.replace(' ', '_')}",
+        "extract": f"{title} is a place in Maharashtra, India.",
+    }
+
+
+# generator=search answers with the hits and their extracts in one response.
+WIKI_SEARCH = {"query": {"pages": {
+    str(index): wiki_page(title, index) for index, title in enumerate(("Pune", "Pune district"), 1)
+}}}
+
+
+UPSTREAM_REQUESTS = {"count": 0}
+
+
+def slow_upstream(delay: float) -> httpx.MockTransport:
+    async def handler(request: httpx.Request) -> httpx.Response:
+        UPSTREAM_REQUESTS["count"] += 1
+        await asyncio.sleep(delay)
+        if request.url.host == "api.weatherapi.com":
+            return httpx.Response(200, json=CURRENT_WEATHER)
+        if request.url.host == "en.wikipedia.org":
+            return httpx.Response(200, json=WIKI_SEARCH)
+        return httpx.Response(404, json={"error": "not mocked"})
+
+    return httpx.MockTransport(handler)
+
+
+async def timed(coro) -> float:
+    start = time.perf_counter()
+    await coro
+    return time.perf_counter() - start
+
+
+async def main(calls: int, delay: float, max_ratio: float) -> int:
+    registry.register("async_http_client", lambda: AsyncHTTPClient(transport=slow_upstream(delay)))
+    cases = {
+        "get_weather": {"city": "Pune"},
+        "wikipedia_search": {"query": "Pune", "search_limit": "2"},
+    }
+    failed = False
+    for tool, arguments in cases.items():
+        await mcp.call_tool(tool, arguments)  # warm up: import the tool module, open the pool
+        get_weather_cache().clear()
+        single = await timed(mcp.call_tool(tool, arguments))
+        get_weather_cache().clear()
+        UPSTREAM_REQUESTS["count"] = 0
+        batch = await timed(asyncio.gather(*(mcp.call_tool(tool, arguments) for _ in range(calls))))
+        ratio = batch / single
+        status = "ok" if ratio <= max_ratio else "FAIL"
+        print(f"{tool:<18} 1 call {single * 1000:7.1f} ms | {calls} parallel calls {batch * 1000:7.1f} ms "
+              f"| blocking would be ~{single * calls * 1000:7.1f} ms | ratio {ratio:4.2f} "
+              f"| upstream requests {UPSTREAM_REQUESTS['count']} [{status}]")
+        failed |= ratio > max_ratio
+    print(f"single-flight: {get_single_flight().stats()}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=20, help="Parallel calls per tool")
+    parser.add_argument("--delay", type=float, default=0.5, help="Upstream latency in seconds")
+    parser.add_argument("--max-ratio", type=float, default=2.0, help="Allowed batch/single time ratio")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(args.calls, args.delay, args.max_ratio)))
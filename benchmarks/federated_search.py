@@ -0,0 +1,104 @@
+"""
+Latency of federated_search against single-provider search, on the stand-in.
+
+The stand-in gives every search provider its own latency (--latency, e.g.
+tavily=0.08) plus a slow tail: --tail-rate of requests take --tail-latency
+seconds longer. For --calls queries each, the benchmark reports p50/p95/p99
+latency and distinct results for:
+    - each provider alone (what the single-provider tools wait for);
+    - federated_search without hedging;
+    - federated_search with hedging, after --warmup calls have given every
+      provider enough latency samples for its p95 threshold.
+Runs entirely offline.
+
+Usage:
+    python benchmarks/federated_search.py --calls 200 --tail-rate 0.1 --tail-latency 1.5
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.standin import Faults, serve_in_thread
+from benchmarks.standin.__main__ import per_service
+
+QUERY = "pune weather"
+
+
+def percentile(samples: list[float], q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+async def run(label: str, fn, calls: int, concurrency: int) -> None:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, distinct = [], []
+
+    async def one():
+        async with semaphore:
+            start = time.perf_counter()
+            results = await fn()
+            latencies.append((time.perf_counter() - start) * 1000)
+            distinct.append(len(results))
+
+    await asyncio.gather(*(one() for _ in range(calls)))
+    print(f"{label:<28} {percentile(latencies, 0.5):>8.1f} {percentile(latencies, 0.95):>8.1f} "
+          f"{percentile(latencies, 0.99):>8.1f} {sum(distinct) / len(distinct):>8.1f}")
+
+
+async def main(calls: int, warmup: int, k: int, budget: float, concurrency: int) -> None:
+    from MCPTools.loader import get_search_latency
+    from MCPTools.search import PROVIDERS, federated_search
+
+    tracker = get_search_latency()
+
+    def federated(hedge: bool):
+        async def search():
+            response = await federated_search(QUERY, k, budget, list(PROVIDERS), tracker, hedge=hedge)
+            return response["results"]
+        return search
+
+    print(f"{'':<28} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'results':>8}")
+    for name, provider in PROVIDERS.items():
+        await run(f"{name} alone", lambda provider=provider: provider(QUERY, k), calls, concurrency)
+    await run("federated, no hedging", federated(False), calls, concurrency)
+
+    tracker.reset()
+    await run(f"(warm-up, {warmup} calls)", federated(False), warmup, concurrency)
+    await run("federated, hedged at p95", federated(True), calls, concurrency)
+    print()
+    for name, stats in tracker.stats().items():
+        print(f"{name:<10} p95 {stats['p95_ms']:>7.1f} ms  hedges {stats['hedges']:>4} "
+              f"(won {stats['hedge_wins']:>3})  cancelled {stats['cancelled']:>4}  calls {stats['calls']:>5}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=50)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--budget", type=float, default=3.0, help="federated_search latency budget (s)")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--latency", action="append", default=["tavily=0.08", "google=0.15", "firecrawl=0.4"],
+                        metavar="[SERVICE=]SECONDS")
+    parser.add_argument("--tail-rate", type=float, default=0.1)
+    parser.add_argument("--tail-latency", type=float, default=1.5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    for name in ("TAVILY_API_KEY", "FIRECRAWL_SANE_API", "OPENROUTER"):
+        os.environ.setdefault(name, "standin")
+    # The stand-in enforces no quotas; the providers' token buckets would only pace the benchmark.
+    os.environ.setdefault("RATE_LIMITS", "off")
+    server = serve_in_thread(faults=Faults(
+        latency=per_service(args.latency, "latency"),
+        tail_rate={"": args.tail_rate},
+        tail_latency={"": args.tail_latency},
+        seed=args.seed,
+    ))
+    try:
+        asyncio.run(main(args.calls, args.warmup, args.k, args.budget, args.concurrency))
+    finally:
+        server.shutdown()
@@ -0,0 +1,150 @@
+"""
+Benchmark and compatibility check for the columnar forecast extraction.
+
+Builds synthetic forecast.json payloads (1 to --max-days days of 24 hourly
+entries), checks that the "csv" output of load_daily_data_forecast,
+load_hourly_data_forecast and load_data_current is byte-identical to the
+original row-by-row implementation (kept below as `legacy_*`), then times both
+over a multi-day hourly forecast and compares the size of the "csv" and
+"compact" encodings. Exits non-zero on any byte difference.
+
+Usage:
+    python benchmarks/forecast_extraction.py --max-days 14
+"""
+import argparse
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from MCPTools.get_weather.aqi import get_air_quality
+from MCPTools.get_weather.getweather import load_daily_data_forecast, load_data_current, load_hourly_data_forecast
+
+CONDITIONS = ["Sunny", "Partly cloudy", "Light rain", "Moderate rain", "Overcast", "Mist"]
+
+
+def legacy_daily(data):
+    """load_daily_data_forecast before the columnar extraction, verbatim."""
+    data = data['forecast']['forecastday']
+    daily_data = ["date, avg_temp_c, max_temp_c, min_temp_c, max_wind_kph, avg_humidity, avg_visibility, daily_chance_of_rain, uv, condition, precipitation_mm, snow_cm, air_quality"]
+    for day in data:
+        day_data = day["day"]
+        daily_data.append(
+            f"{day['date']}, {day_data['avgtemp_c']}, {day_data['maxtemp_c']}, "
+            f"{day_data['mintemp_c']}, {day_data['maxwind_kph']}, "
+            f"{day_data['avghumidity']}, {day_data['avgvis_km']}, "
+            f"{day_data['daily_chance_of_rain']}, {day_data['uv']}, "
+            f"{day_data['condition']['text']}, {day_data['totalprecip_mm']}, "
+            f"{day_data['totalsnow_cm']}, {get_air_quality(day_data)}"
+        )
+    return "\n".join(daily_data)
+
+
+def legacy_hourly(data):
+    """load_hourly_data_forecast before the columnar extraction, verbatim."""
+    data = data['hour']
+    hourly_data = ["date, hour, temp_c, wind_kph, humidity, visibility_km, precipitation_mm, uv, condition, will_it_rain, will_it_snow, snow_cm, air_quality"]
+    for hour in data:
+        hourly_data.append(
+            f"{hour['time'].split(' ')[0]}, {hour['time'].split(' ')[1]}, "
+            f"{hour['temp_c']}, {hour['wind_kph']}, {hour['humidity']}, {hour['vis_km']}, "
+            f"{hour['precip_mm']}, {hour['uv']}, {hour['condition']['text']}, {hour['will_it_rain']}, {hour['will_it_snow']}, "
+            f"{hour['snow_cm']}, {get_air_quality(hour)}"
+        )
+    return "\n".join(hourly_data)
+
+
+def legacy_current(data):
+    """load_data_current before the columnar extraction, verbatim."""
+    data = data['current']
+    header = "last_updated, temp_c, wind_kph, pressure_in, humidity, visibility_km, precipitation_mm, uv, condition, air_quality"
+    return "\n".join([header,
+        f"{data['last_updated'].split(' ')[1]}, {data['temp_c']}, {data['wind_kph']}, {data['pressure_in']}, {data['humidity']}, {data['vis_km']}, {data['precip_mm']}, {data['uv']}, {data['condition']['text']}, {get_air_quality(data)}"
+    ])
+
+
+def air_quality_reading(rng: random.Random) -> dict:
+    return {
+        "co": round(rng.uniform(100, 16000), 3), "no2": round(rng.uniform(0, 220), 3),
+        "o3": round(rng.uniform(0, 200), 3), "so2": round(rng.uniform(0, 400), 3),
+        "pm2_5": round(rng.uniform(0, 90), 3), "pm10": round(rng.uniform(0, 220), 3),
+        "us-epa-index": 2, "gb-defra-index": 3,
+    }
+
+
+def hour_entry(date: str, hour: int, rng: random.Random) -> dict:
+    return {
+        "time_epoch": 1752796800 + hour * 3600, "time": f"{date} {hour:02d}:00",
+        "temp_c": round(rng.uniform(18, 34), 1), "temp_f": 80.1, "is_day": int(6 <= hour < 19),
+        "condition": {"text": rng.choice(CONDITIONS), "icon": "//cdn.weatherapi.com/weather/64x64/day/176.png", "code": 1063},
+        "wind_mph": 9.8, "wind_kph": round(rng.uniform(5, 30), 1), "wind_degree": 248, "wind_dir": "WSW",
+        "pressure_mb": 1004.0, "pressure_in": 29.64, "precip_mm": round(rng.choice([0.0, 0.0, 0.1, 0.4, 1.2]), 2),
+        "precip_in": 0.0, "snow_cm": 0.0, "humidity": rng.randint(60, 95), "cloud": 81, "feelslike_c": 29.4,
+        "will_it_rain": rng.randint(0, 1), "chance_of_rain": 87, "will_it_snow": 0, "chance_of_snow": 0,
+        "vis_km": 10.0, "vis_miles": 6.0, "gust_kph": 24.5, "uv": round(rng.uniform(0, 9), 1),
+        "air_quality": air_quality_reading(rng),
+    }
+
+
+def forecast_payload(days: int, seed: int = 0) -> dict:
+    rng = random.Random(seed)
+    forecastday = []
+    for index in range(days):
+        date = f"2025-07-{18 + index:02d}" if index < 14 else f"2025-08-{index - 13:02d}"
+        forecastday.append({
+            "date": date,
+            "day": {
+                "maxtemp_c": 31.2, "mintemp_c": 22.8, "avgtemp_c": round(rng.uniform(22, 30), 1),
+                "maxwind_kph": 25.9, "totalprecip_mm": 6.3, "totalsnow_cm": 0.0, "avgvis_km": 8.6,
+                "avghumidity": 84, "daily_will_it_rain": 1, "daily_chance_of_rain": 89,
+                "condition": {"text": rng.choice(CONDITIONS)}, "uv": 4.0, "air_quality": air_quality_reading(rng),
+            },
+            "hour": [hour_entry(date, hour, rng) for hour in range(24)],
+        })
+    current = hour_entry(forecastday[0]["date"], 10, rng)
+    current["last_updated"] = current["time"]
+    return {"location": {"name": "Pune"}, "current": current, "forecast": {"forecastday": forecastday}}
+
+
+def check_compatibility(payload: dict) -> int:
+    mismatches = int(legacy_daily(payload) != load_daily_data_forecast(payload))
+    mismatches += int(legacy_current(payload) != load_data_current(payload))
+    for day in payload["forecast"]["forecastday"]:
+        mismatches += int(legacy_hourly(day) != load_hourly_data_forecast(day))
+    return mismatches
+
+
+def main(max_days: int) -> int:
+    payload = forecast_payload(max_days)
+    mismatches = check_compatibility(payload)
+    print(f"compatibility: {max_days} days, {mismatches} csv outputs differ from the legacy bytes")
+
+    print(f"\n{'days':>5} {'hours':>6} {'legacy':>11} {'columnar':>11} {'speedup':>8} {'csv bytes':>10} {'compact':>8}")
+    for days in sorted({1, 3, 7, max_days}):
+        forecastday = payload["forecast"]["forecastday"][:days]
+
+        def run_legacy():
+            for day in forecastday:
+                legacy_hourly(day)
+
+        def run_columnar():
+            for day in forecastday:
+                load_hourly_data_forecast(day)
+
+        number = max(1, 200 // days)
+        legacy = min(timeit.repeat(run_legacy, number=number, repeat=5)) / number
+        columnar = min(timeit.repeat(run_columnar, number=number, repeat=5)) / number
+        csv_size = sum(len(load_hourly_data_forecast(day)) for day in forecastday)
+        compact_size = sum(len(load_hourly_data_forecast(day, "compact")) for day in forecastday)
+        print(f"{days:>5} {days * 24:>6} {legacy * 1e3:>8.2f} ms {columnar * 1e3:>8.2f} ms {legacy / columnar:>7.1f}x "
+              f"{csv_size:>10} {compact_size / csv_size:>7.0%}")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--max-days", type=int, default=14, help="Forecast days in the synthetic payload")
+    args = parser.parse_args()
+    sys.exit(main(args.max_days))
@@ -0,0 +1,94 @@
+"""
+Import-time profile of the MCP server.
+
+Runs `python -X importtime -c "import MCPTools.server"` in a fresh interpreter
+and reports the self and cumulative import time of each module in milliseconds.
+Exits non-zero when the total, or any module given with --module-budget,
+exceeds its budget, so it can run in CI to catch startup regressions.
+
+Usage:
+    python benchmarks/import_profile.py --top 25
+    python benchmarks/import_profile.py --budget-ms 800 --module-budget MCPTools.tools=50
+    python benchmarks/import_profile.py --json import_profile.json
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def profile_imports(target: str, eager: bool = False) -> list[dict]:
+    """
+    Returns:
+        list[dict]: One row per imported module: {"module", "self_ms", "cumulative_ms", "depth"}.
+    """
+    env = dict(os.environ)
+    env["MCPTOOLS_EAGER_LOAD"] = "1" if eager else "0"
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [ROOT_DIR, env.get("PYTHONPATH")]))
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+        cwd=ROOT_DIR, env=env, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"Importing {target} failed:\n{proc.stderr[-2000:]}")
+
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append({
+            "module": name.strip(),
+            "self_ms": int(self_us) / 1000,
+            "cumulative_ms": int(cumulative_us) / 1000,
+            "depth": (len(name) - len(name.lstrip())) // 2,
+        })
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target", default="MCPTools.server", help="Module to import")
+    parser.add_argument("--top", type=int, default=20, help="Show the N slowest modules by cumulative time")
+    parser.add_argument("--eager", action="store_true", help="Profile with MCPTOOLS_EAGER_LOAD=1")
+    parser.add_argument("--budget-ms", type=float, help="Fail if the target's cumulative import time exceeds this")
+    parser.add_argument("--module-budget", action="append", default=[], metavar="MODULE=MS",
+                        help="Fail if MODULE's cumulative import time exceeds MS (repeatable)")
+    parser.add_argument("--json", metavar="PATH", help="Also write the full profile as JSON")
+    args = parser.parse_args()
+
+    rows = profile_imports(args.target, eager=args.eager)
+    by_module = {}
+    for row in rows:
+        # The target can show up twice (as itself and as the -c import); keep the larger.
+        if row["cumulative_ms"] >= by_module.get(row["module"], {}).get("cumulative_ms", -1):
+            by_module[row["module"]] = row
+    total_ms = by_module[args.target]["cumulative_ms"]
+
+    print(f"{'cumulative ms':>14} {'self ms':>9}  module")
+    for row in sorted(rows, key=lambda r: r["cumulative_ms"], reverse=True)[:args.top]:
+        print(f"{row['cumulative_ms']:14.1f} {row['self_ms']:9.1f}  {row['module']}")
+    print(f"\nimport {args.target}: {total_ms:.1f} ms across {len(rows)} modules")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"target": args.target, "total_ms": total_ms, "modules": rows}, f, indent=2)
+
+    failures = []
+    if args.budget_ms is not None and total_ms > args.budget_ms:
+        failures.append(f"{args.target}: {total_ms:.1f} ms > {args.budget_ms:.1f} ms")
+    for budget in args.module_budget:
+        module, limit = budget.rsplit("=", 1)
+        elapsed = by_module.get(module, {}).get("cumulative_ms", 0.0)
+        if elapsed > float(limit):
+            failures.append(f"{module}: {elapsed:.1f} ms > {float(limit):.1f} ms")
+    for failure in failures:
+        print(f"Import budget exceeded - {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+Batched MangaDex lookups (get_manga_info_batch) against an in-process mock of /manga.
+
+The mock answers title searches from a catalogue of --catalogue hits per title
+(with MangaDex's "total", limit and offset) and ids[] lookups by id, after
+--delay seconds per request. The benchmark compares:
+    - --titles titles looked up one get_manga_info_json call at a time, and
+      in one get_manga_info_batch call (MANGADEX_BATCH_CONCURRENCY at once);
+    - --ids MangaDex ids looked up one request each, and in ids[] batches;
+    - paging one title to --max-results hits: requests made, and the time to
+      the first streamed entry against the time to the whole result;
+    - a batch with an unknown id and a title MangaDex rejects: both are
+      reported per query while the rest succeed.
+Runs entirely offline.
+
+Usage:
+    python benchmarks/manga_batch.py --titles 12 --ids 150 --max-results 250 --delay 0.05
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from urllib.parse import parse_qs
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+REQUESTS = {"count": 0}
+
+
+def manga(manga_id: str, title: str) -> dict:
+    return {
+        "id": manga_id, "type": "manga",
+        "attributes": {
+            "title": {"en": title}, "description": {"en": f"{title}, a stand-in for the benchmark."},
+            "status": "ongoing", "year": 2020, "contentRating": "safe", "tags": [], "version": 1,
+        },
+    }
+
+
+def mock_mangadex(delay: float, catalogue: int) -> httpx.MockTransport:
+    async def handler(request: httpx.Request) -> httpx.Response:
+        REQUESTS["count"] += 1
+        await asyncio.sleep(delay)
+        params = parse_qs(request.url.query.decode())
+        limit, offset = int(params["limit"][0]), int(params.get("offset", ["0"])[0])
+        if "ids[]" in params:
+            # Ids ending in "f" do not exist.
+            data = [manga(manga_id, f"Manga {manga_id[:8]}") for manga_id in params["ids[]"] if not manga_id.endswith("f")]
+            return httpx.Response(200, json={"result": "ok", "data": data, "limit": limit, "offset": 0, "total": len(data)})
+        title = params["title"][0]
+        if title == "rejected":
+            return httpx.Response(400, json={"result": "error", "errors": [
+                {"status": 400, "title": "validation_exception", "detail": "Error validating /title: rejected"},
+            ]})
+        data = [
+            manga(f"{hash(title) & 0xffffffff:08x}-0000-4000-8000-{i:012x}", f"{title} {i}")
+            for i in range(offset, min(offset + limit, catalogue))
+        ]
+        return httpx.Response(200, json={"result": "ok", "data": data, "limit": limit, "offset": offset, "total": catalogue})
+
+    return httpx.MockTransport(handler)
+
+
+async def timed(coro) -> tuple:
+    before, start = REQUESTS["count"], time.perf_counter()
+    result = await coro
+    return result, time.perf_counter() - start, REQUESTS["count"] - before
+
+
+def row(label: str, seconds: float, requests: int, note: str = "") -> None:
+    print(f"{label:<40} {seconds:>7.2f} s  {requests:>4} requests  {note}")
+
+
+async def main(titles: int, ids: int, max_results: int, delay: float, catalogue: int) -> int:
+    from MCPTools.loader import registry
+    from MCPTools.loader.http_client import AsyncHTTPClient
+    from MCPTools.tools.manga import get_manga_info_batch, get_manga_info_json, iter_manga_entries
+
+    registry.register("async_http_client", lambda: AsyncHTTPClient(transport=mock_mangadex(delay, catalogue)))
+    names = [f"Title {i}" for i in range(titles)]
+    manga_ids = [f"{i:08x}-0000-4000-8000-000000000000" for i in range(ids)]
+
+    async def one_by_one(queries: list, call) -> list:
+        return [await call(query) for query in queries]
+
+    results, seconds, requests = await timed(one_by_one(names, get_manga_info_json))
+    ok = all("result" in result for result in results)
+    row(f"{titles} titles, one call each", seconds, requests)
+    result, seconds, requests = await timed(get_manga_info_batch(names))
+    ok &= result["succeeded"] == titles
+    row(f"{titles} titles, one batch", seconds, requests)
+
+    results, seconds, requests = await timed(one_by_one(manga_ids, lambda manga_id: get_manga_info_batch([manga_id])))
+    ok &= all(result["succeeded"] == 1 for result in results)
+    row(f"{ids} ids, one request each", seconds, requests)
+    result, seconds, requests = await timed(get_manga_info_batch(manga_ids))
+    ok &= result["succeeded"] == ids and requests == -(-ids // 100)
+    row(f"{ids} ids, ids[] batches of 100", seconds, requests)
+
+    before, start, first, entries = REQUESTS["count"], time.perf_counter(), None, 0
+    async for _, event in iter_manga_entries(["Long Running"], max_results=max_results):
+        if "entry" in event:
+            entries += 1
+            first = first or time.perf_counter() - start
+    seconds, requests = time.perf_counter() - start, REQUESTS["count"] - before
+    ok &= entries == min(max_results, catalogue)
+    row(f"1 title, {max_results} of {catalogue} hits, paged", seconds, requests,
+        f"{entries} entries, first after {first:.2f} s")
+
+    queries = [manga_ids[0], manga_ids[0][:-1] + "f", "rejected", names[0]]
+    result, seconds, requests = await timed(get_manga_info_batch(queries, max_results=3))
+    ok &= result["succeeded"] == 2 and result["failed_queries"] == queries[1:3]
+    row("unknown id + rejected title in a batch", seconds, requests,
+        f"{result['succeeded']} succeeded, {result['failed']} failed")
+    for item in result["results"]:
+        print(f"  {item['query']}: {item.get('error') or str(len(item['entries'])) + ' entries'}")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--titles", type=int, default=12, help="Titles looked up")
+    parser.add_argument("--ids", type=int, default=150, help="MangaDex ids looked up")
+    parser.add_argument("--max-results", type=int, default=250, help="Hits fetched for the paged title")
+    parser.add_argument("--catalogue", type=int, default=1000, help="Hits the mock has per title")
+    parser.add_argument("--delay", type=float, default=0.05, help="Mock latency per request (s)")
+    args = parser.parse_args()
+    for name in ("TAVILY_API_KEY", "FIRECRAWL_SANE_API", "OPENROUTER"):
+        os.environ.setdefault(name, "standin")
+    # The mock enforces no quotas; MangaDex's token bucket would only pace the benchmark.
+    os.environ.setdefault("RATE_LIMITS", "off")
+    sys.exit(asyncio.run(main(args.titles, args.ids, args.max_results, args.delay, args.catalogue)))
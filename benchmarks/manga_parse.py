@@ -0,0 +1,128 @@
+"""
+Parsing of large MangaDex search responses.
+
+Builds a /manga response with --results hits shaped like real ones (the
+bundled fixture's hit, with descriptions in several languages, many alt
+titles and tags) and times turning its JSON body into the tool's output
+lines:
+    - full models: validate every hit into the pydantic Manga models, then
+      format from them (what get_manga_info_json did before);
+    - lean: read only the printed fields from the raw JSON;
+    - lean + validate: the lean path with MANGADEX_VALIDATE on.
+Reports the median time per response after json.loads, the peak memory
+allocated while parsing (tracemalloc), and checks that all paths produce the
+same lines. Then calls get_manga_info_json against the offline stand-in.
+
+Usage:
+    python benchmarks/manga_parse.py --results 100 --repeat 50
+"""
+import argparse
+import asyncio
+import copy
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.standin import serve_in_thread
+
+LANGUAGES = ["en", "ja", "es-la", "pt-br", "fr", "de", "ru", "it", "ko", "zh"]
+
+
+def response_body(results: int) -> bytes:
+    with open(os.path.join(ROOT, "benchmarks", "standin", "fixtures", "mangadex.json"), encoding="utf-8") as f:
+        hit = json.load(f)["entries"][0]["json"]["data"][0]
+    data = []
+    for i in range(results):
+        manga = copy.deepcopy(hit)
+        manga["id"] = f"{i:08x}-0000-4000-8000-000000000000"
+        attributes = manga["attributes"]
+        attributes["title"] = {"en": f"{attributes['title']['en']} {i}"}
+        attributes["description"] = {lang: attributes["description"]["en"] * 4 for lang in LANGUAGES}
+        attributes["altTitles"] = [{lang: f"Title {i} ({lang})"} for lang in LANGUAGES for _ in range(2)]
+        attributes["tags"] = (attributes["tags"] * 6)[:16]
+        attributes["availableTranslatedLanguages"] = LANGUAGES
+        data.append(manga)
+    return json.dumps({"result": "ok", "response": "collection", "data": data, "limit": results, "offset": 0, "total": results}).encode()
+
+
+def model_lines(manga_data: list, tags: bool) -> list:
+    from MCPTools.tools.manga import store_manga_data
+    lines = []
+    for manga in store_manga_data(manga_data):
+        description = manga.attributes.description.get("en", "").replace("\n\n", " ").replace("\n", " ")
+        line = (
+            f"id:{manga.id} title:{manga.attributes.title.get('en', '')},"
+            f"description:{description},"
+            f"status:{manga.attributes.status},year:{manga.attributes.year},"
+            f"contentRating:{manga.attributes.contentRating}"
+        )
+        if tags:
+            line += f",tags:{','.join(tag.attributes.name.get('en', '') for tag in manga.attributes.tags)}"
+        lines.append(line)
+    return lines
+
+
+def measure(parse, body: bytes, repeat: int) -> tuple:
+    """Median ms per response, KiB allocated at peak while parsing, and the output."""
+    timings = []
+    for _ in range(repeat):
+        data = json.loads(body)["data"]
+        start = time.perf_counter()
+        lines = parse(data)
+        timings.append((time.perf_counter() - start) * 1000)
+    data = json.loads(body)["data"]
+    tracemalloc.start()
+    parse(data)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return statistics.median(timings), peak / 1024, lines
+
+
+def main(results: int, repeat: int) -> int:
+    from MCPTools.tools.manga import get_manga_info_json, parse_manga_lines
+
+    body = response_body(results)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        json.loads(body)
+    loads_ms = (time.perf_counter() - start) * 1000 / repeat
+    print(f"{results} hits, {len(body) / 1024:.0f} KiB of JSON; json.loads {loads_ms:.2f} ms (same on every path)\n")
+    print(f"{'':<18} {'tags':<5} {'ms':>8} {'peak KiB':>9}")
+    same = True
+    for tags in (False, True):
+        paths = {
+            "full models": lambda data: model_lines(data, tags),
+            "lean": lambda data: parse_manga_lines(data, tags, validate=False),
+            "lean + validate": lambda data: parse_manga_lines(data, tags, validate=True),
+        }
+        outputs = []
+        for label, parse in paths.items():
+            ms, peak, lines = measure(parse, body, repeat)
+            outputs.append(lines)
+            print(f"{label:<18} {str(tags):<5} {ms:>8.2f} {peak:>9.0f}")
+        same &= all(lines == outputs[0] for lines in outputs)
+    print(f"\nidentical output on every path: {'yes' if same else 'NO'}")
+
+    server = serve_in_thread()
+    try:
+        result = asyncio.run(get_manga_info_json("Chainsaw Man", True))
+    finally:
+        server.shutdown()
+    print(f"get_manga_info_json via the stand-in: {result['result'][:100]}...")
+    return 0 if same else 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--results", type=int, default=100, help="Hits per response")
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+    for name in ("TAVILY_API_KEY", "FIRECRAWL_SANE_API", "OPENROUTER"):
+        os.environ.setdefault(name, "standin")
+    sys.exit(main(args.results, args.repeat))
@@ -0,0 +1,100 @@
+"""
+Per-manga summary cache for get_summarized_manga_info against the offline stand-in.
+
+The stand-in's MangaDex search is widened to --results hits and every
+OpenRouter completion takes --llm-latency seconds. The benchmark calls
+get_summarized_manga_info:
+    - cold: every hit is summarized by the model;
+    - warm: every summary comes from the cache;
+    - after --changed hits get a new MangaDex version: only those are sent;
+    - after a "restart" (cache reopened from disk): still no model calls;
+and reports the latency, the model requests each call made, and the cache's
+hit rate. Then it fills a small cache to show LRU eviction. Runs entirely
+offline.
+
+Usage:
+    python benchmarks/manga_summary_cache.py --results 10 --changed 2 --llm-latency 1.0
+"""
+import argparse
+import asyncio
+import copy
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.standin import Faults, serve_in_thread
+
+
+def widen_search(server, results: int) -> list:
+    """Makes the stand-in's /manga answer `results` distinct hits; returns them (mutable)."""
+    entry = server.store.find("mangadex", "GET", "/manga", {})
+    hits = entry["json"]["data"]
+    entry["json"]["data"] = [copy.deepcopy(hits[i % len(hits)]) for i in range(results)]
+    for i, manga in enumerate(entry["json"]["data"]):
+        manga["id"] = f"{i:08x}-0000-4000-8000-000000000000"
+        # Longer than a summary may be, so the summarization cascade does not pass it through.
+        manga["attributes"]["description"]["en"] = " ".join([manga["attributes"]["description"]["en"]] * 8)
+    return entry["json"]["data"]
+
+
+async def main(server, results: int, changed: int) -> int:
+    from MCPTools.loader import get_manga_summary_cache, registry
+    from MCPTools.loader.summary_cache import SummaryCache
+    from MCPTools.tools.manga import get_summarized_manga_info
+
+    hits = widen_search(server, results)
+
+    async def call(label: str, expected_requests: int) -> bool:
+        before = server.stats.get("openrouter", {}).get("requests", 0)
+        start = time.perf_counter()
+        result = await get_summarized_manga_info("Chainsaw Man")
+        elapsed = time.perf_counter() - start
+        requests = server.stats.get("openrouter", {}).get("requests", 0) - before
+        ok = "summary" in result and result["summary"].count("\n") >= results - 1 and requests == expected_requests
+        print(f"{label:<34} {elapsed:>7.2f} s  {requests:>3} model requests  "
+              f"hit rate {get_manga_summary_cache().stats()['hit_rate']:.2f}{'' if ok else '  UNEXPECTED'}")
+        return ok
+
+    ok = await call("cold", results)
+    ok &= await call("warm", 0)
+    for manga in hits[:changed]:
+        manga["attributes"]["version"] += 1
+        manga["attributes"]["updatedAt"] = "2026-01-01T00:00:00+00:00"
+    ok &= await call(f"{changed} of {results} updated on MangaDex", changed)
+    registry.reset("manga_summary_cache")
+    ok &= await call("after restart", 0)
+    print(f"cache: {get_manga_summary_cache().stats()}")
+
+    cache = SummaryCache(":memory:", max_entries=5)
+    for i in range(8):
+        cache.put((f"id{i}", "2025-01-01", 1), f"summary {i}")
+        cache.get(("id0", "2025-01-01", 1))  # keeps id0 recently used
+    kept = [i for i in range(8) if cache.get((f"id{i}", "2025-01-01", 1)) is not None]
+    print(f"LRU: 8 summaries into a cache of 5, id0 read after each put -> kept {kept}")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--results", type=int, default=10, help="MangaDex hits per search")
+    parser.add_argument("--changed", type=int, default=2, help="Hits given a new version before the third call")
+    parser.add_argument("--llm-latency", type=float, default=1.0, help="Stand-in latency per OpenRouter completion (s)")
+    args = parser.parse_args()
+    for name in ("TAVILY_API_KEY", "FIRECRAWL_SANE_API", "OPENROUTER"):
+        os.environ.setdefault(name, "standin")
+    # The stand-in enforces no quotas; the providers' token buckets would only pace the benchmark.
+    os.environ.setdefault("RATE_LIMITS", "off")
+    # Every summary from the model, to count the requests the cache saves.
+    os.environ.setdefault("SUMMARY_MIN_CONFIDENCE", "1.01")
+    directory = tempfile.mkdtemp(prefix="manga-summaries-")
+    os.environ["MCPTOOLS_DATA_DIR"] = directory
+    server = serve_in_thread(faults=Faults(latency={"openrouter": args.llm_latency, "": 0.05}))
+    try:
+        sys.exit(asyncio.run(main(server, args.results, args.changed)))
+    finally:
+        server.shutdown()
+        shutil.rmtree(directory, ignore_errors=True)
@@ -0,0 +1,104 @@
+"""
+Tool output sizes with and without token-budgeted compaction.
+
+Calls each tool through the MCP server against the offline stand-in twice:
+once with TOOL_OUTPUT_COMPACTION=0 (results sent verbatim, as indented JSON)
+and once with compaction on. Reports the estimated tokens of the text each
+call sends to the client, the tool's budget, whether the result was cut, and
+the time the compaction stage added; then prints the per-tool report from
+get_server_stats. get_project_structure lists this repository. Runs entirely
+offline.
+
+Usage:
+    python benchmarks/output_compaction.py
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.standin import Faults, serve_in_thread
+
+CASES = {
+    "get_weather": {"city": "Pune", "current": True, "forecast": True, "days": 3, "forecast_type": "hourly"},
+    "get_weather_batch": {"cities": "Pune, Mumbai, Delhi, London", "forecast": True, "days": 3},
+    "get_crypto_history": {"symbol": "BTC", "start_date": "2025-01-01", "end_date": "2025-07-10"},
+    "internet_search": {"query": "pune weather", "depth": "advanced"},
+    "google_search": {"query": "pune weather"},
+    "search_firecrawl": {"query": "pune weather"},
+    "federated_search": {"query": "pune weather", "k": 10},
+    "wikipedia_search": {"query": "Pune", "search_limit": "10"},
+    "deep_research": {"query": "pune weather"},
+    "get_summarized_manga_info": {"title": "Chainsaw Man"},
+    "get_project_structure": {},
+    "get_datetime": {},
+}
+
+
+def text_of(result) -> str:
+    content = result[0] if isinstance(result, tuple) else result
+    return "".join(getattr(block, "text", "") for block in content)
+
+
+async def main(repeat: int) -> int:
+    from MCPTools.loader import get_compaction_stats
+    from MCPTools.loader.compaction import budget_for, estimate_tokens
+    from MCPTools.server import mcp
+
+    print(f"{'tool':<26} {'budget':>7} {'verbatim':>9} {'compact':>8} {'saved':>7} {'cut':>4} {'+ms':>6}")
+    failed = False
+    for tool, arguments in CASES.items():
+        os.environ["TOOL_OUTPUT_COMPACTION"] = "0"
+        verbatim = text_of(await mcp.call_tool(tool, arguments))
+        os.environ["TOOL_OUTPUT_COMPACTION"] = "1"
+        start = time.perf_counter()
+        for _ in range(repeat):
+            compact = text_of(await mcp.call_tool(tool, arguments))
+        compacted_ms = (time.perf_counter() - start) * 1000 / repeat
+        os.environ["TOOL_OUTPUT_COMPACTION"] = "0"
+        start = time.perf_counter()
+        for _ in range(repeat):
+            await mcp.call_tool(tool, arguments)
+        verbatim_ms = (time.perf_counter() - start) * 1000 / repeat
+
+        registered = mcp._tool_manager.get_tool(tool).fn
+        budget = budget_for(tool, getattr(sys.modules[registered.__module__], tool))
+        before, after = estimate_tokens(verbatim), estimate_tokens(compact)
+        cut = "_truncated" in compact or "\n[truncated:" in compact
+        # Every budget should hold (with some slack for the truncation note) and JSON must stay valid.
+        if budget and budget.tokens and after > budget.tokens * 1.1:
+            print(f"  {tool}: {after} tokens over its budget of {budget.tokens}")
+            failed = True
+        if compact.startswith(("{", "[")):
+            json.loads(compact)
+        print(f"{tool:<26} {budget.tokens if budget and budget.tokens else '-':>7} {before:>9} {after:>8} "
+              f"{before - after:>7} {'yes' if cut else '':>4} {compacted_ms - verbatim_ms:>6.1f}")
+
+    print("\nget_server_stats()['output_compaction'] (compacted calls only):")
+    for tool, counters in get_compaction_stats().stats().items():
+        print(f"  {tool:<26} {counters}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5, help="Calls per tool and mode for the timing")
+    args = parser.parse_args()
+    for name in ("TAVILY_API_KEY", "FIRECRAWL_SANE_API", "OPENROUTER", "WEATHER_API_KEY", "ALPHAVANTAGE_API"):
+        os.environ.setdefault(name, "standin")
+    # The stand-in enforces no quotas; the providers' token buckets would only pace the benchmark.
+    os.environ.setdefault("RATE_LIMITS", "off")
+    os.environ.setdefault("DEEP_RESEARCH_POLL_SECONDS", "0.05")
+    os.environ["MCPTOOLS_DATA_DIR"] = tempfile.mkdtemp(prefix="mcptools-bench-")
+    os.chdir(ROOT)
+    server = serve_in_thread(faults=Faults(latency={"": 0.0}))
+    try:
+        sys.exit(asyncio.run(main(args.repeat)))
+    finally:
+        server.shutdown()
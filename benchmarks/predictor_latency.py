@@ -0,0 +1,105 @@
+"""
+Single-row latency and cold-start benchmark for the fused price predictor.
+
+Compares, per prediction of one Open/High/Low row:
+    legacy     the original get_bitcoin_price path (DataFrame + three sklearn calls)
+    pipeline   PricePipeline (NumPy scalers, one VotingRegressor.predict)
+    fused      FusedPricePredictor (scalers folded in, trees walked as flat arrays)
+and the time to get a ready predictor: compiling from the .joblib files versus
+loading the cached .npz (which does not import sklearn; measured in a fresh
+interpreter). Checks the fused predictor against sklearn on --check-rows rows.
+
+Usage:
+    python benchmarks/predictor_latency.py --calls 2000
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+import warnings
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from MCPTools.loader import get_feature_scaler, get_model, get_target_scaler
+from MCPTools.loader.predictor import (
+    COMPILED_FILE, PricePipeline, check_equivalence, compile_price_predictor, load_price_predictor, probe_features,
+)
+from price_throughput import legacy_predict
+
+MODELS_DIR = os.path.join(ROOT, "MCPTools", "loader", "ML-models")
+
+COLD_LOAD = """
+import sys, time
+from MCPTools.loader.predictor import load_price_predictor
+start = time.perf_counter()
+predictor = load_price_predictor(sys.argv[1])
+print((time.perf_counter() - start) * 1000, "sklearn" in sys.modules)
+"""
+
+
+def latencies(fn, calls: int) -> np.ndarray:
+    """Per-call wall time in microseconds."""
+    times = np.empty(calls)
+    for i in range(calls):
+        start = time.perf_counter()
+        fn()
+        times[i] = time.perf_counter() - start
+    return times * 1e6
+
+
+def main(calls: int, check_rows: int, seed: int) -> int:
+    feature_scaler, model, target_scaler = get_feature_scaler(), get_model(), get_target_scaler()
+    pipeline = PricePipeline(feature_scaler, model, target_scaler)
+
+    start = time.perf_counter()
+    fused = compile_price_predictor(feature_scaler, model, target_scaler)
+    compile_ms = (time.perf_counter() - start) * 1000
+
+    features = probe_features(feature_scaler, check_rows, seed=seed)
+    try:
+        error = check_equivalence(fused, pipeline, features)
+        failed = 0
+    except AssertionError as e:
+        print(f"equivalence: FAILED - {e}")
+        error, failed = float("nan"), 1
+    single = max(abs(fused.predict(row[None])[0] - pipeline.predict(row[None])[0]) for row in features[:200])
+    print(f"equivalence: {check_rows} rows, max difference {error:.1e} of the target scale "
+          f"(single rows: {single / pipeline.target_scale:.1e})")
+
+    row = features[:1]
+    request = {"Open": row[0, 0], "High": row[0, 1], "Low": row[0, 2]}
+    paths = {
+        "legacy": (lambda: legacy_predict(request), max(calls // 10, 20)),
+        "pipeline": (lambda: pipeline.predict(row), calls),
+        "fused": (lambda: fused.predict(row), calls),
+    }
+    print(f"\n{'single row':<10} {'p50 us':>10} {'p95 us':>10} {'vs legacy':>10}")
+    legacy_p50 = None
+    for name, (fn, n) in paths.items():
+        fn()
+        times = latencies(fn, n)
+        p50, p95 = np.percentile(times, [50, 95])
+        legacy_p50 = legacy_p50 or p50
+        print(f"{name:<10} {p50:>10.1f} {p95:>10.1f} {legacy_p50 / p50:>9.1f}x")
+
+    load_price_predictor(MODELS_DIR, lambda: feature_scaler, lambda: model, lambda: target_scaler)
+    result = subprocess.run([sys.executable, "-c", COLD_LOAD, MODELS_DIR], cwd=ROOT,
+                            capture_output=True, text=True, check=True)
+    cached_ms, imported_sklearn = result.stdout.split()
+    print(f"\nready predictor: compile {compile_ms:.1f} ms (sklearn objects already loaded), "
+          f"fresh process from {COMPILED_FILE} {float(cached_ms):.1f} ms (sklearn imported: {imported_sklearn})")
+    return failed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=2000, help="Timed single-row calls (legacy gets a tenth)")
+    parser.add_argument("--check-rows", type=int, default=100000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    warnings.simplefilter("ignore", UserWarning)  # sklearn feature-name warnings on the legacy path
+    sys.exit(main(args.calls, args.check_rows, args.seed))
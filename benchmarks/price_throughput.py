@@ -0,0 +1,98 @@
+"""
+Throughput benchmark for batched closing-price inference.
+
+Compares the original get_bitcoin_price path (one-row DataFrame, sklearn
+feature scaler, model, target scaler per request; kept below as
+`legacy_predict`) with the predictor the price tools use (get_price_pipeline:
+the fused predictor for small batches, sklearn's PricePipeline for large ones)
+and with PricePipeline alone, on one array, for batch sizes 1 to 100k. Checks
+that single rows and a whole batch match the legacy path to within 1e-12
+relative error (the fused predictor and the linear member's matrix product may
+round the last bit differently). The legacy path is timed on --legacy-rows rows.
+
+Usage:
+    python benchmarks/price_throughput.py --max-batch 100000
+"""
+import argparse
+import os
+import sys
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from MCPTools.loader import get_feature_scaler, get_model, get_price_pipeline, get_target_scaler
+from MCPTools.loader.predictor import PricePipeline
+
+TOLERANCE = 1e-12
+
+
+def legacy_predict(request: dict) -> float:
+    """get_bitcoin_price's prediction before batching, verbatim."""
+    features = pd.DataFrame({
+        'Open': [float(request['Open'])],
+        'High': [float(request['High'])],
+        'Low': [float(request['Low'])],
+    })
+    features = get_feature_scaler().transform(features)
+    target = get_model().predict(features).reshape(-1, 1)
+    return get_target_scaler().inverse_transform(target).item()
+
+
+def sample_features(n: int, rng: np.random.Generator) -> np.ndarray:
+    open_ = rng.uniform(1000, 120000, n)
+    high = open_ * (1 + rng.uniform(0, 0.05, n))
+    low = open_ * (1 - rng.uniform(0, 0.05, n))
+    return np.column_stack([open_, high, low])
+
+
+def throughput(fn, n: int, min_time: float = 0.2) -> float:
+    """Predictions per second, repeating fn until min_time has passed."""
+    runs, start = 0, time.perf_counter()
+    while True:
+        fn()
+        runs += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            return runs * n / elapsed
+
+
+def main(max_batch: int, legacy_rows: int, seed: int) -> int:
+    rng = np.random.default_rng(seed)
+    predictor = get_price_pipeline()
+    pipeline = PricePipeline(get_feature_scaler(), get_model(), get_target_scaler())
+
+    check = sample_features(200, rng)
+    legacy = np.array([legacy_predict({"Open": o, "High": h, "Low": l}) for o, h, l in check])
+    single = np.abs(np.array([predictor.predict(row[None])[0] for row in check]) - legacy) / np.abs(legacy)
+    batch = np.abs(predictor.predict(check) - legacy) / np.abs(legacy)
+    mismatches = int(np.count_nonzero(single > TOLERANCE)) + int(np.max(batch) > TOLERANCE)
+    print(f"equivalence ({type(predictor).__name__}): {len(check)} rows, max relative error "
+          f"{np.max(single):.1e} single rows, {np.max(batch):.1e} batch (tolerance {TOLERANCE:.0e})")
+
+    legacy_rows_data = [{"Open": o, "High": h, "Low": l} for o, h, l in sample_features(legacy_rows, rng)]
+    legacy_rate = throughput(lambda: [legacy_predict(row) for row in legacy_rows_data], legacy_rows)
+    print(f"\nlegacy, one request per row: {legacy_rate:,.0f} predictions/s")
+
+    print(f"\n{'batch':>8} {'predictions/s':>15} {'ms/batch':>10} {'vs legacy':>10} {'PricePipeline/s':>16}")
+    size = 1
+    while size <= max_batch:
+        features = sample_features(size, rng)
+        rate = throughput(lambda: predictor.predict(features), size)
+        pipeline_rate = throughput(lambda: pipeline.predict(features), size)
+        print(f"{size:>8} {rate:>15,.0f} {size / rate * 1000:>10.3f} {rate / legacy_rate:>9.1f}x {pipeline_rate:>16,.0f}")
+        size *= 10
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--max-batch", type=int, default=100000)
+    parser.add_argument("--legacy-rows", type=int, default=200, help="Rows timed on the legacy path")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    warnings.simplefilter("ignore", UserWarning)  # sklearn feature-name warnings on the legacy path
+    sys.exit(main(args.max_batch, args.legacy_rows, args.seed))
@@ -0,0 +1,129 @@
+"""
+get_project_structure on a large synthetic repository: unbounded os.walk vs the cached traversal.
+
+Builds a temporary repository of --dirs source directories with --files files
+each, plus a .git directory and a virtualenv of --venv-files files (both
+ignored, as is a "build/" directory named in its .gitignore), and runs the
+server from it. The benchmark times:
+    - the previous implementation, an os.walk of everything;
+    - the first call (a scandir traversal, ignored directories skipped);
+    - repeated calls on the unchanged tree (one stat per directory);
+    - a call after a file is added to one directory (only that one is re-read);
+    - reading the whole listing page by page with the cursor;
+and checks the added file shows up and no ignored path does. Runs entirely
+offline.
+
+Usage:
+    python benchmarks/project_structure.py --dirs 400 --files 40 --venv-files 20000
+"""
+import argparse
+import asyncio
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# An untouched checkout: older than the traversal's mtime granularity.
+OLD = time.time() - 60
+
+
+def build_repository(root: str, dirs: int, files: int, venv_files: int) -> None:
+    with open(os.path.join(root, ".gitignore"), "w") as f:
+        f.write("build/\n*.log\n")
+    layout = [(f"src/pkg{i // 20}/mod{i}", files) for i in range(dirs)]
+    layout += [(f".git/objects/{i:02x}", 50) for i in range(64)]
+    layout += [(f".venv/lib/site-packages/dist{i}", 100) for i in range(venv_files // 100)]
+    layout += [("build/lib", 200)]
+    for directory, count in layout:
+        os.makedirs(os.path.join(root, directory), exist_ok=True)
+        for j in range(count):
+            open(os.path.join(root, directory, f"file{j}.py"), "w").close()
+        open(os.path.join(root, directory, "debug.log"), "w").close()
+    for path, _, _ in os.walk(root):
+        os.utime(path, (OLD, OLD))
+
+
+def os_walk_structure() -> dict:
+    """The previous get_project_structure."""
+    project_structure = {}
+    for root, dirs, files in os.walk("."):
+        for name in files:
+            project_structure.setdefault(root, {})[name] = "File"
+        for name in dirs:
+            project_structure.setdefault(root, {})[name] = "Directory"
+    return project_structure
+
+
+async def timed(coro) -> tuple:
+    start = time.perf_counter()
+    result = await coro
+    return result, (time.perf_counter() - start) * 1000
+
+
+async def main(repeat: int) -> int:
+    from MCPTools.loader import get_project_tree
+    from MCPTools.tools.utils import get_project_structure
+
+    start = time.perf_counter()
+    walked = os_walk_structure()
+    walk_ms = (time.perf_counter() - start) * 1000
+    print(f"{'os.walk (previous)':<34} {walk_ms:>9.1f} ms  {sum(map(len, walked.values())):>7} entries")
+
+    first, cold_ms = await timed(get_project_structure(".", 16, 1))
+    print(f"{'first call':<34} {cold_ms:>9.1f} ms  {first['total_entries']:>7} entries")
+    warm = [(await timed(get_project_structure(".", 16, 1)))[1] for _ in range(repeat)]
+    print(f"{'unchanged tree (p50)':<34} {statistics.median(warm):>9.1f} ms")
+
+    open(os.path.join("src", "pkg3", "mod60", "added.py"), "w").close()
+    before = get_project_tree().stats()
+    changed, changed_ms = await timed(get_project_structure(".", 16, 1))
+    after = get_project_tree().stats()
+    print(f"{'after adding one file':<34} {changed_ms:>9.1f} ms  {after['dirs_listed'] - before['dirs_listed']} "
+          f"directories re-read, {after['dirs_reused'] - before['dirs_reused']} reused")
+
+    paths, cursor, pages, start = [], "", 0, time.perf_counter()
+    while True:
+        page = await get_project_structure(".", 16, 150, cursor)
+        pages += 1
+        paths += [f"{folder}/{name}" for folder, names in page["structure"].items() for name in names]
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+    paged_ms = (time.perf_counter() - start) * 1000
+    print(f"{f'all {pages} pages of 150':<34} {paged_ms:>9.1f} ms  {len(paths):>7} entries")
+
+    ignored = [
+        path for path in paths
+        if {".git", ".venv", "build"} & set(path.split("/")) or path.endswith(".log")
+    ]
+    ok = (
+        "./src/pkg3/mod60/added.py" in paths and not ignored
+        and len(paths) == len(set(paths)) == changed["total_entries"]
+        and statistics.median(warm) < cold_ms
+    )
+    print(f"get_server_stats project_tree: {get_project_tree().stats()}")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dirs", type=int, default=400, help="Source directories")
+    parser.add_argument("--files", type=int, default=40, help="Files per source directory")
+    parser.add_argument("--venv-files", type=int, default=20000, help="Files in the ignored virtualenv")
+    parser.add_argument("--repeat", type=int, default=20, help="Calls on the unchanged tree")
+    args = parser.parse_args()
+    for name in ("TAVILY_API_KEY", "FIRECRAWL_SANE_API", "OPENROUTER"):
+        os.environ.setdefault(name, "standin")
+    directory = tempfile.mkdtemp(prefix="project-structure-")
+    cwd = os.getcwd()
+    try:
+        build_repository(directory, args.dirs, args.files, args.venv_files)
+        os.chdir(directory)
+        sys.exit(asyncio.run(main(args.repeat)))
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(directory, ignore_errors=True)
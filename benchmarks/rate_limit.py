@@ -0,0 +1,104 @@
+"""
+Per-provider rate limiting against a quota-enforcing stand-in.
+
+The stand-in accepts --quota requests per second for Google Custom Search and
+answers the rest with 429 and Retry-After. --calls concurrent searches are sent
+through the shared async HTTP client:
+    - without a limiter (what the tools did before);
+    - with retries only (429s are retried after Retry-After / backoff);
+    - with a token bucket at the quota, plus retries.
+For each it reports the calls that succeeded, the upstream requests and 429s
+they cost, the sustained rate and the limiter's queue and throttle counters.
+Then it injects 5xx errors into WeatherAPI (--error-rate) to show the jittered
+backoff, and calls google_search while the quota is exhausted to check it
+reports an error instead of raising KeyError. Runs entirely offline.
+
+Usage:
+    python benchmarks/rate_limit.py --calls 60 --quota 10
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.standin import Faults, serve_in_thread
+
+
+async def burst(client, url: str, calls: int, method: str = "GET", **kwargs) -> tuple[int, int, float]:
+    """Successful calls, failed calls and elapsed seconds."""
+    from MCPTools.loader.rate_limit import RateLimitExceeded
+
+    async def one():
+        try:
+            return (await client.request(method, url, **kwargs)).status_code == 200
+        except RateLimitExceeded:
+            return False
+
+    start = time.perf_counter()
+    ok = sum(await asyncio.gather(*(one() for _ in range(calls))))
+    return ok, calls - ok, time.perf_counter() - start
+
+
+async def main(server, calls: int, quota: float, error_rate: float) -> int:
+    from MCPTools.loader import upstream_url
+    from MCPTools.loader.http_client import AsyncHTTPClient
+    from MCPTools.loader.rate_limit import RateLimiter
+
+    url = upstream_url("google", "/customsearch/v1") + "?key=standin&cx=standin&q=pune+weather"
+    scenarios = {
+        "no limiter": None,
+        "retries only": RateLimiter(limits={}, retries=10, deadline=30),
+        f"bucket {quota:g}/1 + retries": RateLimiter(limits={"google": f"{quota:g}/1"}, retries=10, deadline=30),
+    }
+    print(f"{calls} concurrent Google searches, stand-in quota {quota:g}/s\n")
+    print(f"{'':<24} {'ok':>4} {'failed':>7} {'upstream':>9} {'429s':>5} {'seconds':>8} {'ok/s':>6}")
+    failed = False
+    for label, limiter in scenarios.items():
+        client = AsyncHTTPClient(limiter=limiter)
+        before = dict(server.stats.get("google", {}))
+        await asyncio.sleep(1.5)  # let the stand-in's quota refill
+        ok, errors, elapsed = await burst(client, url, calls)
+        after = server.stats["google"]
+        print(f"{label:<24} {ok:>4} {errors:>7} {after['requests'] - before.get('requests', 0):>9} "
+              f"{after.get('over_quota', 0) - before.get('over_quota', 0):>5} {elapsed:>8.2f} {ok / elapsed:>6.1f}")
+        if limiter is not None:
+            print(f"{'':<24} {limiter.stats()['google']}")
+            failed |= errors > 0
+        await client.aclose()
+
+    server.faults.error_rate["weatherapi"] = error_rate
+    limiter = RateLimiter(limits={}, retries=4, backoff=0.05)
+    client = AsyncHTTPClient(limiter=limiter)
+    ok, errors, elapsed = await burst(client, upstream_url("weatherapi", "/v1/current.json") + "?q=Pune", calls, "POST",
+                                     idempotent=True)  # as tools/weather.py sends it
+    print(f"\nWeatherAPI with {error_rate:.0%} injected 503s, 4 retries: {ok}/{calls} ok in {elapsed:.2f} s; "
+          f"{limiter.stats()['weatherapi']}")
+    await client.aclose()
+
+    os.environ["RATE_LIMIT_GOOGLE"] = "off"
+    from MCPTools.tools.web_search import google_search
+    await asyncio.sleep(1.5)
+    results = await asyncio.gather(*(google_search("pune weather") for _ in range(int(quota) * 2)))
+    errors = [result["error"] for result in results if "error" in result]
+    print(f"\n{len(results)} concurrent google_search calls without limiter or retries: "
+          f"{len(results) - len(errors)} results, {len(errors)} errors, e.g. {errors[:1]}")
+    return 1 if failed or not errors else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=60)
+    parser.add_argument("--quota", type=float, default=10, help="Google requests per second the stand-in accepts")
+    parser.add_argument("--error-rate", type=float, default=0.3, help="Fraction of WeatherAPI requests that get a 503")
+    args = parser.parse_args()
+    for name in ("TAVILY_API_KEY", "FIRECRAWL_SANE_API", "OPENROUTER"):
+        os.environ.setdefault(name, "standin")
+    os.environ["RATE_LIMIT_RETRIES"] = "0"
+    server = serve_in_thread(faults=Faults(latency={"": 0.02}, quota={"google": args.quota}, seed=0))
+    try:
+        sys.exit(asyncio.run(main(server, args.calls, args.quota, args.error_rate)))
+    finally:
+        server.shutdown()
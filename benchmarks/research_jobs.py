@@ -0,0 +1,136 @@
+"""
+Background deep research jobs against the offline stand-in.
+
+Every Firecrawl request to the stand-in takes --latency seconds. The benchmark:
+    - times the blocking deep_research tool;
+    - starts --jobs start_deep_research jobs at once and, while they run, calls
+      get_datetime and wikipedia_search in a loop: reports how long starting a
+      job took, the latency of those other calls, and the time until every job
+      had its result (checking it matches the blocking tool's analysis);
+    - runs a second job runner on the same table (another server process) while
+      a job is running and checks it leaves that job to its owner;
+    - "restarts" the server in the middle of a job (stops the job runner and
+      drops it) and checks that the job is resumed from the job table once its
+      lease lapses, without starting the research again;
+    - fills a small job table to show eviction of the oldest finished jobs.
+Runs entirely offline.
+
+Usage:
+    python benchmarks/research_jobs.py --jobs 20 --latency 1.0
+"""
+import argparse
+import asyncio
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.standin import Faults, serve_in_thread
+
+QUERY = "pune weather"
+
+
+async def wait_for(job_ids: list[str], timeout: float) -> dict[str, dict]:
+    from MCPTools.tools.web_search import get_research_result
+    deadline = time.perf_counter() + timeout
+    results = {}
+    while len(results) < len(job_ids) and time.perf_counter() < deadline:
+        for job_id in job_ids:
+            if job_id not in results:
+                result = await get_research_result(job_id)
+                if "status" not in result:
+                    results[job_id] = result
+        await asyncio.sleep(0.05)
+    return results
+
+
+async def main(server, jobs: int, latency: float) -> int:
+    from MCPTools.loader import get_job_runner, registry
+    from MCPTools.loader.jobs import JobRunner, JobTable
+    from MCPTools.tools.utils import get_datetime
+    from MCPTools.tools.web_search import deep_research, get_research_status, start_deep_research
+    from MCPTools.tools.wiki import wikipedia_search
+
+    start = time.perf_counter()
+    expected = await deep_research(QUERY)
+    print(f"blocking deep_research: {time.perf_counter() - start:.2f} s (the MCP request is held open throughout)")
+
+    start = time.perf_counter()
+    started = [await start_deep_research(QUERY) for _ in range(jobs)]
+    start_ms = (time.perf_counter() - start) * 1000 / jobs
+    job_ids = [job["job_id"] for job in started]
+    waiting = asyncio.ensure_future(wait_for(job_ids, timeout=60 + 10 * latency))
+    other = []
+    while not waiting.done():
+        begin = time.perf_counter()
+        get_datetime()
+        await wikipedia_search("Pune", 2)
+        other.append((time.perf_counter() - begin) * 1000)
+    results = await waiting
+    elapsed = time.perf_counter() - start
+    same = len(results) == jobs and all(result == expected for result in results.values())
+    print(f"{jobs} background jobs: start_deep_research {start_ms:.2f} ms per call, all results after {elapsed:.2f} s; "
+          f"{len(other)} other tool calls meanwhile, p50 {statistics.median(other):.1f} ms, max {max(other):.1f} ms")
+    print(f"results identical to deep_research: {'yes' if same else 'NO'}")
+
+    # A second server process on the same table, with the same lease, must leave a running job to its owner.
+    job_id = (await start_deep_research(QUERY))["job_id"]
+    runner = get_job_runner()
+    other = JobRunner(JobTable(os.environ["JOBS_PATH"]), lease=runner.lease, owner=os.getpid() + 1)
+    taken = []
+    other.register("deep_research", lambda job, update: taken.append(job["id"]) or asyncio.sleep(0))
+    await wait_for([job_id], timeout=30 + 5 * latency)
+    other.stop()
+    print(f"second process: took over {len(taken)} job(s) held by a live owner")
+    same &= not taken
+
+    # Restart while a job is polling Firecrawl.
+    job_id = (await start_deep_research(QUERY))["job_id"]
+    while not runner.table.get(job_id)["upstream_id"]:
+        await asyncio.sleep(0.01)
+    runner.stop()
+    await asyncio.sleep(0)
+    registry.reset("job_runner")
+    before = server.stats["firecrawl"]["requests"]
+    status = await get_research_status(job_id)  # new runner: resumes the job
+    resumed = await wait_for([job_id], timeout=30 + 5 * latency)
+    requests = server.stats["firecrawl"]["requests"] - before
+    ok = resumed.get(job_id) == expected
+    print(f"restart: job was {status['status']!r} after restart, then {'completed' if ok else 'NOT completed'} "
+          f"with {requests} Firecrawl request(s) (status polls only)")
+    same &= ok
+
+    table = JobTable(":memory:", max_jobs=5)
+    for i in range(8):
+        job = table.create("deep_research", {"query": f"q{i}"})
+        table.update(job["id"], status="completed", result={"finalAnalysis": ""})
+    print(f"eviction: 8 finished jobs in a table of 5 -> {table.stats()}")
+    print(f"job stats: {get_job_runner().stats()}")
+    return 0 if same else 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jobs", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=1.0, help="Stand-in latency per Firecrawl request (s)")
+    args = parser.parse_args()
+    for name in ("TAVILY_API_KEY", "FIRECRAWL_SANE_API", "OPENROUTER"):
+        os.environ.setdefault(name, "standin")
+    directory = tempfile.mkdtemp(prefix="research-jobs-")
+    os.environ["JOBS_PATH"] = os.path.join(directory, "jobs.sqlite3")
+    os.environ.setdefault("DEEP_RESEARCH_POLL_SECONDS", "0.2")
+    # Short, so the "restarted" runner resumes the interrupted job within the benchmark.
+    os.environ.setdefault("JOBS_LEASE_SECONDS", "1")
+    server = serve_in_thread(faults=Faults(latency={"firecrawl": args.latency, "": 0.05}))
+    # Firecrawl on a host of its own, as in production: its slow requests must not hold the
+    # connections the other tools' stand-ins (all on 127.0.0.1) share.
+    os.environ["MCPTOOLS_UPSTREAM_FIRECRAWL"] = server.url.replace("127.0.0.1", "localhost") + "/firecrawl"
+    try:
+        sys.exit(asyncio.run(main(server, args.jobs, args.latency)))
+    finally:
+        server.shutdown()
+        shutil.rmtree(directory, ignore_errors=True)
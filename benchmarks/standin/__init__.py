@@ -0,0 +1,4 @@
+"""
+Offline record/replay stand-in for the upstream APIs used by MCPTools (see server.py).
+"""
+from .server import Faults, FixtureStore, StandinServer, make_server, request_fields, serve_in_thread
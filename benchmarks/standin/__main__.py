@@ -0,0 +1,88 @@
+"""
+Runs the stand-in server.
+
+Usage (from the repository root):
+    # Replay the bundled fixtures with 150 ms latency (400 ms for WeatherAPI) and 5% 503s
+    python -m benchmarks.standin --latency 0.15 --latency weatherapi=0.4 --error-rate 0.05
+
+    # Record real responses into a fixture directory (the real API keys are
+    # forwarded upstream but never written to the fixtures)
+    python -m benchmarks.standin --record --fixtures /tmp/recorded
+
+    # Point the server (or a benchmark) at it
+    MCPTOOLS_STANDIN_URL=http://127.0.0.1:8765 python ServerSideMCP.py
+"""
+import argparse
+import logging
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from benchmarks.standin.server import FIXTURES_DIR, Faults, make_server
+
+
+def per_service(values: list[str], name: str) -> dict[str, float]:
+    """
+    Parses repeated "SECONDS" / "SERVICE=SECONDS" options into {"": default, service: value}.
+    """
+    parsed = {}
+    for value in values:
+        service, _, number = value.rpartition("=")
+        try:
+            parsed[service] = float(number)
+        except ValueError:
+            raise SystemExit(f"--{name}: expected NUMBER or SERVICE=NUMBER, got {value!r}")
+    return parsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--fixtures", default=FIXTURES_DIR, help="Fixture directory (default: bundled fixtures)")
+    parser.add_argument("--record", action="store_true", help="Forward to the real upstreams and record responses")
+    parser.add_argument("--latency", action="append", default=[], metavar="[SERVICE=]SECONDS",
+                        help="Added latency, globally or for one service (repeatable)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Relative latency jitter, e.g. 0.2 for +/-20%%")
+    parser.add_argument("--tail-rate", action="append", default=[], metavar="[SERVICE=]RATE",
+                        help="Fraction of requests that are slow outliers (repeatable)")
+    parser.add_argument("--tail-latency", action="append", default=[], metavar="[SERVICE=]SECONDS",
+                        help="Extra latency of the slow outliers (repeatable)")
+    parser.add_argument("--error-rate", action="append", default=[], metavar="[SERVICE=]RATE",
+                        help="Fraction of requests answered with --error-status (repeatable)")
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument("--retry-after", type=float, default=None, help="Retry-After seconds on injected errors")
+    parser.add_argument("--quota", action="append", default=[], metavar="[SERVICE=]RPS",
+                        help="Requests per second accepted; the rest get 429 with Retry-After (repeatable)")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for jitter and error injection")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Log every request")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.INFO, format="%(asctime)s %(message)s")
+    faults = Faults(
+        latency=per_service(args.latency, "latency"),
+        jitter=args.jitter,
+        error_rate=per_service(args.error_rate, "error-rate"),
+        error_status=args.error_status,
+        retry_after=args.retry_after,
+        seed=args.seed,
+        tail_rate=per_service(args.tail_rate, "tail-rate"),
+        tail_latency=per_service(args.tail_latency, "tail-latency"),
+        quota=per_service(args.quota, "quota"),
+    )
+    server = make_server(args.host, args.port, args.fixtures, faults, record=args.record)
+    mode = "recording into" if args.record else "replaying"
+    logging.info("Stand-in server on %s, %s %s (%s)", server.url, mode, args.fixtures,
+                 ", ".join(f"{service}: {count}" for service, count in server.store.services().items()) or "no fixtures")
+    logging.info("Use MCPTOOLS_STANDIN_URL=%s", server.url)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
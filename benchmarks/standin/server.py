@@ -0,0 +1,361 @@
+"""
+Offline stand-in for the upstream APIs used by MCPTools.
+
+Requests arrive as /<service>/<upstream path>, the layout produced by
+MCPTOOLS_STANDIN_URL (see MCPTools/loader/upstreams.py), e.g.
+POST /weatherapi/v1/current.json?q=Pune. In "replay" mode they are answered
+from fixture files; in "record" mode they are forwarded to the real upstream
+and the responses are appended to the fixture files.
+
+Fixture files are JSON, one per service (<fixtures>/<service>.json):
+
+    {"service": "weatherapi", "entries": [
+        {"method": "POST", "path": "/v1/current.json", "match": {"q": "pune"},
+         "status": 200, "headers": {"Retry-After": "1"}, "json": {...}}
+    ]}
+
+`path` may use fnmatch wildcards ("/v1/deep-research/*"). `match` lists query
+or top-level JSON body fields that must equal the request's (compared as
+case-insensitive strings); when several entries fit, the one with the most
+`match` fields wins, so an entry without `match` is the default for its path.
+The body is given as `json` or `text` (with an optional Content-Type header).
+Credentials (key, apikey, api_key, cx, Authorization...) are never recorded.
+
+Latency (with an optional slow tail), errors and a requests-per-second quota
+(answered with 429 and Retry-After) can be injected globally or per service,
+and GET /_standin/stats returns request counters.
+"""
+import fnmatch
+import json
+import logging
+import os
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+import httpx
+
+from MCPTools.loader.upstreams import UPSTREAMS
+
+logger = logging.getLogger(__name__)
+# httpx logs request URLs at INFO, and recording forwards the real API keys in them.
+logging.getLogger("httpx").setLevel(logging.WARNING)
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+# Request fields that carry credentials; never written to fixtures or used for matching.
+SECRET_FIELDS = {"key", "apikey", "api_key", "cx", "token", "access_token", "authorization"}
+_HOP_BY_HOP = {"host", "connection", "content-length", "transfer-encoding", "accept-encoding", "keep-alive"}
+
+
+def _scalar(value: Any) -> Optional[str]:
+    if isinstance(value, bool):
+        return str(value).lower()
+    if isinstance(value, (str, int, float)):
+        return str(value)
+    return None
+
+
+def request_fields(query: str, body: bytes) -> Dict[str, str]:
+    """
+    Query parameters plus scalar top-level JSON body fields, lower-cased, without credentials.
+    """
+    fields = {name: value for name, value in parse_qsl(query, keep_blank_values=True)}
+    if body:
+        try:
+            payload = json.loads(body)
+        except ValueError:
+            payload = None
+        if isinstance(payload, dict):
+            for name, value in payload.items():
+                value = _scalar(value)
+                if value is not None:
+                    fields.setdefault(name, value)
+    return {name: value.casefold() for name, value in fields.items() if name.lower() not in SECRET_FIELDS}
+
+
+class FixtureStore:
+    """
+    Fixture entries per service, loaded from (and recorded to) <directory>/<service>.json.
+    """
+
+    def __init__(self, directory: str = FIXTURES_DIR):
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._entries: Dict[str, List[Dict[str, Any]]] = {}
+        self.reload()
+
+    def reload(self) -> None:
+        entries = {}
+        if os.path.isdir(self.directory):
+            for filename in sorted(os.listdir(self.directory)):
+                if filename.endswith(".json"):
+                    with open(os.path.join(self.directory, filename), encoding="utf-8") as f:
+                        fixture = json.load(f)
+                    entries.setdefault(fixture["service"], []).extend(fixture["entries"])
+        with self._lock:
+            self._entries = entries
+
+    def services(self) -> Dict[str, int]:
+        with self._lock:
+            return {service: len(entries) for service, entries in self._entries.items()}
+
+    def find(self, service: str, method: str, path: str, fields: Dict[str, str]) -> Optional[Dict[str, Any]]:
+        best, best_score = None, -1
+        with self._lock:
+            entries = self._entries.get(service, [])
+        for entry in entries:
+            if entry.get("method", "GET").upper() != method or not fnmatch.fnmatchcase(path, entry["path"]):
+                continue
+            match = entry.get("match", {})
+            if all(fields.get(name) == str(value).casefold() for name, value in match.items()):
+                if len(match) > best_score:
+                    best, best_score = entry, len(match)
+        return best
+
+    def record(self, service: str, entry: Dict[str, Any]) -> None:
+        """
+        Appends an entry to <service>.json, replacing an earlier one for the same request.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, f"{service}.json")
+        with self._lock:
+            fixture = {"service": service, "entries": []}
+            if os.path.exists(path):
+                with open(path, encoding="utf-8") as f:
+                    fixture = json.load(f)
+            same = (entry["method"], entry["path"], entry["match"])
+            fixture["entries"] = [
+                e for e in fixture["entries"] if (e.get("method"), e.get("path"), e.get("match", {})) != same
+            ] + [entry]
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(fixture, f, indent=1, ensure_ascii=False)
+                f.write("\n")
+            self._entries.setdefault(service, []).append(entry)
+
+
+class Faults:
+    """
+    Latency and error injection, with per-service overrides ("" is the default).
+    """
+
+    def __init__(
+        self,
+        latency: Optional[Dict[str, float]] = None,
+        jitter: float = 0.0,
+        error_rate: Optional[Dict[str, float]] = None,
+        error_status: int = 503,
+        retry_after: Optional[float] = None,
+        seed: Optional[int] = None,
+        tail_rate: Optional[Dict[str, float]] = None,
+        tail_latency: Optional[Dict[str, float]] = None,
+        quota: Optional[Dict[str, float]] = None,
+    ):
+        self.latency = latency or {}
+        self.jitter = jitter
+        # A tail_rate fraction of requests take tail_latency seconds longer (slow outliers).
+        self.tail_rate = tail_rate or {}
+        self.tail_latency = tail_latency or {}
+        self.error_rate = error_rate or {}
+        self.error_status = error_status
+        self.retry_after = retry_after
+        # Requests per second a service accepts (one second's worth of burst); the rest get 429 + Retry-After.
+        self.quota = quota or {}
+        self._allowance: Dict[str, Tuple[float, float]] = {}
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def delay_for(self, service: str) -> float:
+        base = self.latency.get(service, self.latency.get("", 0.0))
+        if base and self.jitter:
+            with self._lock:
+                base *= 1 + self._random.uniform(-self.jitter, self.jitter)
+        tail_rate = self.tail_rate.get(service, self.tail_rate.get("", 0.0))
+        if tail_rate:
+            with self._lock:
+                if self._random.random() < tail_rate:
+                    base += self.tail_latency.get(service, self.tail_latency.get("", 0.0))
+        return max(base, 0.0)
+
+    def should_fail(self, service: str) -> bool:
+        rate = self.error_rate.get(service, self.error_rate.get("", 0.0))
+        if not rate:
+            return False
+        with self._lock:
+            return self._random.random() < rate
+
+    def over_quota(self, service: str) -> Optional[float]:
+        """
+        Returns:
+            Optional[float]: None if the request is within the service's quota,
+            otherwise the seconds until it would be.
+        """
+        rate = self.quota.get(service, self.quota.get("", 0.0))
+        if not rate:
+            return None
+        with self._lock:
+            now = time.monotonic()
+            tokens, updated = self._allowance.get(service, (rate, now))
+            tokens = min(rate, tokens + (now - updated) * rate)
+            if tokens < 1:
+                self._allowance[service] = (tokens, now)
+                return (1 - tokens) / rate
+            self._allowance[service] = (tokens - 1, now)
+            return None
+
+
+class StandinServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], store: FixtureStore, faults: Faults, record: bool = False):
+        super().__init__(address, _Handler)
+        self.store = store
+        self.faults = faults
+        self.recording = record
+        self._stats_lock = threading.Lock()
+        self.stats: Dict[str, Dict[str, int]] = {}
+        self._upstream = httpx.Client(timeout=60, follow_redirects=True) if record else None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def count(self, service: str, outcome: str) -> None:
+        with self._stats_lock:
+            counters = self.stats.setdefault(service, {"requests": 0, "matched": 0, "unmatched": 0, "injected_errors": 0, "over_quota": 0, "recorded": 0})
+            counters[outcome] += 1
+
+    def forward(self, service: str, method: str, path: str, query: str, headers: Dict[str, str], body: bytes) -> httpx.Response:
+        url = UPSTREAMS[service] + path + (f"?{query}" if query else "")
+        headers = {name: value for name, value in headers.items() if name.lower() not in _HOP_BY_HOP}
+        return self._upstream.request(method, url, headers=headers, content=body or None)
+
+    def handle_error(self, request, client_address) -> None:
+        # Clients that cancel a request (hedging, budgets) close the connection mid-response.
+        if isinstance(sys.exc_info()[1], ConnectionError):
+            logger.debug("%s closed the connection", client_address)
+            return
+        super().handle_error(request, client_address)
+
+    def server_close(self) -> None:
+        super().server_close()
+        if self._upstream is not None:
+            self._upstream.close()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: StandinServer
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately; with Nagle on, delayed ACKs add ~40 ms per response.
+    disable_nagle_algorithm = True
+
+    def log_message(self, format: str, *args) -> None:
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+    def _send(self, status: int, body: bytes, headers: Dict[str, str]) -> None:
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def _send_json(self, status: int, payload: Any, headers: Optional[Dict[str, str]] = None) -> None:
+        self._send(status, json.dumps(payload).encode(), {"Content-Type": "application/json", **(headers or {})})
+
+    def _handle(self) -> None:
+        url = urlsplit(self.path)
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        if url.path == "/_standin/stats":
+            return self._send_json(200, {"services": self.server.stats, "fixtures": self.server.store.services()})
+
+        service, _, rest = url.path.lstrip("/").partition("/")
+        if service not in UPSTREAMS:
+            return self._send_json(404, {"error": f"Unknown service {service!r}", "services": sorted(UPSTREAMS)})
+        path = "/" + rest
+        server = self.server
+        server.count(service, "requests")
+
+        delay = server.faults.delay_for(service)
+        if delay:
+            time.sleep(delay)
+        if server.faults.should_fail(service):
+            server.count(service, "injected_errors")
+            headers = {"Retry-After": f"{server.faults.retry_after:g}"} if server.faults.retry_after is not None else {}
+            return self._send_json(server.faults.error_status, {"error": "Injected error from the stand-in server"}, headers)
+        wait = server.faults.over_quota(service)
+        if wait is not None:
+            server.count(service, "over_quota")
+            return self._send_json(429, {"error": "Rate limit exceeded (stand-in quota)"}, {"Retry-After": f"{wait:.3f}"})
+
+        fields = request_fields(url.query, body)
+        if server.recording:
+            return self._record(service, path, url.query, fields, body)
+
+        entry = server.store.find(service, self.command, path, fields)
+        if entry is None:
+            server.count(service, "unmatched")
+            return self._send_json(404, {"error": "No fixture for this request", "service": service,
+                                         "method": self.command, "path": path, "fields": fields})
+        server.count(service, "matched")
+        headers = dict(entry.get("headers", {}))
+        if "json" in entry:
+            headers.setdefault("Content-Type", "application/json")
+            payload = json.dumps(entry["json"]).encode()
+        else:
+            headers.setdefault("Content-Type", "text/plain; charset=utf-8")
+            payload = entry.get("text", "").encode()
+        self._send(entry.get("status", 200), payload, headers)
+
+    def _record(self, service: str, path: str, query: str, fields: Dict[str, str], body: bytes) -> None:
+        response = self.server.forward(service, self.command, path, query, dict(self.headers), body)
+        entry = {"method": self.command, "path": path, "match": fields, "status": response.status_code}
+        content_type = response.headers.get("content-type", "")
+        try:
+            entry["json"] = response.json()
+        except ValueError:
+            entry["text"] = response.text
+            entry["headers"] = {"Content-Type": content_type or "text/plain; charset=utf-8"}
+        if "retry-after" in response.headers:
+            entry.setdefault("headers", {})["Retry-After"] = response.headers["retry-after"]
+        self.server.store.record(service, entry)
+        self.server.count(service, "recorded")
+        headers = {"Content-Type": content_type} if content_type else {}
+        self._send(response.status_code, response.content, headers)
+
+    do_GET = do_POST = do_PUT = do_DELETE = do_HEAD = _handle
+
+
+def make_server(
+    host: str = "127.0.0.1",
+    port: int = 0,
+    fixtures: str = FIXTURES_DIR,
+    faults: Optional[Faults] = None,
+    record: bool = False,
+) -> StandinServer:
+    """
+    Args:
+        port (int): 0 picks a free port (see `server.url`).
+        fixtures (str): Fixture directory to replay from or record into.
+        faults (Faults): Latency/error injection; none by default.
+        record (bool): Forward to the real upstreams and record the responses.
+    """
+    return StandinServer((host, port), FixtureStore(fixtures), faults or Faults(), record=record)
+
+
+def serve_in_thread(**kwargs) -> StandinServer:
+    """
+    Starts a stand-in server on a background thread and points MCPTools at it
+    by setting MCPTOOLS_STANDIN_URL. Call `server.shutdown()` to stop it.
+    """
+    server = make_server(**kwargs)
+    threading.Thread(target=server.serve_forever, name="standin", daemon=True).start()
+    os.environ["MCPTOOLS_STANDIN_URL"] = server.url
+    return server
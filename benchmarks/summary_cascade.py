@@ -0,0 +1,169 @@
+"""
+Summarization cascade (passthrough / local extractive / remote model) latency per tier.
+
+The stand-in's MangaDex search is widened to --results hits whose descriptions
+cycle through a short, a typical, a long (link-laden) and a run-on one, and
+every OpenRouter completion takes --llm-latency seconds. The benchmark:
+    - times each description through the local tiers of the cascade and
+      prints the tier it got (or "llm" where it would ask the model), its
+      confidence and the summary length;
+    - calls get_summarized_manga_info with an empty summary cache, once with
+      SUMMARY_MIN_CONFIDENCE above 1 (every description goes to the model, as
+      before) and once with the cascade (model only for low-confidence
+      summaries), and reports latency, model requests and tiers;
+    - trims a long deep_research finalAnalysis to DEEP_RESEARCH_MAX_TOKENS.
+Runs entirely offline.
+
+Usage:
+    python benchmarks/summary_cascade.py --results 10 --llm-latency 1.0
+"""
+import argparse
+import asyncio
+import copy
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.standin import Faults, serve_in_thread
+
+DESCRIPTIONS = {
+    "short": "A retired courier takes one last delivery across a flooded city, and the parcel starts talking back.",
+    "typical": (
+        "Haru Kisaragi has spent three years repairing clocks in his late grandfather's shop, convinced that "
+        "nothing in the quiet harbour town will ever change. That changes the night a stranger leaves a pocket "
+        "watch that runs backwards on his counter. Every time Haru winds it, the town loses an hour that nobody "
+        "else seems to remember. The lighthouse keeper forgets her daughter, the fishing boats return before they "
+        "leave, and the festival the whole town has prepared for never arrives. Haru teams up with Mio, a "
+        "transfer student who keeps a diary of the lost hours, to find the watch's owner before the town runs out "
+        "of time entirely. Their search leads them through the shop's ledgers, a sunken railway station and the "
+        "guild of clockmakers his grandfather left decades ago. Along the way Haru learns why his grandfather "
+        "never let him open the locked drawer behind the counter, and what the watch was built to undo."
+    ),
+    "long": (
+        "In the year 2189 the orbital city of Amaterasu is run by seven corporations, each owning a ring of the "
+        "station and everyone born on it. Rei Tachibana is a debt-runner: she carries contraband between the "
+        "rings for whoever pays off a little more of the debt she inherited at birth. When a job goes wrong and "
+        "she wakes up with a stranger's memories in her head, she learns that the corporations have been "
+        "quietly trading the minds of their workers. The memories belong to Sora, an engineer who designed the "
+        "station's life-support system and who vanished a decade ago. Sora's memories hold the override codes "
+        "for the entire station, and every corporation wants them. Rei has to decide whether to sell the codes, "
+        "hand them to the resistance hiding in the abandoned seventh ring, or find out what Sora was trying to "
+        "tell her. Hunted by corporate enforcers, a bounty hunter with a grudge and her own former crew, she "
+        "must keep moving between the rings while Sora's memories slowly overwrite her own. The station's "
+        "oldest secret turns out to be why it was built at all, and who is still waiting on the planet below. "
+        "Each volume follows Rei into a different ring, with its own rulers, rules and price on her head.\n\n"
+        "Winner of the 2021 Next Manga Award (web category).\n\n"
+        "---\n**Links:**\n- [Official English](https://example.com/amaterasu)\n"
+        "- [Author's Twitter](https://example.com/author)\n- [Raw](https://example.com/raw)"
+    ),
+    # One run-on sentence: no unit fits the limit, so the extractive summary has no confidence.
+    "run-on": (
+        "Kaito wakes up in the body of the villain of his favourite otome game with seven days until the "
+        "scripted execution, no memory of how the story ends after chapter three, a butler who suspects "
+        "everything, a fiancee who already hates him, a younger brother plotting to inherit the duchy, a "
+        "heroine who seems to remember the game as well, a kingdom on the edge of a war that the game never "
+        "mentioned, a cursed sword that only he can hear and a growing suspicion that the developers left "
+        "something in the code that was never meant to be found, and so he decides that the only way to "
+        "survive is to rewrite every event of the first route before the bells of the capital ring on the "
+        "seventh morning, even if it means befriending every character the original villain betrayed"
+    ),
+}
+
+ANALYSIS_SECTION = """## {name}
+- {name} is in its monsoon season, with light to moderate rain most afternoons and temperatures of 22-31 C.
+- Air quality is good to fair; PM2.5 stays around 8 ug/m3 and rises slightly near the highways in the evening.
+- The municipal corporation has cleared most storm drains, but low-lying areas near the river still flood after heavy showers.
+- Rain is likely on most days this week, and the weather service has issued no severe weather alerts.
+- Travellers should expect slower traffic during the evening peak and occasional delays on the suburban railway.
+"""
+
+
+def widen_search(server, results: int) -> None:
+    entry = server.store.find("mangadex", "GET", "/manga", {})
+    hit = entry["json"]["data"][0]
+    kinds = list(DESCRIPTIONS)
+    entry["json"]["data"] = []
+    for i in range(results):
+        manga = copy.deepcopy(hit)
+        manga["id"] = f"{i:08x}-0000-4000-8000-000000000000"
+        manga["attributes"]["description"] = {"en": DESCRIPTIONS[kinds[i % len(kinds)]]}
+        entry["json"]["data"].append(manga)
+
+
+async def main(server, results: int) -> int:
+    from MCPTools.loader import get_async_open_router_client, get_manga_summary_cache, get_summary_cascade, registry
+    from MCPTools.loader.compaction import estimate_tokens
+    from MCPTools.summarize import SummaryCascade
+    from MCPTools.tools.manga import MANGA_SUMMARY_MAX_TOKENS, _clean_description, _summary_limits, get_summarized_manga_info
+    from MCPTools.tools.web_search import DEEP_RESEARCH_MAX_TOKENS, _trim_analysis
+
+    async def no_model() -> str:
+        return ""
+
+    # Local tiers only: a model answer is stubbed out, so "llm" rows show the decision, not its latency.
+    print(f"{'description':<12} {'words':>6} {'tier':<12} {'confidence':>10} {'tokens':>7} {'ms p50':>8}")
+    cascade = SummaryCascade()
+    for kind, text in DESCRIPTIONS.items():
+        timings = []
+        for _ in range(200):
+            start = time.perf_counter()
+            summary = await cascade.summarize(
+                _clean_description(text), MANGA_SUMMARY_MAX_TOKENS, llm=no_model, max_words=90, query="Chainsaw Man"
+            )
+            timings.append((time.perf_counter() - start) * 1000)
+        print(f"{kind:<12} {len(text.split()):>6} {summary.tier:<12} {summary.confidence:>10.2f} "
+              f"{estimate_tokens(summary.text):>7} {statistics.median(timings):>8.3f}")
+
+    widen_search(server, results)
+    get_async_open_router_client()  # built up front, so its import time is not charged to the first run
+    print(f"\nget_summarized_manga_info, {results} hits, {_summary_limits(results)[0]} tokens each, empty summary cache:")
+    ok = True
+    for label, min_confidence in (("model for every hit", "1.01"), ("cascade", None)):
+        get_manga_summary_cache().clear()
+        if min_confidence:
+            os.environ["SUMMARY_MIN_CONFIDENCE"] = min_confidence
+        else:
+            os.environ.pop("SUMMARY_MIN_CONFIDENCE", None)
+        registry.reset("summary_cascade")
+        before = server.stats.get("openrouter", {}).get("requests", 0)
+        start = time.perf_counter()
+        result = await get_summarized_manga_info("Chainsaw Man")
+        elapsed = time.perf_counter() - start
+        requests = server.stats.get("openrouter", {}).get("requests", 0) - before
+        tiers = {tier: counters["calls"] for tier, counters in get_summary_cascade().stats().items() if tier != "llm_errors"}
+        tokens = estimate_tokens(result.get("summary", ""))
+        print(f"  {label:<22} {elapsed:>6.2f} s  {requests:>3} model requests  {tokens:>4} tokens  tiers {tiers}")
+        ok &= "summary" in result and tokens <= results * _summary_limits(results)[0]
+
+    analysis = "\n".join(ANALYSIS_SECTION.format(name=f"District {i}") for i in range(40))
+    start = time.perf_counter()
+    trimmed = await _trim_analysis(analysis)
+    elapsed = (time.perf_counter() - start) * 1000
+    print(f"\ndeep_research finalAnalysis: {estimate_tokens(analysis)} -> {estimate_tokens(trimmed)} tokens "
+          f"(limit {DEEP_RESEARCH_MAX_TOKENS}) in {elapsed:.1f} ms, extractive tier")
+    ok &= estimate_tokens(trimmed) <= DEEP_RESEARCH_MAX_TOKENS
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--results", type=int, default=10, help="MangaDex hits per search")
+    parser.add_argument("--llm-latency", type=float, default=1.0, help="Stand-in latency per OpenRouter completion (s)")
+    args = parser.parse_args()
+    for name in ("TAVILY_API_KEY", "FIRECRAWL_SANE_API", "OPENROUTER"):
+        os.environ.setdefault(name, "standin")
+    # The stand-in enforces no quotas; the providers' token buckets would only pace the benchmark.
+    os.environ.setdefault("RATE_LIMITS", "off")
+    directory = tempfile.mkdtemp(prefix="summary-cascade-")
+    os.environ["MCPTOOLS_DATA_DIR"] = directory
+    server = serve_in_thread(faults=Faults(latency={"openrouter": args.llm_latency, "": 0.05}))
+    try:
+        sys.exit(asyncio.run(main(server, args.results)))
+    finally:
+        server.shutdown()
+        shutil.rmtree(directory, ignore_errors=True)
@@ -0,0 +1,98 @@
+"""
+End-to-end tool latency against the offline stand-in server.
+
+Starts benchmarks/standin on a background thread (bundled fixtures, --latency
+seconds per upstream request, optional --error-rate), then calls every
+network-bound tool --calls times through the MCP server, first one after the
+other and then all at once, and reports p50/p95 latency and errors per tool.
+Caches and the local crypto store (kept in a temporary directory) are cleared
+between calls unless --warm is given, so each call reaches the stand-in. Runs
+entirely offline.
+
+Usage:
+    python benchmarks/tool_latency.py --calls 20 --latency 0.1
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.standin import Faults, serve_in_thread
+
+CASES = {
+    "get_weather": {"city": "Pune", "current": True, "forecast": True, "days": 3},
+    "get_crypto_data": {"symbol": "BTC", "date": "2025-07-10"},
+    "get_crypto_history": {"symbol": "BTC", "start_date": "2025-07-01", "end_date": "2025-07-10"},
+    "internet_search": {"query": "pune weather"},
+    "google_search": {"query": "pune weather"},
+    "search_firecrawl": {"query": "pune weather"},
+    "wikipedia_search": {"query": "Pune", "search_limit": "2"},
+    "get_summarized_manga_info": {"title": "Chainsaw Man"},
+}
+
+
+def percentile(samples: list[float], q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+async def timed_call(mcp, tool: str, arguments: dict) -> tuple[float, bool]:
+    start = time.perf_counter()
+    try:
+        result = await mcp.call_tool(tool, arguments)
+        text = str(result)
+        ok = '"error"' not in text and "Failed to get" not in text
+    except Exception:
+        ok = False
+    return time.perf_counter() - start, ok
+
+
+async def main(calls: int, warm: bool) -> None:
+    from MCPTools.server import mcp
+    from MCPTools.loader import get_crypto_store, get_weather_cache, get_wiki_extract_cache
+
+    def reset():
+        if not warm:
+            get_weather_cache().clear()
+            get_crypto_store().clear()
+            get_wiki_extract_cache().clear()
+
+    print(f"{'tool':<26} {'mode':<11} {'p50 ms':>8} {'p95 ms':>8} {'errors':>7}")
+    for tool, arguments in CASES.items():
+        await timed_call(mcp, tool, arguments)  # warm up: import the tool module, open the pool
+        sequential = []
+        for _ in range(calls):
+            reset()
+            sequential.append(await timed_call(mcp, tool, arguments))
+        reset()
+        # Distinct arguments per call would defeat single-flight; identical ones show its effect.
+        concurrent = await asyncio.gather(*(timed_call(mcp, tool, arguments) for _ in range(calls)))
+        for mode, results in (("sequential", sequential), ("concurrent", concurrent)):
+            latencies = [elapsed * 1000 for elapsed, _ in results]
+            errors = sum(not ok for _, ok in results)
+            print(f"{tool:<26} {mode:<11} {statistics.median(latencies):>8.1f} {percentile(latencies, 0.95):>8.1f} {errors:>7}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=20, help="Calls per tool and mode")
+    parser.add_argument("--latency", type=float, default=0.1, help="Stand-in latency per upstream request (s)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of upstream requests that fail")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--warm", action="store_true", help="Keep caches between calls")
+    args = parser.parse_args()
+    for name in ("TAVILY_API_KEY", "FIRECRAWL_SANE_API", "OPENROUTER", "WEATHER_API_KEY", "ALPHAVANTAGE_API"):
+        os.environ.setdefault(name, "standin")
+    # The stand-in enforces no quotas; the providers' token buckets would only pace the benchmark.
+    os.environ.setdefault("RATE_LIMITS", "off")
+    os.environ["MCPTOOLS_DATA_DIR"] = tempfile.mkdtemp(prefix="mcptools-bench-")
+    server = serve_in_thread(faults=Faults(latency={"": args.latency}, error_rate={"": args.error_rate}, seed=args.seed))
+    try:
+        asyncio.run(main(args.calls, args.warm))
+    finally:
+        server.shutdown()
@@ -0,0 +1,133 @@
+"""
+Circuit breakers and health probes against a failing stand-in.
+
+WeatherAPI on the stand-in is made to hang (every request takes longer than
+the client's --timeout). The benchmark then calls get_weather for --calls
+cities, one after another:
+    - with the circuit breakers off: every call waits out the timeout;
+    - with breakers but no probes: the first CIRCUIT_FAILURE_THRESHOLD calls
+      time out, then the breaker opens and the rest fail at once;
+    - with background probes: the probe opens the breaker before the first
+      call, so every call fails at once;
+and reports the latency per call. A city whose cached weather has expired is
+answered from the cache, marked stale, while the breaker is open. Then the
+fault is removed and the time until the probes close the breaker is
+measured. Finally the MangaDex status page is made to report a major API
+outage, and get_summarized_manga_info fails fast on the next probe. Runs
+entirely offline.
+
+Usage:
+    python benchmarks/upstream_health.py --calls 8 --timeout 1.0
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.standin import Faults, serve_in_thread
+
+
+async def timed_calls(cities: list) -> tuple:
+    """Per-call latencies (ms) and results of sequential get_weather calls."""
+    from MCPTools.tools.weather import get_weather
+
+    latencies, results = [], []
+    for city in cities:
+        start = time.perf_counter()
+        results.append(await get_weather(city))
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies, results
+
+
+def report(label: str, latencies: list, results: list) -> None:
+    errors = sum("error" in result for result in results)
+    stale = sum(bool(result.get("stale")) for result in results)
+    print(f"{label:<26} {statistics.mean(latencies):>9.1f} {max(latencies):>9.1f} {sum(latencies) / 1000:>8.2f} "
+          f"{errors:>7} {stale:>6}")
+
+
+async def main(server, calls: int, hang: float) -> int:
+    from MCPTools.loader import get_async_http_client, get_health_monitor
+    from MCPTools.tools.manga import get_summarized_manga_info
+    from MCPTools.tools.weather import get_weather
+
+    monitor, client = get_health_monitor(), get_async_http_client()
+    monitor.probing = False  # until the "breakers + probes" run; requests would otherwise start them
+    ok = "error" not in await get_weather("Pune")  # cached now; expires after WEATHER_CACHE_CURRENT_TTL
+    print(f"probes while healthy: {await monitor.probe_all(client)}\n")
+
+    server.faults.latency["weatherapi"] = hang
+    await asyncio.sleep(float(os.environ["WEATHER_CACHE_CURRENT_TTL"]) + 0.1)
+    cities = ["Pune"] + [f"City {i}" for i in range(calls - 1)]
+    print(f"WeatherAPI hanging, {calls} sequential get_weather calls (\"Pune\" has expired cached data):")
+    print(f"{'':<26} {'mean ms':>9} {'max ms':>9} {'total s':>8} {'errors':>7} {'stale':>6}")
+
+    monitor.enabled = False
+    report("breakers off", *await timed_calls(cities))
+    monitor.enabled = True
+    latencies, results = await timed_calls(cities)
+    report("breakers, no probes", latencies, results)
+    ok &= latencies[-1] < 50 and monitor.breaker("weatherapi").state == "open"
+    monitor.reset()
+    monitor.probing = True
+    monitor.start(client)
+    await asyncio.sleep(monitor.probe_timeout + 0.2)
+    latencies, results = await timed_calls(cities)
+    report("breakers + probes", latencies, results)
+    ok &= max(latencies) < 50 and bool(results[0].get("stale"))
+    print(f"  e.g. {next(result['error'] for result in results if 'error' in result)}")
+
+    server.faults.latency["weatherapi"] = 0.0
+    start = time.perf_counter()
+    while monitor.breaker("weatherapi").state != "closed" and time.perf_counter() - start < 10:
+        await asyncio.sleep(0.05)
+    recovered = "error" not in await get_weather("City 0")
+    print(f"\nfault removed: breaker closed by the probes after {time.perf_counter() - start:.2f} s, "
+          f"get_weather ok: {recovered}")
+    ok &= recovered
+
+    entry = server.store.find("mangadex_status", "GET", "/", {})
+    healthy_page = entry["text"]
+    entry["text"] = healthy_page.replace(
+        '<span class="name">API</span><span class="component-status">Operational',
+        '<span class="name">API</span><span class="component-status">Major Outage',
+    )
+    await monitor.probe("mangadex", client)
+    start = time.perf_counter()
+    result = await get_summarized_manga_info("Chainsaw Man")
+    print(f"MangaDex status page reports a major API outage: get_summarized_manga_info answered in "
+          f"{(time.perf_counter() - start) * 1000:.1f} ms: {result}")
+    ok &= "error" in result
+    entry["text"] = healthy_page
+    monitor.stop()
+
+    services = monitor.stats()["services"]
+    for service in ("weatherapi", "mangadex"):
+        print(f"{service}: {services[service]}")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=8, help="get_weather calls per scenario")
+    parser.add_argument("--timeout", type=float, default=1.0, help="Client read timeout (s)")
+    args = parser.parse_args()
+    for name in ("TAVILY_API_KEY", "FIRECRAWL_SANE_API", "OPENROUTER"):
+        os.environ.setdefault(name, "standin")
+    # The stand-in enforces no quotas; the providers' token buckets would only pace the benchmark.
+    os.environ.setdefault("RATE_LIMITS", "off")
+    os.environ["HTTP_TIMEOUT"] = str(args.timeout)
+    os.environ["HEALTH_PROBE_TIMEOUT"] = str(args.timeout / 2)
+    os.environ["HEALTH_PROBES"] = "on"
+    os.environ["HEALTH_PROBE_INTERVAL"] = "0.25"
+    os.environ["CIRCUIT_FAILURE_THRESHOLD"] = "3"
+    os.environ["WEATHER_CACHE_CURRENT_TTL"] = "1"
+    server = serve_in_thread(faults=Faults(latency={"": 0.02}))
+    try:
+        sys.exit(asyncio.run(main(server, args.calls, hang=args.timeout * 3)))
+    finally:
+        server.shutdown()
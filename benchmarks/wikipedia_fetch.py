@@ -0,0 +1,110 @@
+"""
+Round trips and latency of wikipedia_search against the offline stand-in.
+
+Compares the previous fetch path (list=search, then one prop=extracts|info
+request per title; kept below as `legacy_search`) with the generator=search
+engine in MCPTools/wikipedia, cold and with a warm extract cache, for every
+search in the bundled fixtures. The default "weather" fixture has a truncated
+extract, so it also exercises the per-page fallback. Checks that both paths
+return the same text. Runs entirely offline.
+
+Usage:
+    python benchmarks/wikipedia_fetch.py --latency 0.1 --runs 5
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.standin import Faults, serve_in_thread
+
+QUERIES = {"Pune": 2, "weather": 3}
+
+
+async def legacy_search(query: str, search_limit: int) -> dict:
+    """wikipedia_search's fetch before generator=search, verbatim."""
+    from MCPTools.loader import get_async_http_client, upstream_url
+    URL = upstream_url("wikipedia", "/w/api.php")
+    params = {
+        'action': 'query',
+        'format': 'json',
+        'list': 'search',
+        'srsearch': query,
+        'srlimit': search_limit
+    }
+    r = await get_async_http_client().get(URL, params=params)
+    results = r.json()['query']['search']
+    titles = [r['title'] for r in results]
+    page_ids = [r['pageid'] for r in results]
+    d = []
+
+    async def fetch_page(title):
+        p = await get_async_http_client().get(URL, params={
+            'action': 'query',
+            'format': 'json',
+            'prop': 'extracts|info',
+            'explaintext': True,
+            'exintro': True,
+            'titles': title,
+            'inprop': 'url'
+        })
+        return p.json()
+    pages = await asyncio.gather(*(fetch_page(title) for title in titles))
+    for p, page_id in zip(pages, page_ids):
+        page = p['query']['pages'][str(page_id)]
+        d.append(f"{page['title']} ({page['fullurl']}): {page['extract']}")
+    return {"results_string": "\n".join(d)}
+
+
+async def measure(server, fn, runs: int, reset) -> tuple[float, float, str]:
+    """Median latency (ms), upstream requests per call and the last result."""
+    latencies, requests, result = [], 0, None
+    for _ in range(runs):
+        reset()
+        before = server.stats.get("wikipedia", {}).get("requests", 0)
+        start = time.perf_counter()
+        result = await fn()
+        latencies.append((time.perf_counter() - start) * 1000)
+        requests += server.stats["wikipedia"]["requests"] - before
+    return statistics.median(latencies), requests / runs, result["results_string"]
+
+
+async def main(server, runs: int) -> int:
+    from MCPTools.loader import get_wiki_extract_cache
+    from MCPTools.tools.wiki import _wikipedia_search
+
+    cache = get_wiki_extract_cache()
+    mismatches = 0
+    print(f"{'query':<10} {'path':<14} {'requests':>9} {'p50 ms':>8}")
+    for query, limit in QUERIES.items():
+        await legacy_search(query, limit)  # warm up the connection pool
+        paths = {
+            "legacy": (lambda: legacy_search(query, limit), lambda: None),
+            "batched cold": (lambda: _wikipedia_search(query, limit), cache.clear),
+            "batched warm": (lambda: _wikipedia_search(query, limit), lambda: None),
+        }
+        texts = {}
+        for name, (fn, reset) in paths.items():
+            p50, requests, texts[name] = await measure(server, fn, runs, reset)
+            print(f"{query:<10} {name:<14} {requests:>9.1f} {p50:>8.1f}")
+        mismatches += len(set(texts.values())) != 1
+    print(f"\nidentical results: {'yes' if not mismatches else 'NO'}; extract cache {cache.stats()}")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", type=float, default=0.1, help="Stand-in latency per upstream request (s)")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+    for name in ("TAVILY_API_KEY", "FIRECRAWL_SANE_API", "OPENROUTER"):
+        os.environ.setdefault(name, "standin")
+    server = serve_in_thread(faults=Faults(latency={"": args.latency}))
+    try:
+        sys.exit(asyncio.run(main(server, args.runs)))
+    finally:
+        server.shutdown()
@@ -0,0 +1,158 @@
+"""
+Ingest throughput and query latency of the offline Wikipedia index.
+
+Writes a sample abstract dump (gzip XML in the enwiki-*-abstract.xml layout:
+--documents synthetic pages plus the pages in the stand-in's Wikipedia
+fixtures) to a temporary directory, then:
+    - ingests half of it, stops, and resumes the rest (documents/s, peak RSS);
+    - re-runs the finished dump (skipped) and ingests a small JSONL update
+      (only changed pages are rewritten);
+    - times --queries searches of 1-3 words (p50/p95), and wikipedia_search
+      through the local backend against the API path on the stand-in, checking
+      that both give the same text for "Pune".
+Runs entirely offline.
+
+Usage:
+    python benchmarks/wikipedia_index.py --documents 200000
+"""
+import argparse
+import asyncio
+import gzip
+import itertools
+import json
+import os
+import random
+import resource
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from xml.sax.saxutils import escape
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.standin import Faults, serve_in_thread
+from benchmarks.standin.server import FIXTURES_DIR
+
+
+def fixture_pages() -> list[dict]:
+    with open(os.path.join(FIXTURES_DIR, "wikipedia.json"), encoding="utf-8") as f:
+        entries = json.load(f)["entries"]
+    pages = {}
+    for entry in entries:
+        if "titles" in entry.get("match", {}):
+            pages.update(entry["json"]["query"]["pages"])
+    return list(pages.values())
+
+
+def write_dump(path: str, documents: int, rng: random.Random) -> list[str]:
+    """Writes the sample dump and returns its vocabulary."""
+    syllables = ["ka", "lo", "mi", "ra", "te", "su", "no", "vi", "de", "pa", "ri", "to", "an", "el", "or", "us"]
+    vocabulary = sorted({"".join(rng.choices(syllables, k=rng.randint(2, 4))) for _ in range(30000)})
+    # Zipf-like word frequencies.
+    cumulative = list(itertools.accumulate(1 / (rank + 1) for rank in range(len(vocabulary))))
+
+    def words(k: int) -> str:
+        return " ".join(rng.choices(vocabulary, cum_weights=cumulative, k=k))
+
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        f.write("<feed>\n")
+        for page in fixture_pages():
+            f.write(f"<doc>\n<title>Wikipedia: {escape(page['title'])}</title>\n<url>{escape(page['fullurl'])}</url>\n"
+                    f"<abstract>{escape(page['extract'])}</abstract>\n<links></links>\n</doc>\n")
+        for i in range(documents):
+            title = f"{words(rng.randint(1, 3)).title()} {i}"
+            f.write(f"<doc>\n<title>Wikipedia: {title}</title>\n<url>{escape('https://en.wikipedia.org/wiki/' + title.replace(' ', '_'))}</url>\n"
+                    f"<abstract>{words(rng.randint(15, 60))}.</abstract>\n<links>\n"
+                    f"<sublink linktype=\"nav\"><anchor>History</anchor><link>https://en.wikipedia.org/wiki/{i}#History</link></sublink>\n"
+                    f"</links>\n</doc>\n")
+        f.write("</feed>\n")
+    return vocabulary
+
+
+def max_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def report(label: str, result: dict) -> None:
+    rate = result["documents"] / result["seconds"] if result["seconds"] else 0.0
+    print(f"{label:<18} {result['documents']:>9,} docs {result['seconds']:>7.2f} s {rate:>10,.0f} docs/s "
+          f"written {result['written']:>8,} unchanged {result['unchanged']:>6,} "
+          f"peak RSS {max_rss_mb():>6.0f} MB")
+
+
+async def compare_with_api(server, runs: int) -> bool:
+    import MCPTools.tools.wiki as wiki
+    results = {}
+    for backend in ("api", "local"):
+        wiki.WIKIPEDIA_BACKEND = backend
+        latencies = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            results[backend] = (await wiki._wikipedia_search("Pune", 2))["results_string"]
+            latencies.append((time.perf_counter() - start) * 1000)
+        print(f"wikipedia_search('Pune'), {backend:<5} backend: p50 {statistics.median(latencies):.2f} ms")
+    return results["api"] == results["local"]
+
+
+def main(documents: int, queries: int, seed: int, latency: float) -> int:
+    rng = random.Random(seed)
+    directory = tempfile.mkdtemp(prefix="wikipedia-index-")
+    os.environ["WIKIPEDIA_INDEX_PATH"] = os.path.join(directory, "index.sqlite3")
+    dump = os.path.join(directory, "sample-abstract.xml.gz")
+    vocabulary = write_dump(dump, documents, rng)
+    print(f"sample dump: {documents:,} documents, {os.path.getsize(dump) / 1e6:.1f} MB gzip; "
+          f"peak RSS before ingest {max_rss_mb():.0f} MB\n")
+
+    from MCPTools.loader import get_wikipedia_index
+    index = get_wikipedia_index()
+    report("first half", index.ingest(dump, max_documents=documents // 2))
+    report("resumed", index.ingest(dump))
+    report("unchanged dump", index.ingest(dump))
+
+    update = os.path.join(directory, "update.jsonl")
+    with open(update, "w", encoding="utf-8") as f:
+        for i in range(0, min(documents, 2000)):
+            f.write(json.dumps({"title": "Pune" if i == 0 else f"Updated page {i}", "extract": f"Revised text {i}."}) + "\n")
+    report("jsonl update", index.ingest(update))
+    print(f"index: {index.page_count():,} pages, {os.path.getsize(index.path) / 1e6:.1f} MB\n")
+
+    # Undo the "Pune" revision so the comparison with the API fixture below is meaningful.
+    page = next(p for p in fixture_pages() if p["title"] == "Pune")
+    with open(update, "w", encoding="utf-8") as f:
+        f.write(json.dumps({"title": "Pune", "url": page["fullurl"], "extract": page["extract"]}) + "\n")
+    index.ingest(update)
+
+    samples = [" ".join(rng.sample(vocabulary[:5000], rng.randint(1, 3))) for _ in range(queries)]
+    latencies, hits = [], 0
+    for query in samples:
+        start = time.perf_counter()
+        hits += bool(index.search(query, 5))
+        latencies.append((time.perf_counter() - start) * 1000)
+    latencies.sort()
+    print(f"{queries} searches: p50 {statistics.median(latencies):.2f} ms, "
+          f"p95 {latencies[int(0.95 * (len(latencies) - 1))]:.2f} ms, {hits} with results\n")
+
+    server = serve_in_thread(faults=Faults(latency={"": latency}))
+    try:
+        same = asyncio.run(compare_with_api(server, 5))
+    finally:
+        server.shutdown()
+    print(f"same output as the API backend: {'yes' if same else 'NO'}")
+    index.close()
+    shutil.rmtree(directory, ignore_errors=True)
+    return 0 if same else 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--documents", type=int, default=200000)
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--latency", type=float, default=0.1, help="Stand-in latency per upstream request (s)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    for name in ("TAVILY_API_KEY", "FIRECRAWL_SANE_API", "OPENROUTER"):
+        os.environ.setdefault(name, "standin")
+    sys.exit(main(args.documents, args.queries, args.seed, args.latency))